@@ -0,0 +1,542 @@
+"""In-memory columnar snapshot of the tables behind the analytics menu.
+
+Application, VacancyJob, Employer and JobSeeker are loaded once into NumPy
+column arrays: IDs as int32, strings dictionary-encoded (each row stores
+the index of its value in a per-column list of distinct values) and
+ApplyDate as a 16-bit day number, i.e. datetime64[D] narrowed to the days
+1970-2149. An application costs 11 bytes, so 50M of them fit in about
+550 MB instead of several GB of Python rows. Applications point at their
+job and seeker by row, so joins are plain array indexing and every
+analytic is a handful of vectorized passes (masks, bincount, unique)
+instead of a join on the database.
+
+After the first load each use only reads what is new: applications past
+the highest AppID loaded, and jobs, employers and seekers past the highest
+IDs. Jobs this process updates, closes or deletes are patched in place.
+Other changes (application status, edited or deleted users, another
+process's deletions) show up at the next full reload, ENGINE_MAX_AGE
+seconds later.
+
+The functions mirror job_service's analytics and return the same shapes;
+set JOBAPP_ANALYTICS=columnar to have the app read them from here.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:         # the columnar engine is optional; job_service answers the same queries in SQL
+    np = None
+
+import db_pool
+import job_service
+from job_service import CompanyJobs, JobApplicants, ServiceError
+
+ENGINE_MAX_AGE = 3600       # seconds before the snapshot is reloaded in full to pick up edits and deletions
+LOAD_BATCH = 50000          # rows fetched per query while loading
+GROWTH = 1.25               # capacity factor when columns grow, to keep spare room small at 50M rows
+ANALYTICS_SOURCE = os.environ.get("JOBAPP_ANALYTICS", "sql")     # "columnar" reads analytics from the snapshot
+GROUP_BY_COLUMNS = ("job", "employer", "company", "industry", "location", "status",
+                    "seeker_industry", "seeker_location", "day", "month")
+HISTOGRAM_COLUMNS = ("job", "employer", "seeker")
+
+SeekerApplications = namedtuple("SeekerApplications",
+                                "UserID Name Email Phone Industry PreferredLocation AppliedJobCount")
+View = namedtuple("View", "apps jobs employers seekers seeker_apps snapshot")
+
+_snapshot = None
+_lock = threading.Lock()
+_listening = False
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for the columnar analytics engine (pip install numpy)")
+
+
+class Dictionary:
+    """Distinct values of a string column; rows store the value's index (its code)"""
+
+    def __init__(self, dtype=np.int32 if np else None):
+        self.dtype = dtype
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            if len(self.values) > np.iinfo(self.dtype).max:
+                raise ValueError(f"Too many distinct values for {np.dtype(self.dtype).name} codes")
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        return np.fromiter((self.code(value) for value in values), self.dtype, len(values))
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Table:
+    """Equal-length NumPy columns with spare capacity for appending"""
+
+    def __init__(self, dtypes):
+        self.columns = {name: np.zeros(0, dtype) for name, dtype in dtypes.items()}
+        self.size = 0
+
+    def reserve(self, rows):
+        capacity = len(next(iter(self.columns.values())))
+        if rows <= capacity:
+            return
+        capacity = max(rows, int(capacity * GROWTH) + 1024)
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, **values):
+        count = len(next(iter(values.values())))
+        self.reserve(self.size + count)
+        for name, column in self.columns.items():
+            column[self.size:self.size + count] = values[name]
+        self.size += count
+
+    def keep(self, mask):
+        # into new arrays, so views handed out earlier stay consistent
+        self.columns = {name: column[:self.size][mask] for name, column in self.columns.items()}
+        self.size = int(mask.sum())
+
+    def view(self):
+        return {name: column[:self.size] for name, column in self.columns.items()}
+
+    def nbytes(self):
+        return sum(column[:self.size].nbytes for column in self.columns.values())
+
+
+def _days(values):
+    # dates, datetimes or ISO strings -> 16-bit days since 1970 (datetime64[D] narrowed)
+    days = np.array(values, dtype="datetime64[s]").astype("datetime64[D]").astype(np.int64)
+    return np.clip(days, 0, np.iinfo(np.uint16).max).astype(np.uint16)
+
+
+def _day(value):
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+def _ids(rows, column):
+    return np.fromiter((getattr(row, column) for row in rows), np.int64, len(rows))
+
+
+def _lookup(ids, keys):
+    """Row of each key in the sorted ids, -1 where it is missing"""
+    if not len(ids):
+        return np.full(len(keys), -1, np.int32)
+    rows = np.minimum(np.searchsorted(ids, keys), len(ids) - 1)
+    return np.where(ids[rows] == keys, rows, -1).astype(np.int32)
+
+
+def _batches(query, key, after=0):
+    # keyset paging, one pooled connection per batch so a long load never holds one for minutes
+    while True:
+        with db_pool.connection() as conn:
+            rows = conn.execute(query + f" WHERE {key} > ? ORDER BY {key} OFFSET ? ROWS FETCH NEXT ? ROWS ONLY",
+                                after, 0, LOAD_BATCH).fetchall()
+        if not rows:
+            return
+        yield rows
+        after = getattr(rows[-1], key.split(".")[-1])
+
+
+_APPLICATION_SQL = "SELECT AppID, JobID, SeekerID, Status, ApplyDate FROM Application"
+_JOB_SQL = "SELECT JobID, EmployerID, Title, Industry, Location, Status FROM VacancyJob"
+_EMPLOYER_SQL = "SELECT UserID, ComName FROM Employer"
+_SEEKER_SQL = """
+    SELECT u.UserID, u.Name, u.Email, u.Phone, j.Industry, j.PreferredLocation
+    FROM [User] u
+    JOIN JobSeeker j ON u.UserID = j.UserID AND u.Role = 1
+"""
+
+
+class Snapshot:
+    """Column arrays of Application, VacancyJob, Employer and JobSeeker.
+
+    Jobs, employers and seekers are kept sorted by ID (IDENTITY values only
+    grow, so new rows append in order) and looked up by binary search;
+    applications store the row of their job and seeker.
+    """
+
+    def __init__(self):
+        self.apps = Table({"job": np.int32, "seeker": np.int32, "day": np.uint16, "status": np.uint8})
+        self.jobs = Table({"id": np.int32, "employer": np.int32, "title": np.int32, "industry": np.int32,
+                           "location": np.int32, "open": bool, "alive": bool})
+        self.employers = Table({"id": np.int32, "company": np.int32})
+        self.seekers = Table({"id": np.int32, "name": object, "email": object, "phone": object,
+                              "industry": np.int32, "location": np.int32})
+        self.titles = Dictionary()
+        self.industries = Dictionary()
+        self.locations = Dictionary()
+        self.companies = Dictionary()
+        self.statuses = Dictionary(np.uint8)
+        self.seeker_apps = np.zeros(0, np.int64)      # applications per seeker row
+        self.max_app_id = 0
+        self.built_at = time.monotonic()
+
+    def _max_id(self, table):
+        return int(table.columns["id"][table.size - 1]) if table.size else 0
+
+    def load(self):
+        with db_pool.connection() as conn:
+            apps = conn.execute("SELECT COUNT(*) FROM Application").fetchone()[0]
+        self.apps.reserve(apps + LOAD_BATCH)      # one allocation instead of growing 50M rows step by step
+        self.refresh()
+        return self
+
+    def refresh(self):
+        """Append the rows added since the last load or refresh"""
+        self._load_employers()
+        self._load_seekers()
+        self._load_jobs()
+        first = self.apps.size
+        for rows in _batches(_APPLICATION_SQL, "AppID", self.max_app_id):
+            self._add_applications(rows)
+            self.max_app_id = int(rows[-1].AppID)
+        if self.apps.size > first or len(self.seeker_apps) != self.seekers.size:
+            self._count_seekers(self.apps.view()["seeker"][first:])
+
+    def _count_seekers(self, seekers, delta=1):
+        # into a new array, so views handed out earlier stay consistent
+        counts = np.zeros(self.seekers.size, np.int64)
+        counts[:len(self.seeker_apps)] = self.seeker_apps
+        counts += delta * np.bincount(seekers[seekers >= 0], minlength=len(counts))
+        self.seeker_apps = counts
+
+    def _load_employers(self):
+        for rows in _batches(_EMPLOYER_SQL, "UserID", self._max_id(self.employers)):
+            self.employers.append(id=_ids(rows, "UserID"), company=self.companies.encode([row.ComName for row in rows]))
+
+    def _load_seekers(self):
+        for rows in _batches(_SEEKER_SQL, "u.UserID", self._max_id(self.seekers)):
+            self.seekers.append(id=_ids(rows, "UserID"), name=[row.Name for row in rows],
+                                email=[row.Email for row in rows], phone=[row.Phone for row in rows],
+                                industry=self.industries.encode([row.Industry for row in rows]),
+                                location=self.locations.encode([row.PreferredLocation for row in rows]))
+
+    def _job_columns(self, rows):
+        employers = _lookup(self.employers.view()["id"], _ids(rows, "EmployerID"))
+        if (employers < 0).any():
+            # an employer registered since the employers were read
+            self._load_employers()
+            employers = _lookup(self.employers.view()["id"], _ids(rows, "EmployerID"))
+        return dict(employer=employers,
+                    title=self.titles.encode([row.Title for row in rows]),
+                    industry=self.industries.encode([row.Industry for row in rows]),
+                    location=self.locations.encode([row.Location for row in rows]),
+                    open=np.array([row.Status == "Open" for row in rows], bool))
+
+    def _load_jobs(self):
+        for rows in _batches(_JOB_SQL, "JobID", self._max_id(self.jobs)):
+            self.jobs.append(id=_ids(rows, "JobID"), alive=np.ones(len(rows), bool), **self._job_columns(rows))
+
+    def _add_applications(self, rows):
+        job_ids = _ids(rows, "JobID")
+        jobs = _lookup(self.jobs.view()["id"], job_ids)
+        if (jobs < 0).any():
+            self._load_jobs()
+            jobs = _lookup(self.jobs.view()["id"], job_ids)
+        seeker_ids = _ids(rows, "SeekerID")
+        seekers = _lookup(self.seekers.view()["id"], seeker_ids)
+        if (seekers < 0).any():
+            self._load_seekers()
+            seekers = _lookup(self.seekers.view()["id"], seeker_ids)
+        # applications of jobs deleted meanwhile are dropped
+        found = jobs >= 0
+        self.apps.append(job=jobs[found], seeker=seekers[found],
+                         day=_days([row.ApplyDate for row in rows])[found],
+                         status=self.statuses.encode([row.Status for row in rows])[found])
+
+    def update_jobs(self, job_ids):
+        """Reread jobs whose title, industry, location or status changed"""
+        job_ids = sorted(job_ids)
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i:i + 500]
+            with db_pool.connection() as conn:
+                rows = conn.execute(_JOB_SQL + f" WHERE JobID IN ({', '.join('?' * len(chunk))})", *chunk).fetchall()
+            if not rows:
+                continue
+            positions = _lookup(self.jobs.view()["id"], _ids(rows, "JobID"))
+            found = positions >= 0
+            for name, values in self._job_columns(rows).items():
+                self.jobs.columns[name][positions[found]] = values[found]
+
+    def remove_jobs(self, job_ids):
+        """Drop deleted jobs and their applications"""
+        positions = _lookup(self.jobs.view()["id"], np.array(sorted(job_ids), np.int64))
+        positions = positions[positions >= 0]
+        if not len(positions):
+            return
+        self.jobs.columns["alive"][positions] = False
+        alive = self.jobs.columns["alive"][self.apps.view()["job"]]
+        self._count_seekers(self.apps.view()["seeker"][~alive], -1)
+        self.apps.keep(alive)
+
+    def view(self):
+        return View(self.apps.view(), self.jobs.view(), self.employers.view(), self.seekers.view(), self.seeker_apps,
+                    self)
+
+    def memory_usage(self):
+        """Bytes held by each table's columns (not counting spare capacity or the dictionaries)"""
+        return {name: table.nbytes() for name, table in
+                (("applications", self.apps), ("jobs", self.jobs), ("employers", self.employers),
+                 ("seekers", self.seekers))}
+
+
+def _listen():
+    global _listening
+    if not _listening:
+        job_service.add_job_listener(_on_jobs_changed)
+        _listening = True
+
+
+def _on_jobs_changed(event, job_ids):
+    # created jobs are picked up by the next refresh
+    with _lock:
+        if _snapshot is None or event == "created":
+            return
+        if event == "deleted":
+            _snapshot.remove_jobs(job_ids)
+        else:
+            _snapshot.update_jobs(job_ids)
+
+
+def current():
+    """View of the snapshot after reading new rows; loads it on first use and after ENGINE_MAX_AGE"""
+    global _snapshot
+    _require_numpy()
+    with _lock:
+        _listen()
+        if _snapshot is None or time.monotonic() - _snapshot.built_at > ENGINE_MAX_AGE:
+            _snapshot = None
+            _snapshot = Snapshot().load()
+        else:
+            _snapshot.refresh()
+        return _snapshot.view()
+
+
+def reset():
+    """Drop the snapshot; the next call reloads it"""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def memory_usage():
+    return current().snapshot.memory_usage()
+
+
+# ─── Analytics ───────────────────────────────────────────
+def _window(start, end):
+    if start is None and end is None:
+        return job_service.last_month_range()
+    if start is None or end is None or start > end:
+        raise ServiceError("A time window needs a start date on or before its end date!")
+    return start, end
+
+
+def _in_window(view, start, end):
+    # mask of the applications made from start to end, or None for all of them
+    if start is None and end is None:
+        return None
+    start, end = _window(start, end)
+    days = view.apps["day"]
+    return (days >= _day(start)) & (days <= _day(end))
+
+
+def _job_counts(view, start=None, end=None):
+    mask = _in_window(view, start, end)
+    jobs = view.apps["job"] if mask is None else view.apps["job"][mask]
+    return np.bincount(jobs, minlength=len(view.jobs["id"]))
+
+
+def _employer_stats(view, start, end):
+    # (jobs per employer, jobs with an application in the window per employer), by employer row
+    jobs = view.jobs
+    known = jobs["alive"] & (jobs["employer"] >= 0)
+    count = len(view.employers["id"])
+    announced = np.bincount(jobs["employer"][known], minlength=count)
+    applied = np.bincount(jobs["employer"][known & (_job_counts(view, *_window(start, end)) > 0)], minlength=count)
+    return announced, applied
+
+
+def _by_name(values):
+    # NULL names sort first, as they do in SQL Server
+    return sorted(values, key=lambda name: (name is not None, name or ""))
+
+
+def most_interesting_job(start=None, end=None):
+    """Row of (Title, AppCount) for the job with the most applicants, or None.
+
+    Given a window, AppCount counts only the applications made in it.
+    """
+    view = current()
+    counts = np.where(view.jobs["alive"], _job_counts(view, start, end), -1)
+    if not len(counts) or counts.max() < (0 if start is None and end is None else 1):
+        return None
+    best = int(counts.argmax())
+    return JobApplicants(view.snapshot.titles.values[view.jobs["title"][best]], int(counts[best]))
+
+
+def jobs_without_applicants(start=None, end=None):
+    """Titles of open jobs that received no application in the window"""
+    view = current()
+    idle = view.jobs["alive"] & view.jobs["open"] & (_job_counts(view, *_window(start, end)) == 0)
+    titles = view.snapshot.titles.values
+    return [titles[code] for code in view.jobs["title"][idle]]
+
+
+def employer_max_announcements(start=None, end=None):
+    """Row of (ComName, JobCount) for the employer with most jobs applied to in the window, or None"""
+    view = current()
+    _, applied = _employer_stats(view, start, end)
+    if not applied.any():
+        return None
+    # like the SQL query, a company qualifies when its total equals the best single employer's
+    companies = np.bincount(view.employers["company"], weights=applied)
+    best = np.flatnonzero(companies == applied.max())
+    if not len(best):
+        return None
+    return CompanyJobs(view.snapshot.companies.values[best[0]], int(companies[best[0]]))
+
+
+def employers_without_announcements(start=None, end=None):
+    """Company names of employers with no job, or with a job nobody applied to in the window"""
+    view = current()
+    announced, applied = _employer_stats(view, start, end)
+    codes = np.unique(view.employers["company"][(announced == 0) | (applied < announced)])
+    return _by_name(view.snapshot.companies.values[code] for code in codes)
+
+
+def available_positions():
+    """Dict of company name -> list of open job titles, ordered by company"""
+    view = current()
+    jobs = view.jobs
+    rows = np.flatnonzero(jobs["alive"] & jobs["open"] & (jobs["employer"] >= 0))
+    companies, titles = view.snapshot.companies.values, view.snapshot.titles.values
+    result = {}
+    for row in rows:
+        result.setdefault(companies[view.employers["company"][jobs["employer"][row]]], []).append(
+            titles[jobs["title"][row]])
+    return {name: result[name] for name in _by_name(result)}
+
+
+def _seeker_rows(view, rows):
+    counts = view.seeker_apps
+    seekers = view.seekers
+    industries, locations = view.snapshot.industries.values, view.snapshot.locations.values
+    return [SeekerApplications(int(seekers["id"][row]), seekers["name"][row], seekers["email"][row],
+                               seekers["phone"][row], industries[seekers["industry"][row]],
+                               locations[seekers["location"][row]], int(counts[row]))
+            for row in rows]
+
+
+def job_seeker_applications():
+    """Rows of seeker contact details with AppliedJobCount, ordered by name"""
+    view = current()
+    names = view.seekers["name"]
+    order = sorted(range(len(names)), key=lambda row: (names[row] is not None, names[row] or ""))
+    return _seeker_rows(view, order)
+
+
+def job_seeker_applications_page(after=None, before=None, page_size=job_service.PAGE_SIZE):
+    """(rows, more) for one page of job_seeker_applications() keyed on UserID"""
+    view = current()
+    ids = view.seekers["id"]
+    if before is not None:
+        end = int(np.searchsorted(ids, before))
+        start = max(0, end - page_size)
+        return _seeker_rows(view, range(start, end)), start > 0
+    start = int(np.searchsorted(ids, after, side="right")) if after is not None else 0
+    end = min(start + page_size, len(ids))
+    return _seeker_rows(view, range(start, end)), end < len(ids)
+
+
+def iter_job_seeker_applications(batch_size=job_service.FETCH_SIZE):
+    """Stream job_seeker_applications() rows in UserID order"""
+    view = current()
+    for start in range(0, len(view.seekers["id"]), batch_size):
+        yield from _seeker_rows(view, range(start, min(start + batch_size, len(view.seekers["id"]))))
+
+
+# ─── Group-bys and Histograms ───────────────────────────────────────────
+def group_by(column, start=None, end=None, limit=None):
+    """[(value, applications)] with the most applications first, over all time unless given a window.
+
+    column is one of GROUP_BY_COLUMNS: job, employer (IDs), company,
+    industry, location, status, seeker_industry, seeker_location,
+    day or month (dates).
+    """
+    if column not in GROUP_BY_COLUMNS:
+        raise ServiceError(f"Cannot group applications by {column}! Choose one of: {', '.join(GROUP_BY_COLUMNS)}")
+    view = current()
+    mask = _in_window(view, start, end)
+    apps = view.apps if mask is None else {name: values[mask] for name, values in view.apps.items()}
+    snapshot = view.snapshot
+    if column in ("day", "month"):
+        # day numbers fit 16 bits, so counting per day is a bincount; months sum the days
+        per_day = np.bincount(apps["day"])
+        days = np.flatnonzero(per_day)
+        keys = days.astype("datetime64[D]")
+        if column == "month":
+            keys, months = np.unique(keys.astype("datetime64[M]"), return_inverse=True)
+            counts = np.bincount(months, weights=per_day[days]).astype(np.int64)
+        else:
+            counts = per_day[days]
+        labels = [key.astype("datetime64[D]").item() for key in keys]
+    else:
+        codes, labels = _group_codes(view, apps, column, snapshot)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        keys = np.flatnonzero(counts)
+        counts, labels = counts[keys], [labels[key] for key in keys]
+    order = np.argsort(-counts, kind="stable")[:limit]
+    return [(labels[i], int(counts[i])) for i in order]
+
+
+def _group_codes(view, apps, column, snapshot):
+    # per application code of the column, -1 where unknown, and the value of each code
+    job = apps["job"]
+    employer = view.jobs["employer"][job]
+    if column == "job":
+        return job, view.jobs["id"].tolist()
+    if column == "employer":
+        return employer, view.employers["id"].tolist()
+    if column == "company":
+        return np.where(employer >= 0, view.employers["company"][employer], -1), snapshot.companies.values
+    if column == "status":
+        return apps["status"].astype(np.int32), snapshot.statuses.values
+    if column in ("industry", "location"):
+        dictionary = snapshot.industries if column == "industry" else snapshot.locations
+        return view.jobs[column][job], dictionary.values
+    seeker = apps["seeker"]
+    name = column.split("_", 1)[1]
+    dictionary = snapshot.industries if name == "industry" else snapshot.locations
+    return np.where(seeker >= 0, view.seekers[name][seeker], -1), dictionary.values
+
+
+def histogram(per="job", bins=10, start=None, end=None):
+    """(counts, bin edges) of the number of applications per job, employer or seeker"""
+    if per not in HISTOGRAM_COLUMNS:
+        raise ServiceError(f"Cannot count applications per {per}! Choose one of: {', '.join(HISTOGRAM_COLUMNS)}")
+    view = current()
+    if per == "seeker":
+        mask = _in_window(view, start, end)
+        seekers = view.apps["seeker"] if mask is None else view.apps["seeker"][mask]
+        values = np.bincount(seekers[seekers >= 0], minlength=len(view.seekers["id"]))
+    else:
+        values = _job_counts(view, start, end)[view.jobs["alive"]]
+        if per == "employer":
+            employers = view.jobs["employer"][view.jobs["alive"]]
+            values = np.bincount(employers[employers >= 0], weights=values[employers >= 0],
+                                 minlength=len(view.employers["id"]))
+    return np.histogram(values, bins=bins)
@@ -0,0 +1,129 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import analytics_engine
+import db_pool
+import job_service
+import profiler
+
+REPORT_WORKERS = 6          # sections run at once, each on its own pooled connection
+
+analytics_source = analytics_engine if analytics_engine.ANALYTICS_SOURCE == "columnar" else job_service
+
+
+# ─── Sections ───────────────────────────────────────────
+# Each returns (data, lines): JSON-ready data for export and the text lines shown to the user.
+def _most_interesting_job(start, end):
+    row = analytics_source.most_interesting_job(start, end)
+    if not row:
+        return None, ["No jobs with applications."]
+    return {'title': row.Title, 'applicants': row.AppCount}, [f"Job Title: {row.Title}, Applicants: {row.AppCount}"]
+
+
+def _jobs_without_applicants(start, end):
+    titles = analytics_source.jobs_without_applicants(start, end)
+    return titles, titles or ["No jobs without applicants."]
+
+
+def _employer_max_announcements(start, end):
+    row = analytics_source.employer_max_announcements(start, end)
+    if not row:
+        return None, ["No jobs with applications."]
+    return ({'company': row.ComName, 'jobs_with_applications': row.JobCount},
+            [f"Employer: {row.ComName}, Jobs with Applications: {row.JobCount}"])
+
+
+def _employers_without_announcements(start, end):
+    names = analytics_source.employers_without_announcements(start, end)
+    return names, names or ["All employers had jobs with applications."]
+
+
+def _available_positions(start, end):
+    positions = analytics_source.available_positions()
+    return positions, [f"{company}: {', '.join(titles)}" for company, titles in positions.items()] or \
+        ["No open positions found."]
+
+
+def _job_seeker_applications(start, end):
+    data, lines = [], []
+    for row in analytics_source.iter_job_seeker_applications():
+        data.append({'name': row.Name, 'email': row.Email, 'phone': row.Phone, 'industry': row.Industry,
+                     'location': row.PreferredLocation, 'jobs_applied': row.AppliedJobCount})
+        lines.append(f"{row.Name} ({row.Email}, {row.Phone}) - {row.Industry}, {row.PreferredLocation}: "
+                     f"{row.AppliedJobCount} jobs applied")
+    return data, lines or ["No job seekers found."]
+
+
+# name, title, function, whether it covers the time window
+SECTIONS = [
+    ("most_interesting_job", "Most Interesting Job", _most_interesting_job, True),
+    ("jobs_without_applicants", "Jobs with No Applicants", _jobs_without_applicants, True),
+    ("employer_max_announcements", "Employer with Max Announcements", _employer_max_announcements, True),
+    ("employers_without_announcements", "Employers with No Announcements", _employers_without_announcements, True),
+    ("available_positions", "Available Positions", _available_positions, False),
+    ("job_seeker_applications", "Job Seeker Applications", _job_seeker_applications, False),
+]
+
+
+# ─── Report ───────────────────────────────────────────
+def _run_section(name, title, fn, start, end):
+    started = time.perf_counter()
+    section = {'name': name, 'title': title, 'data': None, 'lines': [], 'error': None}
+    try:
+        section['data'], section['lines'] = fn(start, end)
+    except Exception as e:
+        # one failing query must not sink the rest of the report
+        section['error'] = str(e)
+    section['seconds'] = time.perf_counter() - started
+    return section
+
+
+def run_report(start=None, end=None, label=None, workers=REPORT_WORKERS):
+    """Run every analytics section concurrently and return the consolidated report as a dict.
+
+    The windowed sections cover start..end (last month by default); the
+    report takes about as long as its slowest section.
+    """
+    if start is None and end is None:
+        start, end, default_label = job_service.parse_window("")
+        label = label or default_label
+    label = label or f"{start} to {end}"
+    started = time.perf_counter()
+    workers = max(1, min(workers, len(SECTIONS), db_pool.POOL_MAX_SIZE))
+    section = profiler.bind(profiler.current(), _run_section)     # --profile counts the sections toward the action
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report") as executor:
+        futures = [executor.submit(section, name, f"{title} ({label})" if windowed else title, fn, start, end)
+                   for name, title, fn, windowed in SECTIONS]
+        sections = [future.result() for future in futures]
+    return {
+        'generated': datetime.now().isoformat(timespec="seconds"),
+        'window': {'label': label, 'start': start.isoformat(), 'end': end.isoformat()},
+        'seconds': time.perf_counter() - started,
+        'sections': sections,
+    }
+
+
+def format_report(report):
+    """The report as plain text"""
+    window = report['window']
+    lines = ["Job Application System - Analytics Report",
+             f"Generated: {report['generated']}",
+             f"Time Window: {window['label']} ({window['start']} to {window['end']})"]
+    for section in report['sections']:
+        lines += ["", f"== {section['title']} ({section['seconds']:.2f}s) =="]
+        lines += [f"Error: {section['error']}"] if section['error'] else section['lines']
+    slowest = max(section['seconds'] for section in report['sections'])
+    lines += ["", f"Completed in {report['seconds']:.2f}s (slowest section {slowest:.2f}s)"]
+    return "\n".join(lines)
+
+
+def export_report(report, path):
+    """Write the report to path: JSON for a .json file, plain text otherwise"""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            json.dump({**report, 'sections': [{key: value for key, value in section.items() if key != 'lines'}
+                                              for section in report['sections']]}, f, indent=2, default=str)
+        else:
+            f.write(format_report(report) + "\n")
@@ -0,0 +1,390 @@
+"""Benchmarks of every data access path of job_app_no_GUI.py on generated datasets.
+
+    python benchmark.py                                       # the small and medium datasets
+    python benchmark.py --sizes small large --save before.json
+    python benchmark.py --save after.json --compare before.json
+    python benchmark.py --db sqlite:///jobs.db --only login filter_vacancies
+
+Each size is a generate_data dataset at that scale. It is generated once
+into --data-dir and copied to a fresh file for every run, since the write
+paths change it; --db runs on an existing database as it is, writes
+included. A benchmark calls its path --repeat times with random arguments
+(seeded) after WARMUP calls, stopping early after --max-seconds, and
+reports p50/p95/p99 latency, throughput and the peak Python memory
+(tracemalloc) of one more call, measured apart because tracing slows
+everything down. The analytics run on the source the CLI uses
+(JOBAPP_ANALYTICS).
+
+--compare fails (exit status 1) when a benchmark's p50 or p95 is more
+than --threshold percent slower than in the saved results.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:         # Windows: no peak RSS
+    resource = None
+
+import analytics_engine
+import analytics_report
+import db_pool
+import generate_data
+import job_service
+import search_index
+import skill_matrix
+import trending
+
+SIZES = {"small": 0.01, "medium": 0.1, "large": 1.0, "xlarge": 10.0}   # scales of generate_data.VOLUMES
+DEFAULT_SIZES = ("small", "medium")
+DATA_DIR = os.path.join(tempfile.gettempdir(), "jobapp-benchmark")
+SEED = 42
+REPEAT = 50                 # timed calls per benchmark
+WARMUP = 3                  # untimed calls first, to fill caches and prepare statements
+MAX_SECONDS = 10.0          # a benchmark stops early after this long
+SAMPLE_SIZE = 2000          # users and jobs drawn from the database for arguments
+THRESHOLD = 25.0            # percent slower p50 or p95 that counts as a regression
+NOISE_MS = 0.5              # smaller differences are never regressions (timer and scheduler noise)
+
+analytics_source = analytics_report.analytics_source
+
+
+# ─── Arguments ───────────────────────────────────────────
+def _sample(rng, table, key, query, count):
+    """Up to count rows of query for random keys of table; query ends in "IN {ids}" """
+    with db_pool.connection() as conn:
+        low, high = conn.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}").fetchone()
+    if low is None:
+        return []
+    keys = rng.sample(range(low, high + 1), min(count * 2, high - low + 1))     # gaps are keys deleted since
+    rows = []
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        with db_pool.connection() as conn:
+            rows += conn.execute(query.format(ids=f"({', '.join('?' * len(chunk))})"), *chunk).fetchall()
+    rng.shuffle(rows)
+    return rows[:count]
+
+
+class Sample:
+    """IDs and filter values the benchmarks draw their arguments from.
+
+    The jobs and seekers the delete benchmarks remove are kept apart from
+    the ones the other benchmarks use.
+    """
+
+    def __init__(self, rng, count=SAMPLE_SIZE, doomed=REPEAT + WARMUP + 1):
+        seekers = [(row.UserID, row.Email) for row in _sample(rng, "JobSeeker", "UserID", """
+            SELECT u.UserID, u.Email FROM [User] u JOIN JobSeeker j ON j.UserID = u.UserID
+            WHERE j.UserID IN {ids}
+        """, count + doomed)]
+        split = min(doomed, len(seekers) // 2)
+        self.doomed_seekers, self.seekers = seekers[:split], seekers[split:]
+        self.employers = [(row.UserID, row.Email) for row in _sample(rng, "Employer", "UserID", """
+            SELECT u.UserID, u.Email FROM [User] u JOIN Employer e ON e.UserID = u.UserID
+            WHERE e.UserID IN {ids}
+        """, count)]
+        self.users = self.seekers + self.employers
+        jobs = _sample(rng, "VacancyJob", "JobID",
+                       "SELECT JobID, EmployerID, Title, Status FROM VacancyJob WHERE JobID IN {ids}", count + doomed)
+        split = min(doomed, len(jobs) // 2)
+        self.doomed_jobs = [(row.EmployerID, row.JobID) for row in jobs[:split]]
+        self.jobs = [row.JobID for row in jobs[split:]]
+        self.owned_jobs = [(row.EmployerID, row.JobID) for row in jobs[split:]]
+        self.open_jobs = [row.JobID for row in jobs[split:] if row.Status == "Open"] or self.jobs
+        self.words = [row.Title.split()[-1] for row in jobs] or ["engineer"]
+        with db_pool.connection() as conn:
+            self.industries = [row[0] for row in conn.execute(
+                "SELECT DISTINCT Industry FROM VacancyJob WHERE Industry IS NOT NULL").fetchall()] or ["Technology"]
+            self.locations = [row[0] for row in conn.execute(
+                "SELECT DISTINCT Location FROM VacancyJob WHERE Location IS NOT NULL").fetchall()] or ["Cairo"]
+        self.window = job_service.parse_window("")[:2]
+
+
+# ─── Benchmarks ───────────────────────────────────────────
+# Each is fn(sample, rng) making one call the CLI makes for a menu choice.
+def _list_jobs(sample, rng, after=False):
+    fetch_page = trending.open_jobs_page if trending.JOB_SORT == "trending" else job_service.open_jobs_page
+    return fetch_page(after=rng.choice(sample.jobs) if after else None)
+
+
+def _filter_vacancies(filters):
+    def run(sample, rng):
+        return job_service.filter_vacancies_page(
+            rng.choice(sample.industries) if "industry" in filters else None,
+            rng.choice(sample.locations) if "location" in filters else None,
+            rng.randint(0, 10) if "exp" in filters else None)
+    return run
+
+
+def _filter_job_seekers(filters):
+    def run(sample, rng):
+        return job_service.filter_job_seekers(
+            rng.choice(sample.industries) if "industry" in filters else None,
+            rng.choice(sample.locations) if "location" in filters else None,
+            rng.randint(0, 10) if "exp" in filters else None)
+    return run
+
+
+def _delete_job(sample, rng):
+    employer_id, job_id = sample.doomed_jobs.pop()
+    job_service.delete_job(employer_id, job_id)
+
+
+def _delete_user(sample, rng):
+    job_service.delete_user(sample.doomed_seekers.pop()[1])
+
+
+def _filter_names(filters):
+    return "+".join(filters) or "none"
+
+
+# every combination of the three filters, none included
+FILTERS = [[name for bit, name in enumerate(("industry", "location", "exp")) if mask >> bit & 1]
+           for mask in range(8)]
+
+# (name, fn) in run order: reads, analytics, writes, deletes
+BENCHMARKS = [
+    ("login", lambda s, r: job_service.authenticate(r.choice(s.users)[1], generate_data.PASSWORD)),
+    ("list_jobs", lambda s, r: _list_jobs(s, r)),
+    ("list_jobs_next_page", lambda s, r: _list_jobs(s, r, after=True)),
+] + [
+    (f"filter_vacancies[{_filter_names(filters)}]", _filter_vacancies(filters)) for filters in FILTERS
+] + [
+    (f"filter_job_seekers[{_filter_names(filters)}]", _filter_job_seekers(filters)) for filters in FILTERS
+] + [
+    ("search_vacancies", lambda s, r: search_index.search_jobs(r.choice(s.words))),
+    ("recommended_jobs", lambda s, r: skill_matrix.recommend_jobs(r.choice(s.seekers)[0])),
+    ("trending_jobs", lambda s, r: trending.trending_jobs(industry=r.choice([None] + s.industries))),
+    ("best_candidates", lambda s, r: skill_matrix.rank_candidates(*r.choice(s.owned_jobs))),
+    ("show_job_details", lambda s, r: job_service.get_job_details(r.choice(s.jobs))),
+    ("list_applications", lambda s, r: job_service.list_applications(r.choice(s.employers)[0])),
+    ("list_saved_jobs", lambda s, r: job_service.list_saved_jobs(r.choice(s.seekers)[0])),
+    ("most_interesting_job", lambda s, r: analytics_source.most_interesting_job(*s.window)),
+    ("jobs_without_applicants", lambda s, r: analytics_source.jobs_without_applicants(*s.window)),
+    ("employer_max_announcements", lambda s, r: analytics_source.employer_max_announcements(*s.window)),
+    ("employers_without_announcements", lambda s, r: analytics_source.employers_without_announcements(*s.window)),
+    ("available_positions", lambda s, r: analytics_source.available_positions()),
+    ("job_seeker_applications", lambda s, r: analytics_source.job_seeker_applications_page()),
+    ("full_report", lambda s, r: analytics_report.run_report(*s.window)),
+    ("apply_for_job", lambda s, r: job_service.apply(r.choice(s.seekers)[0], r.choice(s.open_jobs))),
+    ("save_job", lambda s, r: job_service.save(r.choice(s.seekers)[0], r.choice(s.open_jobs))),
+    ("delete_job", _delete_job),
+    ("delete_user", _delete_user),
+]
+
+
+def _percentile(ordered, fraction):
+    # nearest rank
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_benchmark(fn, sample, rng, repeat=REPEAT, max_seconds=MAX_SECONDS):
+    """Time repeat calls of fn; returns the result dict saved to JSON.
+
+    ServiceErrors (applying twice, a job closed meanwhile) are counted, not
+    raised: the app shows them as messages after the same queries.
+    """
+    errors = 0
+
+    def call():
+        nonlocal errors
+        try:
+            fn(sample, rng)
+        except job_service.ServiceError:
+            errors += 1
+
+    for _ in range(WARMUP):
+        call()
+    errors = 0
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter() - started < max_seconds):
+        before = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    ordered = sorted(times)
+    return {
+        'calls': len(times),
+        'errors': errors,
+        'p50_ms': _percentile(ordered, 0.5) * 1000,
+        'p95_ms': _percentile(ordered, 0.95) * 1000,
+        'p99_ms': _percentile(ordered, 0.99) * 1000,
+        'mean_ms': sum(times) * 1000 / len(times),
+        'max_ms': ordered[-1] * 1000,
+        'ops_per_s': len(times) / elapsed if elapsed else 0.0,
+        'peak_kb': peak / 1024,
+    }
+
+
+# ─── Datasets ───────────────────────────────────────────
+def use_database(url):
+    """Switch to url and drop everything cached from the previous database"""
+    job_service.switch_database(url)
+    trending.reset()
+    skill_matrix.reset()
+    search_index.reset_index()
+    analytics_engine.reset()
+
+
+def prepare_dataset(size, data_dir=DATA_DIR, seed=SEED, regenerate=False):
+    """Path of a fresh working copy of the size's dataset, generated on first use"""
+    os.makedirs(data_dir, exist_ok=True)
+    pristine = os.path.join(data_dir, f"{size}-seed{seed}.db")
+    if regenerate or not os.path.exists(pristine):
+        partial = pristine + ".partial"     # renamed once complete, so an interrupted run is not reused
+        if os.path.exists(partial):
+            os.remove(partial)
+        print(f"Generating the {size} dataset (scale {SIZES[size]}) into {pristine}...")
+        use_database(f"sqlite:///{partial}")
+        generate_data.generate(**{name: round(count * SIZES[size]) for name, count in generate_data.VOLUMES.items()},
+                               seed=seed, quiet=True)
+        use_database("sqlite:///:memory:")  # closes the file
+        os.replace(partial, pristine)
+    working = os.path.join(data_dir, f"{size}-run.db")
+    shutil.copyfile(pristine, working)
+    return working
+
+
+def _counts():
+    with db_pool.connection() as conn:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("[User]", "VacancyJob", "Application", "SavedVacancy")}
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if platform.system() == "Darwin" else peak    # bytes on macOS, KB elsewhere
+
+
+def run_suite(only=None, repeat=REPEAT, max_seconds=MAX_SECONDS, seed=SEED):
+    """Run the benchmarks (all, or those whose names start with one of only) on the current database"""
+    sample = Sample(random.Random(seed), doomed=repeat + WARMUP + 1)
+    results = {}
+    for name, fn in BENCHMARKS:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            # seeded per benchmark, so --only leaves the arguments of the others as they were
+            results[name] = run_benchmark(fn, sample, random.Random(f"{seed}:{name}"), repeat, max_seconds)
+        except (RuntimeError, IndexError) as e:
+            # numpy missing, or a delete benchmark out of rows to delete
+            results[name] = {'skipped': str(e) or type(e).__name__}
+    return results
+
+
+# ─── Report ───────────────────────────────────────────
+def format_results(results):
+    """Text table of one size's benchmark results"""
+    width = max([len("Benchmark")] + [len(name) for name in results])
+    lines = [f"{'Benchmark':<{width}} {'Calls':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+             f"{'Ops/s':>9} {'Peak KB':>9} {'Errors':>6}"]
+    for name, result in results.items():
+        if 'skipped' in result:
+            lines.append(f"{name:<{width}} skipped: {result['skipped']}")
+            continue
+        lines.append(f"{name:<{width}} {result['calls']:>5} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                     f"{result['p99_ms']:>9.2f} {result['ops_per_s']:>9.1f} {result['peak_kb']:>9.0f} "
+                     f"{result['errors']:>6}")
+    return "\n".join(lines)
+
+
+def compare(run, baseline, threshold=THRESHOLD):
+    """(lines, regressions) comparing p50 and p95 of every benchmark the two runs share"""
+    lines, regressions = [], []
+    for size, current in run['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size)
+        if previous is None:
+            continue
+        for name, result in current['benchmarks'].items():
+            old = previous['benchmarks'].get(name)
+            if old is None or 'skipped' in old or 'skipped' in result:
+                continue
+            changes = []
+            for metric in ("p50_ms", "p95_ms"):
+                change = (result[metric] - old[metric]) * 100 / old[metric] if old[metric] else 0.0
+                regressed = change > threshold and result[metric] - old[metric] > NOISE_MS
+                changes.append(f"{metric[:3]} {old[metric]:>9.2f} -> {result[metric]:>9.2f} ms "
+                               f"({change:+5.0f}%){' !' if regressed else '  '}")
+                if regressed:
+                    regressions.append(f"{size} {name} {metric[:3]}")
+            lines.append(f"{size:<6} {name:<42} {'  '.join(changes)}".rstrip())
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="benchmark this database as it is instead of generated datasets")
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=list(DEFAULT_SIZES),
+                        help="generated datasets to run on (default %(default)s)")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="benchmarks whose names start with these")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed calls per benchmark (default %(default)s)")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS,
+                        help="stop a benchmark early after this long (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the datasets and arguments")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where generated datasets are kept (default %(default)s)")
+    parser.add_argument("--regenerate", action="store_true", help="generate the datasets again")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="percent slower p50 or p95 that fails --compare (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    run = {
+        'started': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'analytics': analytics_engine.ANALYTICS_SOURCE,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'sizes': {},
+    }
+    targets = [("db", args.db)] if args.db else [(size, None) for size in args.sizes]
+    for size, url in targets:
+        if url is None:
+            url = "sqlite:///" + prepare_dataset(size, args.data_dir, args.seed, args.regenerate)
+        use_database(url)
+        rows = _counts()
+        print(f"\n== {size}: " + ", ".join(f"{table.strip('[]')} {count}" for table, count in rows.items()) + " ==")
+        benchmarks = run_suite(args.only, args.repeat, args.max_seconds, args.seed)
+        print(format_results(benchmarks))
+        run['sizes'][size] = {'rows': {table.strip("[]"): count for table, count in rows.items()},
+                              'benchmarks': benchmarks, 'peak_rss_kb': _peak_rss_kb()}
+    use_database("sqlite:///:memory:")      # flush write-behind buffers into the working copy and close it
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(run, baseline, args.threshold)
+        print(f"\nCompared with {args.compare} (started {baseline.get('started')}):")
+        print("\n".join(lines) or "No benchmarks in common.")
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.threshold:.0f}%: {', '.join(regressions)}")
+            return 1
+        print(f"No regressions over {args.threshold:.0f}%.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+import atexit
+import threading
+from collections import defaultdict
+
+import db_pool
+
+FLUSH_INTERVAL = 1.0        # seconds between background flushes
+FLUSH_THRESHOLD = 1000      # pending keys that trigger an early flush
+
+# Denormalized counters: name -> (table, column, key column)
+COUNTERS = {
+    "app_count": ("VacancyJob", "AppCount", "JobID"),
+    "applied_job_count": ("JobSeeker", "AppliedJobCount", "UserID"),
+    "announced_job_count": ("Employer", "AnnouncedJobCount", "UserID"),
+}
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+class CounterAggregator:
+    """Write-behind buffer for the denormalized counters.
+
+    add() only touches an in-memory dict, so concurrent applications to one
+    popular job never queue on that job's row lock. A background thread folds
+    the accumulated deltas into the tables every FLUSH_INTERVAL seconds, or
+    sooner once FLUSH_THRESHOLD keys are pending, as one batched UPDATE per
+    counter in key order so that concurrent flushers lock rows in the same
+    order. Deltas still in memory when a process dies are lost; the
+    reconcile_counters command recomputes the columns from their source rows.
+    """
+
+    thread_name = "counter-flush"
+
+    def __init__(self, interval=FLUSH_INTERVAL, threshold=FLUSH_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()     # one flush at a time
+        self._pending = defaultdict(int)        # (counter, key) -> delta not yet written
+        self._in_flight = {}                    # deltas of the flush in progress
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+
+    def add(self, counter, key, delta=1):
+        """Queue counter[key] += delta"""
+        self._check(counter)
+        with self._lock:
+            self._pending[(counter, key)] += delta
+            if not self._pending[(counter, key)]:
+                del self._pending[(counter, key)]
+            pending = len(self._pending)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        if pending >= self.threshold:
+            self._wake.set()
+
+    def pending(self, counter, key):
+        """Delta for counter[key] that is not in the table yet"""
+        with self._lock:
+            return self._pending.get((counter, key), 0) + self._in_flight.get((counter, key), 0)
+
+    def flush(self):
+        """Write every pending delta now; returns the number of rows updated"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, defaultdict(int)
+                self._in_flight = batch
+            if not batch:
+                return 0
+            try:
+                db_pool.transaction(lambda conn: self._write(conn, batch))
+            except Exception:
+                # put the deltas back so the next flush retries them
+                with self._lock:
+                    for item, delta in batch.items():
+                        self._pending[item] += delta
+                    self._in_flight = {}
+                self.failures += 1
+                raise
+            with self._lock:
+                self._in_flight = {}
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+            return len(batch)
+
+    def _check(self, counter):
+        if counter not in COUNTERS:
+            raise ValueError(f"Unknown counter: {counter}")
+
+    def _write(self, conn, batch):
+        # one batched UPDATE per counter, rows in key order
+        for counter in sorted(COUNTERS):
+            table, column, key_column = COUNTERS[counter]
+            rows = sorted((key, delta) for (name, key), delta in batch.items() if name == counter)
+            if rows:
+                conn.executemany(f"UPDATE {table} SET {column} = {column} + ? WHERE {key_column} = ?",
+                                 [(delta, key) for key, delta in rows])
+
+    def close(self):
+        """Stop the background thread and write what is left"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Counter flush failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {'pending': pending, 'flushes': self.flushes, 'flushed_rows': self.flushed_rows,
+                'failures': self.failures}
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Counter flush failed: {e}")
+
+
+def get_aggregator():
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = CounterAggregator()
+        return _aggregator
+
+
+def reset_aggregator():
+    """Flush and drop the process-wide aggregator (e.g. before switching databases)"""
+    global _aggregator
+    with _aggregator_lock:
+        aggregator, _aggregator = _aggregator, None
+    if aggregator is not None:
+        aggregator.close()
+
+
+def add(counter, key, delta=1):
+    """Shortcut for get_aggregator().add()"""
+    get_aggregator().add(counter, key, delta)
+
+
+def flush():
+    """Write pending deltas now, e.g. before a query that reads the counter columns"""
+    with _aggregator_lock:
+        aggregator = _aggregator
+    return aggregator.flush() if aggregator is not None else 0
+
+
+def value(counter, key):
+    """Current value of counter[key]: the stored column plus unflushed deltas, or None if no such row"""
+    table, column, key_column = COUNTERS[counter]
+    with db_pool.connection() as conn:
+        row = conn.execute(f"SELECT {column} FROM {table} WHERE {key_column} = ?", key).fetchone()
+    if row is None:
+        return None
+    return (row[0] or 0) + get_aggregator().pending(counter, key)
@@ -0,0 +1,219 @@
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+
+try:
+    import pyodbc
+except ImportError:         # SQLite-only installs (laptops, CI) do not need the ODBC driver
+    pyodbc = None
+
+# Database connection configuration
+CONN_STR = (
+    r"DRIVER={ODBC Driver 17 for SQL Server};"
+    r"SERVER=ALIOSAMA155\SQLEXPRESS;"
+    r"DATABASE=my_project;"
+    r"Trusted_Connection=Yes;"
+)
+
+# Backend selection: "mssql" (default), "sqlite:///path/to/file.db" or "sqlite:///:memory:"
+DB_URL = os.environ.get("JOBAPP_DB", "mssql")
+
+DDL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DDL.ddl")
+
+# Exception classes raised on constraint violations by any available driver
+INTEGRITY_ERRORS = (sqlite3.IntegrityError,) + ((pyodbc.IntegrityError,) if pyodbc else ())
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class SqlServerBackend:
+    """SQL Server through pyodbc; queries are already written in T-SQL"""
+
+    name = "mssql"
+
+    def __init__(self, conn_str=CONN_STR):
+        if pyodbc is None:
+            raise RuntimeError("pyodbc is required for the SQL Server backend")
+        self.conn_str = conn_str
+
+    def connect(self):
+        return pyodbc.connect(self.conn_str)
+
+    def close(self):
+        pass
+
+
+# ─── SQLite ───────────────────────────────────────────
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()))
+
+_OUTPUT_INSERTED = re.compile(r"\bOUTPUT\s+INSERTED\.(\w+)\s*", re.IGNORECASE)
+_IDENTITY = re.compile(r"\bINT\s+IDENTITY\s*\(\s*1\s*,\s*1\s*\)\s+PRIMARY\s+KEY", re.IGNORECASE)
+_CREATE = re.compile(r"\bCREATE\s+((?:UNIQUE\s+)?(?:TABLE|INDEX))\s+(?!IF\s)", re.IGNORECASE)
+_OFFSET_FETCH = re.compile(r"\bOFFSET\s+\?\s+ROWS\s+FETCH\s+NEXT\s+\?\s+ROWS\s+ONLY", re.IGNORECASE)
+_translated = {}
+_row_classes = {}
+
+
+def to_sqlite(sql):
+    """Rewrite the T-SQL used by the app into the equivalent SQLite statement"""
+    cached = _translated.get(sql)
+    if cached is not None:
+        return cached
+    out = sql
+    match = _OUTPUT_INSERTED.search(out)
+    if match:
+        out = _OUTPUT_INSERTED.sub("", out).rstrip().rstrip(";") + f" RETURNING {match.group(1)}"
+    out = _IDENTITY.sub("INTEGER PRIMARY KEY AUTOINCREMENT", out)
+    out = _OFFSET_FETCH.sub("LIMIT ?, ?", out)      # SQLite's LIMIT offset, count keeps parameter order
+    _translated[sql] = out
+    return out
+
+
+def _row_factory(cursor, values):
+    # Mimic pyodbc.Row: indexable like a tuple, columns readable as attributes
+    names = tuple(col[0] for col in cursor.description)
+    cls = _row_classes.get(names)
+    if cls is None:
+        index = {name: i for i, name in enumerate(names)}
+
+        def __getattr__(self, name):
+            try:
+                return self[index[name]]
+            except KeyError:
+                raise AttributeError(name) from None
+
+        cls = type("Row", (tuple,), {"__slots__": (), "__getattr__": __getattr__,
+                                     "cursor_description": cursor.description})
+        _row_classes[names] = cls
+    return cls(values)
+
+
+def _params(params):
+    # pyodbc accepts both execute(sql, a, b) and execute(sql, (a, b))
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        return tuple(params[0])
+    return params
+
+
+class SqliteCursor:
+    """pyodbc-style cursor over sqlite3"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def execute(self, sql, *params):
+        self._raw.execute(to_sqlite(sql), _params(params))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._raw.executemany(to_sqlite(sql), seq_of_params)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+
+class SqliteConnection:
+    """pyodbc-style connection over sqlite3"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def cursor(self):
+        return SqliteCursor(self._raw.cursor())
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class SqliteBackend:
+    """SQLite file or in-memory database bootstrapped from DDL.ddl"""
+
+    name = "sqlite"
+
+    def __init__(self, path=":memory:", ddl_path=DDL_PATH):
+        if path == ":memory:":
+            # Shared-cache URI so every pooled connection sees the same database;
+            # the keeper connection holds it open for the life of the backend.
+            self._target = f"file:jobapp-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self._target = "file:" + os.path.abspath(path)
+        self.path = path
+        self._keeper = self._open()
+        self.bootstrap(ddl_path)
+
+    def _open(self):
+        raw = sqlite3.connect(self._target, uri=True, check_same_thread=False,
+                              detect_types=sqlite3.PARSE_DECLTYPES, timeout=30)
+        raw.row_factory = _row_factory
+        raw.execute("PRAGMA foreign_keys = ON")
+        return raw
+
+    def connect(self):
+        return SqliteConnection(self._open())
+
+    def bootstrap(self, ddl_path=DDL_PATH):
+        """Create whatever tables and indexes of DDL.ddl the database does not have yet.
+
+        A database made from an older DDL.ddl gets the objects added since.
+        One that cannot be created (a unique index over duplicate rows) is
+        reported and skipped.
+        """
+        with open(ddl_path, encoding="utf-8") as f:
+            script = _CREATE.sub(r"CREATE \1 IF NOT EXISTS ", to_sqlite(f.read()))
+        for statement in script.split(";"):
+            try:
+                self._keeper.execute(statement)
+            except sqlite3.Error as e:
+                print(f"Could not apply DDL.ddl statement {' '.join(statement.split())[:80]!r}: {e}")
+        self._keeper.commit()
+
+    def close(self):
+        self._keeper.close()
+
+
+def create_backend(url):
+    """Build a backend from a URL such as "mssql" or "sqlite:///jobs.db" """
+    if url == "mssql" or url.startswith("mssql:"):
+        conn_str = url[len("mssql:"):] if url.startswith("mssql:") else CONN_STR
+        return SqlServerBackend(conn_str or CONN_STR)
+    if url.startswith("sqlite:///"):
+        return SqliteBackend(url[len("sqlite:///"):] or ":memory:")
+    raise ValueError(f"Unsupported database URL: {url}")
+
+
+def get_backend():
+    """Return the configured process-wide backend"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(DB_URL)
+        return _backend
+
+
+def set_backend(backend):
+    """Install a backend (or a URL for one) and close the old one.
+
+    Only for startup: to switch a running app, whose pool and write-behind
+    buffers still hold the old database, use job_service.switch_database().
+    """
+    global _backend
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    with _backend_lock:
+        old, _backend = _backend, backend
+    if old is not None and old is not backend:
+        old.close()
+    return backend
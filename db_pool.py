@@ -0,0 +1,434 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import db_backend
+import query_stats
+
+# Pool configuration
+POOL_MIN_SIZE = 2           # connections opened up front by warm()
+POOL_MAX_SIZE = 10          # hard bound on open connections
+POOL_MAX_IDLE = 300         # seconds an idle connection may sit before eviction
+POOL_CHECK_AFTER = 30       # ping connections idle longer than this on checkout
+POOL_TIMEOUT = 30           # seconds to wait for a free connection
+STATEMENT_CACHE_SIZE = 64   # prepared statements kept per connection
+
+# Transaction retries (see transaction())
+TX_RETRIES = 4              # attempts after the first when a transaction loses a lock conflict
+TX_BACKOFF = 0.05           # seconds; the wait before retry n is random between 0 and TX_BACKOFF * 2**n
+TX_RETRY_BUDGET = 5.0       # seconds a transaction may spend failing and waiting before the error is raised
+
+_pool = None
+_pool_lock = threading.Lock()
+_checkout_listeners = []    # fn(seconds) after each checkout, with the time spent waiting and connecting
+_tx_stats = {"transactions": 0, "retried": 0, "retries": 0, "deadlocks": 0, "lock_timeouts": 0, "gave_up": 0}
+_tx_stats_lock = threading.Lock()
+
+
+class PoolError(Exception):
+    """Raised when the pool cannot hand out a connection"""
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes free within the checkout timeout"""
+
+
+class StatementCache:
+    """Per-connection LRU of cursors keyed by SQL text.
+
+    Re-executing the same SQL on the same cursor lets the driver reuse the
+    prepared statement instead of parsing and preparing it again.
+    """
+
+    def __init__(self, raw, size=STATEMENT_CACHE_SIZE):
+        self._raw = raw
+        self._size = size
+        self._cursors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cursor_for(self, sql):
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self.hits += 1
+            self._cursors.move_to_end(sql)
+            return cursor
+        self.misses += 1
+        cursor = self._raw.cursor()
+        self._cursors[sql] = cursor
+        if len(self._cursors) > self._size:
+            _, oldest = self._cursors.popitem(last=False)
+            _close_quietly(oldest)
+        return cursor
+
+    def close(self):
+        for cursor in self._cursors.values():
+            _close_quietly(cursor)
+        self._cursors.clear()
+
+
+class PooledConnection:
+    """Connection proxy that hands the real connection back to its pool on close()"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._statements = pool._statement_cache(raw)
+        self._timed = {}            # id(cursor) -> TimedCursor whose results may still be read
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise PoolError("Connection has been returned to the pool")
+        return getattr(self._raw, name)
+
+    def execute(self, sql, *params):
+        """Execute on the cached cursor for this SQL text and return that cursor"""
+        if self._raw is None:
+            raise PoolError("Connection has been returned to the pool")
+        cursor = self._statements.cursor_for(sql)
+        if not query_stats.ENABLED:
+            cursor.execute(sql, *params)
+            return cursor
+        return self._timed_execute(cursor, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        if self._raw is None:
+            raise PoolError("Connection has been returned to the pool")
+        cursor = self._statements.cursor_for(sql)
+        if hasattr(cursor, "fast_executemany"):
+            cursor.fast_executemany = True      # pyodbc: send all parameter sets in one round trip
+        if not query_stats.ENABLED:
+            cursor.executemany(sql, seq_of_params)
+            return cursor
+        return self._timed_execute(cursor, sql, seq_of_params, many=True)
+
+    def _timed_execute(self, cursor, sql, params, many=False):
+        # running the cached cursor again ends the previous statement's results
+        previous = self._timed.pop(id(cursor), None)
+        if previous is not None:
+            previous.finish()
+        timed = query_stats.execute(cursor, sql, params, many)
+        if not timed.done:
+            self._timed[id(cursor)] = timed
+        return timed
+
+    def close(self):
+        for timed in self._timed.values():
+            timed.finish()
+        self._timed.clear()
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._raw is not None:
+            if exc_type is None:
+                self._raw.commit()
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """Bounded pool of reusable database connections"""
+
+    def __init__(self, connect, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 max_idle=POOL_MAX_IDLE, check_after=POOL_CHECK_AFTER, timeout=POOL_TIMEOUT):
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+        self._idle = []             # (raw connection, released_at), most recent last
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._statements = {}       # id(raw connection) -> StatementCache
+        self._retired_statements = [0, 0]
+        self._stats = {
+            "checkouts": 0,
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+            "health_check_failures": 0,
+            "evictions": 0,
+        }
+
+    def warm(self):
+        """Open connections until min_size are idle in the pool"""
+        with self._cond:
+            missing = min(self.min_size, self.max_size) - self._open
+            self._open += max(missing, 0)
+        opened = []
+        try:
+            for _ in range(max(missing, 0)):
+                opened.append(self._connect())
+        finally:
+            with self._cond:
+                self._open -= max(missing, 0) - len(opened)
+                now = time.monotonic()
+                self._idle.extend((raw, now) for raw in opened)
+                self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        """Check out a healthy connection, waiting if the pool is exhausted"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        waited = False
+        stale = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                stale.extend(self._evict_idle())
+                if self._idle:
+                    raw, released_at = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    raw = None
+                    break
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._record_wait(started, waited)
+                    raise PoolTimeout(f"No database connection free after {timeout}s")
+                waited = True
+                self._cond.wait(remaining)
+            self._stats["checkouts"] += 1
+            self._record_wait(started, waited)
+        for old in stale:
+            self._discard(old)
+
+        if raw is not None and (time.monotonic() - released_at) > self.check_after:
+            if not self._is_healthy(raw):
+                # the replacement opened below takes over the dead connection's slot
+                self._discard(raw)
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                raw = None
+        if raw is None:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["misses"] += 1
+        else:
+            with self._cond:
+                self._stats["hits"] += 1
+        for listener in _checkout_listeners:
+            listener(time.monotonic() - started)
+        return PooledConnection(self, raw)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager: commit on success, roll back on error, always return to pool"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        """Snapshot of pool counters including hit rate and average wait"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["open"] = self._open
+            stats["idle"] = len(self._idle)
+            caches = list(self._statements.values())
+        stats["statement_hits"] = self._retired_statements[0] + sum(c.hits for c in caches)
+        stats["statement_misses"] = self._retired_statements[1] + sum(c.misses for c in caches)
+        checkouts = stats["checkouts"]
+        stats["hit_rate"] = stats["hits"] / checkouts if checkouts else 0.0
+        stats["avg_wait"] = stats["wait_time"] / checkouts if checkouts else 0.0
+        return stats
+
+    def _release(self, raw):
+        try:
+            raw.rollback()      # never hand out a connection with an open transaction
+        except Exception:
+            self._discard(raw)
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                discard = True
+            else:
+                self._idle.append((raw, time.monotonic()))
+                discard = False
+            self._cond.notify()
+        if discard:
+            self._discard(raw)
+
+    def _evict_idle(self):
+        # Caller holds self._cond and closes the returned connections after releasing it.
+        # Oldest idle connections sit at the front.
+        cutoff = time.monotonic() - self.max_idle
+        stale = []
+        while self._idle and self._idle[0][1] < cutoff and self._open > self.min_size:
+            raw, _ = self._idle.pop(0)
+            self._open -= 1
+            self._stats["evictions"] += 1
+            stale.append(raw)
+        return stale
+
+    def _record_wait(self, started, waited):
+        if waited:
+            elapsed = time.monotonic() - started
+            self._stats["waits"] += 1
+            self._stats["wait_time"] += elapsed
+            self._stats["max_wait"] = max(self._stats["max_wait"], elapsed)
+
+    @staticmethod
+    def _is_healthy(raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _statement_cache(self, raw):
+        with self._cond:
+            cache = self._statements.get(id(raw))
+            if cache is None:
+                cache = self._statements[id(raw)] = StatementCache(raw)
+            return cache
+
+    def _discard(self, raw):
+        with self._cond:
+            cache = self._statements.pop(id(raw), None)
+            if cache is not None:
+                self._retired_statements[0] += cache.hits
+                self._retired_statements[1] += cache.misses
+        if cache is not None:
+            cache.close()
+        _close_quietly(raw)
+
+
+def _close_quietly(resource):
+    try:
+        resource.close()
+    except Exception:
+        pass
+
+
+def get_pool():
+    """Return the process-wide pool, creating and pre-warming it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(db_backend.get_backend().connect)
+            try:
+                _pool.warm()
+            except Exception:
+                pass        # the first acquire() will surface the connection error
+        return _pool
+
+
+def reset_pool():
+    """Close the process-wide pool so the next get_pool() builds a fresh one"""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, None
+    if old is not None:
+        old.close_all()
+
+
+def add_checkout_listener(listener):
+    """Call listener(seconds) after every checkout from a pool"""
+    if listener not in _checkout_listeners:
+        _checkout_listeners.append(listener)
+
+
+def connection(timeout=None):
+    """Shortcut for get_pool().connection()"""
+    return get_pool().connection(timeout)
+
+
+# ─── Transactions ───────────────────────────────────────────
+def conflict(error):
+    """'deadlocks' or 'lock_timeouts' if error says the transaction lost a lock conflict, else None"""
+    text = str(error).lower()
+    # SQL Server: 1205 chose a deadlock victim (SQLSTATE 40001), 1222 lock request timed out.
+    # SQLite reports both as "database is locked", at once when waiting could only deadlock.
+    if "deadlock" in text or "40001" in text or "(1205)" in text:
+        return "deadlocks"
+    if "database is locked" in text or "lock request time out" in text or "(1222)" in text:
+        return "lock_timeouts"
+    return None
+
+
+def _count(**deltas):
+    with _tx_stats_lock:
+        for name, delta in deltas.items():
+            _tx_stats[name] += delta
+
+
+def transaction(fn, timeout=None, retries=TX_RETRIES, budget=TX_RETRY_BUDGET):
+    """Run fn(conn) in one transaction and return its result, retrying it after deadlocks and lock timeouts.
+
+    The database rolls a losing transaction back, so fn runs again from the
+    start after a random, doubling wait, up to retries times or until budget
+    seconds have gone by. fn must therefore only touch the database; work
+    that depends on the commit (caches, counters) belongs after the call.
+    Other errors are raised at once.
+    """
+    _count(transactions=1)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            with connection(timeout) as conn:
+                result = fn(conn)
+        except Exception as e:
+            kind = conflict(e)
+            if kind is None:
+                raise
+            _count(**{kind: 1})
+            delay = random.uniform(0, TX_BACKOFF * 2 ** attempt)
+            if attempt >= retries or time.monotonic() - started + delay > budget:
+                _count(gave_up=1)
+                raise
+            attempt += 1
+            _count(retries=1)
+            time.sleep(delay)
+            continue
+        if attempt:
+            _count(retried=1)
+        return result
+
+
+def transaction_stats():
+    """Counts since start: transactions, retried (succeeded on a retry), retries, deadlocks, lock_timeouts, gave_up"""
+    with _tx_stats_lock:
+        return dict(_tx_stats)
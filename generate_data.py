@@ -0,0 +1,470 @@
+"""Fill the database with synthetic users, vacancies and activity at production scale.
+
+    python generate_data.py --db sqlite:///big.db                   # the VOLUMES below
+    python generate_data.py --db sqlite:///big.db --scale 10        # 10M applications
+    python generate_data.py --applications 50000 --seed 7
+
+Rows are added to whatever the database already holds. They are skewed
+like real traffic: job popularity follows a Zipf law, a few seekers apply
+to far more jobs than the rest, most activity stays in the seeker's own
+industry, and ApplyDate and SaveDate follow the hiring season (busy in
+January and September, quiet in summer and at weekends) over the last
+DAYS days. IDs are assigned here, so rows stream straight into executemany
+batches of BATCH_SIZE, parents first, without reading anything back; a
+background thread writes one batch while the next is generated. The
+secondary indexes of DDL.ddl on the loaded tables are dropped for the load
+and built once at the end (--keep-indexes when the app is running on the
+database), then the counters and rollups are filled in.
+
+Every generated user's password is "password"; emails are
+employer<UserID>@example.com and seeker<UserID>@example.com.
+"""
+import argparse
+import contextlib
+import io
+import queue
+import random
+import re
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+
+import db_backend
+import db_pool
+import job_service
+import rollups
+import skill_matrix
+
+# Rows generated at --scale 1
+VOLUMES = {
+    "employers": 2000,
+    "seekers": 100000,
+    "jobs": 20000,
+    "applications": 1000000,
+    "saves": 300000,
+}
+DAYS = 730                  # ApplyDate and SaveDate fall within this many days up to today
+BATCH_SIZE = 10000          # rows per transaction
+PASSWORD = "password"
+JOB_SKEW = 0.8              # Zipf exponent of job popularity; at scale 1 the hottest job gets ~1.5% of applications
+ACTIVITY_SIGMA = 1.0        # lognormal spread of seeker activity and employer size
+OWN_INDUSTRY = 0.7          # share of a seeker's applications, saves and skills in their own industry
+OWN_LOCATION = 0.7          # share of an employer's jobs in its own location
+CLOSED_JOBS = 0.15          # share of vacancies already closed
+SKILLS_PER_SEEKER = (2, 8)
+SKILLS_PER_JOB = (1, 4)
+MAX_PER_SEEKER = 500        # applications (and saves) of one seeker at most
+MONTH_WEIGHTS = (1.3, 1.2, 1.1, 1.0, 0.9, 0.8, 0.7, 0.8, 1.3, 1.1, 1.0, 0.7)    # January to December
+WEEKEND = (4, 5)            # Friday and Saturday
+WEEKEND_WEIGHT = 0.4
+DECIDED_AFTER = 60          # days until most applications have been accepted or rejected
+ACCEPTED_SHARE = 0.2        # of decided applications
+
+# industry -> (share of employers and seekers, job titles, skills)
+INDUSTRIES = {
+    "Technology": (0.25, ("Software Engineer", "Data Analyst", "DevOps Engineer", "QA Engineer", "Backend Developer"),
+                   ("Python", "Java", "SQL", "JavaScript", "Cloud Computing", "Machine Learning", "Docker", "Linux")),
+    "Finance": (0.12, ("Accountant", "Financial Analyst", "Auditor", "Credit Officer"),
+                ("Accounting", "Financial Analysis", "Excel", "Risk Management", "Auditing", "SQL")),
+    "Healthcare": (0.1, ("Nurse", "Pharmacist", "Lab Technician", "Medical Representative"),
+                   ("Patient Care", "Nursing", "Pharmacology", "Medical Coding", "First Aid")),
+    "Education": (0.08, ("Teacher", "Instructor", "Tutor", "Curriculum Developer"),
+                  ("Teaching", "Curriculum Design", "Classroom Management", "English", "Tutoring")),
+    "Marketing": (0.1, ("Marketing Specialist", "Content Writer", "SEO Specialist", "Brand Manager"),
+                  ("SEO", "Content Writing", "Social Media", "Market Research", "Google Analytics", "English")),
+    "Manufacturing": (0.09, ("Production Engineer", "Quality Inspector", "Maintenance Technician"),
+                      ("Quality Control", "Lean Manufacturing", "AutoCAD", "Machine Operation", "Site Safety")),
+    "Retail": (0.1, ("Sales Associate", "Store Manager", "Cashier", "Merchandiser"),
+               ("Customer Service", "Sales", "Inventory Management", "Merchandising", "Excel")),
+    "Construction": (0.06, ("Site Engineer", "Civil Engineer", "Project Coordinator"),
+                     ("Project Management", "AutoCAD", "Site Safety", "Surveying", "Excel")),
+    "Hospitality": (0.05, ("Receptionist", "Chef", "Hotel Manager", "Waiter"),
+                    ("Customer Service", "Food Safety", "Event Planning", "English")),
+    "Logistics": (0.05, ("Logistics Coordinator", "Warehouse Supervisor", "Driver"),
+                  ("Supply Chain", "Inventory Management", "Route Planning", "Forklift Operation")),
+}
+LOCATIONS = {"Cairo": 0.35, "Giza": 0.15, "Alexandria": 0.15, "Mansoura": 0.06, "Tanta": 0.05, "Assiut": 0.04,
+             "Ismailia": 0.04, "Suez": 0.04, "Luxor": 0.03, "Aswan": 0.03, "Port Said": 0.03, "Remote": 0.03}
+SENIORITY = (("Junior ", 0, 1), ("", 1, 4), ("", 2, 5), ("Senior ", 5, 8), ("Lead ", 8, 12))    # prefix, experience
+FIRST_NAMES = ("Ahmed", "Mohamed", "Omar", "Ali", "Youssef", "Mahmoud", "Mostafa", "Khaled", "Hassan", "Karim",
+               "Sara", "Nour", "Mariam", "Fatma", "Aya", "Salma", "Heba", "Yasmin", "Mona", "Laila")
+LAST_NAMES = ("Hassan", "Ibrahim", "Mahmoud", "Abdelrahman", "Saleh", "Fathy", "Mansour", "Farouk", "Naguib",
+              "Shawky", "Soliman", "Gamal", "Rizk", "Zaki", "Osman", "Kamel", "Samir", "Adel", "Nabil", "Tawfik")
+COMPANY_WORDS = ("Nile", "Delta", "Pyramid", "Horizon", "Sphinx", "Lotus", "Falcon", "Oasis", "Cedar", "Atlas",
+                 "Summit", "Crescent", "Vertex", "Golden", "Blue", "Alpha", "Nova", "Union", "Royal", "Smart")
+COMPANY_SUFFIXES = ("Group", "Solutions", "Holdings", "Co.", "Partners", "Systems", "Industries", "Services")
+
+# Tables in foreign key order: (table, columns, whether the identity column is given)
+TABLES = (
+    ("[User]", ("UserID", "Name", "Email", "Phone", "Role", "Password"), True),
+    ("Employer", ("UserID", "ComName", "ComIndustry", "Location", "AnnouncedJobCount"), False),
+    ("JobSeeker", ("UserID", "ResumeLink", "Industry", "PreferredLocation", "AppliedJobCount"), False),
+    ("VacancyJob", ("JobID", "EmployerID", "Title", "Description", "Industry", "Location", "ReqSkill",
+                    "EXPRequired", "AppCount", "Status"), True),
+    ("HasSkills", ("UserID", "SkillID", "EXPYears"), False),
+    ("Application", ("JobID", "SeekerID", "Status", "ApplyDate"), False),
+    ("SavedVacancy", ("JobID", "SeekerID", "SaveDate"), False),
+)
+
+_CREATE_INDEX = re.compile(r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*\([^)]*\)",
+                           re.IGNORECASE | re.MULTILINE)
+
+
+def _indexes(tables):
+    """(name, table, CREATE INDEX statement) of the DDL.ddl indexes on the given tables"""
+    with open(db_backend.DDL_PATH, encoding="utf-8") as f:
+        return [(match.group(1), match.group(2), match.group(0)) for match in _CREATE_INDEX.finditer(f.read())
+                if match.group(2) in tables]
+
+
+def _drop_indexes(indexes):
+    # a load into indexed tables spends most of its time updating the indexes row by row
+    on_table = db_backend.get_backend().name == "mssql"
+    with db_pool.connection() as conn:
+        for name, table, _ in indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {name} ON {table}" if on_table else f"DROP INDEX IF EXISTS {name}")
+
+
+def _create_indexes(indexes):
+    for _, _, create in indexes:
+        with db_pool.connection() as conn:
+            conn.execute(create)
+
+
+def _insert(conn, table, columns, rows, identity=False):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    # SQL Server only takes explicit values for an IDENTITY column with IDENTITY_INSERT on
+    explicit = identity and db_backend.get_backend().name == "mssql"
+    if explicit:
+        conn.execute(f"SET IDENTITY_INSERT {table} ON")
+    conn.executemany(sql, rows)
+    if explicit:
+        conn.execute(f"SET IDENTITY_INSERT {table} OFF")
+
+
+class BulkLoader:
+    """Buffers generated rows and writes every batch_size of them in one transaction, parents first.
+
+    Batches are written in order by one background thread, so generating
+    the next batch overlaps the database work of the last one.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.written = {table: 0 for table, _, _ in TABLES}
+        self._pending = {table: [] for table, _, _ in TABLES}
+        self._size = 0
+        self._queue = queue.Queue(maxsize=2)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="bulk-loader", daemon=True)
+        self._thread.start()
+
+    def add(self, table, row):
+        self._pending[table].append(row)
+        self._size += 1
+        if self._size >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Hand the buffered rows to the writer"""
+        if self._error is not None:
+            raise self._error
+        if self._size:
+            self._queue.put(self._pending)
+            self._pending = {table: [] for table, _, _ in TABLES}
+            self._size = 0
+
+    def close(self):
+        """Write everything still buffered and wait for it"""
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                continue        # keep draining so flush() never blocks; the error is raised there
+            try:
+                with db_pool.connection() as conn:
+                    for table, columns, identity in TABLES:
+                        if batch[table]:
+                            _insert(conn, table, columns, batch[table], identity)
+                for table, rows in batch.items():
+                    self.written[table] += len(rows)
+            except Exception as e:
+                self._error = e
+
+
+def _cumulative(weights):
+    return list(accumulate(weights))
+
+
+def _zipf(rng, n, skew):
+    """Popularity weights of n items with ranks shuffled, so hot items are spread over the IDs"""
+    ranks = list(range(1, n + 1))
+    rng.shuffle(ranks)
+    return [rank ** -skew for rank in ranks]
+
+
+def _shares(rng, targets, weights):
+    """Split each total in targets over the items in proportion to weights.
+
+    Yields one tuple of counts per item; every total comes out exact.
+    """
+    scale = [target / sum(weights) for target in targets]
+    given = [0] * len(targets)
+    running = 0.0
+    for weight in weights:
+        running += weight
+        counts = []
+        for index, target in enumerate(scale):
+            count = round(running * target) - given[index]
+            given[index] += count
+            counts.append(count)
+        yield counts
+
+
+def _next_id(table, column):
+    with db_pool.connection() as conn:
+        return conn.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+
+
+def _skill_ids():
+    """{industry: [SkillID]} of INDUSTRIES' skills, adding the ones the Skills table lacks"""
+    with db_pool.connection() as conn:
+        known = {skill_matrix.skill_key(row.SkillName): row.SkillID
+                 for row in conn.execute("SELECT SkillID, SkillName FROM Skills").fetchall()}
+        for industry, (_, _, skills) in INDUSTRIES.items():
+            for name in skills:
+                if skill_matrix.skill_key(name) not in known:
+                    known[skill_matrix.skill_key(name)] = conn.execute(
+                        "INSERT INTO Skills (SkillName, SkillCategory, Description) OUTPUT INSERTED.SkillID "
+                        "VALUES (?, ?, ?)", name, industry, f"{name} ({industry})").fetchone().SkillID
+    return {industry: [known[skill_matrix.skill_key(name)] for name in skills]
+            for industry, (_, _, skills) in INDUSTRIES.items()}
+
+
+class DataGenerator:
+    """Generates one dataset into a BulkLoader; see the module docstring for its shape"""
+
+    def __init__(self, seed=None, days=DAYS, today=None):
+        self.rng = random.Random(seed)
+        self.industries = list(INDUSTRIES)
+        self.industry_weights = _cumulative(share for share, _, _ in INDUSTRIES.values())
+        self.locations = list(LOCATIONS)
+        self.location_weights = _cumulative(LOCATIONS.values())
+        today = today or date.today()
+        self.days = [today - timedelta(days=days - 1 - i) for i in range(days)]
+        self.day_weights = _cumulative(MONTH_WEIGHTS[day.month - 1] *
+                                       (WEEKEND_WEIGHT if day.weekday() in WEEKEND else 1) for day in self.days)
+        # chance an application of each day has been decided by today
+        self.decided = [min((today - day).days / DECIDED_AFTER, 0.9) for day in self.days]
+
+    def _industry(self):
+        return self.rng.choices(range(len(self.industries)), cum_weights=self.industry_weights)[0]
+
+    def _location(self):
+        return self.rng.choices(self.locations, cum_weights=self.location_weights)[0]
+
+    def _person(self):
+        # (name, Egyptian mobile number)
+        rng = self.rng
+        return (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                f"01{rng.choice('0125')}{rng.randrange(10 ** 8):08d}")
+
+    def _company(self, index):
+        words, suffixes = len(COMPANY_WORDS), len(COMPANY_SUFFIXES)
+        name = f"{COMPANY_WORDS[index % words]} {COMPANY_WORDS[index // words % words]} " \
+               f"{COMPANY_SUFFIXES[index // words // words % suffixes]}"
+        rounds = index // (words * words * suffixes)
+        return f"{name} {rounds + 1}" if rounds else name
+
+    def employers_and_jobs(self, loader, employers, jobs, skill_ids):
+        """Write employers and their vacancies; remembers the jobs' popularity for the seekers"""
+        rng = self.rng
+        first_user = _next_id("[User]", "UserID")
+        first_job = _next_id("VacancyJob", "JobID")
+        company_offset = first_user     # keeps names unique when adding to an existing dataset
+        sizes = [rng.lognormvariate(0, ACTIVITY_SIGMA) for _ in range(employers)]
+        owners = rng.choices(range(employers), weights=sizes, k=jobs) if employers else []
+        announced = [0] * employers
+        for owner in owners:
+            announced[owner] += 1
+
+        profiles = []
+        for index in range(employers):
+            user_id = first_user + index
+            name, phone = self._person()
+            industry, location = self._industry(), self._location()
+            profiles.append((user_id, industry, location, self._company(company_offset + index)))
+            loader.add("[User]", (user_id, name, f"employer{user_id}@example.com", phone,
+                                  job_service.EMPLOYER, PASSWORD))
+            loader.add("Employer", (user_id, profiles[-1][3], self.industries[industry], location,
+                                    announced[index]))
+
+        self.next_user = first_user + employers     # the employers may not be written yet
+        self.first_job = first_job
+        self.job_industry = array("b")
+        for index, owner in enumerate(owners):
+            employer_id, industry, location, company = profiles[owner]
+            if rng.random() > OWN_INDUSTRY:
+                industry = self._industry()
+            if rng.random() > OWN_LOCATION:
+                location = self._location()
+            _, titles, skills = INDUSTRIES[self.industries[industry]]
+            prefix, low, high = rng.choice(SENIORITY)
+            title = prefix + rng.choice(titles)
+            required = rng.sample(skills, min(len(skills), rng.randint(*SKILLS_PER_JOB)))
+            loader.add("VacancyJob", (
+                first_job + index, employer_id, title,
+                f"{company} is hiring a {title} in {location}. You will work with {', '.join(required)}.",
+                self.industries[industry], location, ", ".join(required), rng.randint(low, high), 0,
+                "Closed" if rng.random() < CLOSED_JOBS else "Open"))
+            self.job_industry.append(industry)
+
+        popularity = _zipf(rng, jobs, JOB_SKEW)
+        self.job_weights = _cumulative(popularity)
+        self.pools = []         # per industry: (job indexes, cumulative popularity)
+        for industry in range(len(self.industries)):
+            indexes = [index for index, value in enumerate(self.job_industry) if value == industry]
+            self.pools.append((indexes, _cumulative(popularity[index] for index in indexes)))
+        self.job_apps = array("i", [0]) * jobs
+        self.skill_ids = skill_ids
+        self.all_skills = sorted({skill for skills in skill_ids.values() for skill in skills})
+
+    def _pick_jobs(self, count, industry):
+        """count distinct job indexes by popularity, OWN_INDUSTRY of them from the industry"""
+        rng = self.rng
+        count = min(count, len(self.job_weights) // 2)
+        if count <= 0:
+            return []
+        indexes, weights = self.pools[industry]
+        own = min(int(count * OWN_INDUSTRY + rng.random()), len(indexes) // 2)
+        chosen = dict.fromkeys(rng.choices(indexes, cum_weights=weights, k=own)) if own else {}
+        for _ in range(5):      # hot jobs come up again; draw replacements for the duplicates
+            missing = count - len(chosen)
+            if missing <= 0:
+                break
+            chosen.update(dict.fromkeys(rng.choices(range(len(self.job_weights)), cum_weights=self.job_weights,
+                                                    k=missing)))
+        return list(chosen)[:count]
+
+    def _skills(self, industry):
+        rng = self.rng
+        own = self.skill_ids[self.industries[industry]]
+        picked = {rng.choice(own) if rng.random() < OWN_INDUSTRY else rng.choice(self.all_skills)
+                  for _ in range(rng.randint(*SKILLS_PER_SEEKER))}
+        return [(skill_id, min(int(rng.expovariate(0.25)), 30)) for skill_id in sorted(picked)]
+
+    def seekers(self, loader, seekers, applications, saves, progress=None):
+        """Write seekers with their skills, applications and saves, after employers_and_jobs()"""
+        rng = self.rng
+        first_user = self.next_user
+        activity = array("d", (rng.lognormvariate(0, ACTIVITY_SIGMA) for _ in range(seekers)))
+        step = max(seekers // 10, 1)
+        for index, (apps, saved) in enumerate(_shares(rng, (applications, saves), activity) if seekers else ()):
+            user_id = first_user + index
+            industry, location = self._industry(), self._location()
+            name, phone = self._person()
+            jobs = self._pick_jobs(min(apps, MAX_PER_SEEKER), industry)
+            loader.add("[User]", (user_id, name, f"seeker{user_id}@example.com", phone,
+                                  job_service.JOB_SEEKER, PASSWORD))
+            loader.add("JobSeeker", (user_id, f"https://resumes.example.com/{user_id}.pdf",
+                                     self.industries[industry], location, len(jobs)))
+            for skill_id, years in self._skills(industry):
+                loader.add("HasSkills", (user_id, skill_id, years))
+            days = rng.choices(range(len(self.days)), cum_weights=self.day_weights, k=len(jobs))
+            for job, day in zip(jobs, days):
+                if rng.random() < self.decided[day]:
+                    status = "Accepted" if rng.random() < ACCEPTED_SHARE else "Rejected"
+                else:
+                    status = "Pending"
+                loader.add("Application", (self.first_job + job, user_id, status, self.days[day]))
+                self.job_apps[job] += 1
+            kept = self._pick_jobs(min(saved, MAX_PER_SEEKER), industry)
+            days = rng.choices(self.days, cum_weights=self.day_weights, k=len(kept))
+            for job, day in zip(kept, days):
+                loader.add("SavedVacancy", (self.first_job + job, user_id, day))
+            if progress and (index + 1) % step == 0:
+                progress(index + 1, seekers)
+
+    def fill_counters(self, batch_size=BATCH_SIZE):
+        """Set AppCount of the generated jobs (the other counters were written with their rows)"""
+        rows = [(count, self.first_job + index) for index, count in enumerate(self.job_apps) if count]
+        for start in range(0, len(rows), batch_size):
+            with db_pool.connection() as conn:
+                conn.executemany("UPDATE VacancyJob SET AppCount = AppCount + ? WHERE JobID = ?",
+                                 rows[start:start + batch_size])
+        return len(rows)
+
+
+def generate(employers=VOLUMES["employers"], seekers=VOLUMES["seekers"], jobs=VOLUMES["jobs"],
+             applications=VOLUMES["applications"], saves=VOLUMES["saves"], days=DAYS, seed=None,
+             batch_size=BATCH_SIZE, keep_indexes=False, quiet=False):
+    """Add a synthetic dataset to the database; returns {table: rows written}.
+
+    The same seed on an empty database gives the same rows. Applications
+    and saves can come out a little under the totals asked for when a
+    seeker's share exceeds MAX_PER_SEEKER or half the jobs.
+    """
+    say = (lambda *args: None) if quiet else print
+    started = time.perf_counter()
+    generator = DataGenerator(seed, days)
+    indexes = [] if keep_indexes else _indexes({table.strip("[]") for table, _, _ in TABLES})
+    _drop_indexes(indexes)
+    loader = BulkLoader(batch_size)
+    try:
+        generator.employers_and_jobs(loader, employers, jobs, _skill_ids())
+        say(f"Generated {employers} employers and {jobs} jobs ({time.perf_counter() - started:.1f}s)")
+
+        def progress(done, total):
+            say(f"  {done}/{total} seekers, {sum(generator.job_apps)} applications "
+                f"({time.perf_counter() - started:.1f}s)")
+        generator.seekers(loader, seekers, applications, saves, progress)
+    finally:
+        try:
+            loader.close()
+        finally:
+            _create_indexes(indexes)
+    say(f"Loaded and indexed ({time.perf_counter() - started:.1f}s)")
+    generator.fill_counters(batch_size)
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        rollups.rebuild(generator.days[0], generator.days[-1])
+    seconds = time.perf_counter() - started
+    written = {table.strip("[]"): rows for table, rows in loader.written.items()}
+    say(f"Wrote {sum(written.values())} rows in {seconds:.1f}s ({sum(written.values()) / seconds:.0f} rows/s): "
+        + ", ".join(f"{table} {rows}" for table, rows in written.items()))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="database URL, defaults to $JOBAPP_DB")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the default volumes (default 1)")
+    for name, count in VOLUMES.items():
+        parser.add_argument(f"--{name}", type=int, help=f"rows to generate (default {count} x scale)")
+    parser.add_argument("--days", type=int, default=DAYS, help="days of activity up to today (default %(default)s)")
+    parser.add_argument("--seed", type=int, help="random seed for a repeatable dataset")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="keep the indexes up to date during the load, for a database in use")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per transaction (default %(default)s)")
+    args = parser.parse_args(argv)
+    if args.db:
+        db_backend.set_backend(args.db)
+    volumes = {name: getattr(args, name) if getattr(args, name) is not None else round(count * args.scale)
+               for name, count in VOLUMES.items()}
+    generate(**volumes, days=args.days, seed=args.seed, batch_size=args.batch_size, keep_indexes=args.keep_indexes)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
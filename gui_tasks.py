@@ -0,0 +1,120 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+import profiler
+
+TASK_WORKERS = 4        # background threads for database calls
+POLL_MS = 25            # how often the Tk thread collects finished tasks
+
+
+class TaskRunner:
+    """Runs blocking database calls off the Tk main thread.
+
+    Results are handed back through a queue that the Tk thread drains with
+    root.after(), so callbacks may touch widgets safely. Tasks are grouped by
+    key: submitting a new task under a key supersedes the previous one, which
+    is cancelled if it has not started yet and has its result discarded
+    otherwise. Widgets passed to submit() are disabled while any of their
+    tasks are running.
+    """
+
+    def __init__(self, root, workers=TASK_WORKERS, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._done = queue.Queue()
+        self._generation = {}       # key -> id of the task whose result is wanted
+        self._futures = {}          # key -> future of the latest task
+        self._busy = {}             # widget -> number of running tasks using it
+        self._running = 0
+        self._next_id = 0
+        self._closed = False
+        root.after(poll_ms, self._poll)
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None, widgets=()):
+        """Run fn(*args) in the background; on_done(result) / on_error(exc) run on the Tk thread"""
+        self._next_id += 1
+        task_id = self._next_id
+        previous = self._futures.get(key)
+        if previous is not None:
+            previous.cancel()
+        self._generation[key] = task_id
+        self._running += 1
+        for widget in widgets:
+            self._set_busy(widget, +1)
+        self._update_cursor()
+        run = profiler.current()     # under --profile the task and its callbacks count toward the action
+        if run is not None:
+            run.task_started()
+        future = self._executor.submit(profiler.bind(run, fn), *args)
+        self._futures[key] = future
+        future.add_done_callback(
+            lambda f: self._done.put((key, task_id, f, on_done, on_error, widgets, run)))
+        return task_id
+
+    def cancel(self, key):
+        """Drop the pending result for key; a task that already started runs to completion unseen"""
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+        self._generation.pop(key, None)
+
+    def shutdown(self):
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        while True:
+            try:
+                key, task_id, future, on_done, on_error, widgets, run = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._running -= 1
+            for widget in widgets:
+                self._set_busy(widget, -1)
+            if self._generation.get(key) != task_id or future.cancelled():
+                profiler.task_done(run)
+                continue        # superseded by a newer request under the same key
+            self._generation.pop(key, None)
+            self._futures.pop(key, None)
+            error = future.exception()
+            with profiler.attached(run, "render"):
+                try:
+                    if error is not None:
+                        if on_error is not None:
+                            on_error(error)
+                    elif on_done is not None:
+                        on_done(future.result())
+                except Exception as e:
+                    # a failing callback must not stop the poll loop
+                    print(f"Background task callback failed: {e}")
+            profiler.task_done(run)
+        self._update_cursor()
+        if not self._closed:
+            self.root.after(self.poll_ms, self._poll)
+
+    def _set_busy(self, widget, delta):
+        count = self._busy.get(widget, 0) + delta
+        if count > 0:
+            self._busy[widget] = count
+        else:
+            self._busy.pop(widget, None)
+        if (delta > 0 and count == 1) or count <= 0:
+            _set_widget_enabled(widget, count <= 0)
+
+    def _update_cursor(self):
+        try:
+            self.root.configure(cursor="watch" if self._running else "")
+        except Exception:
+            pass
+
+
+def _set_widget_enabled(widget, enabled):
+    try:
+        if isinstance(widget, ttk.Widget):
+            widget.state(["!disabled"] if enabled else ["disabled"])
+        else:
+            widget.configure(state="normal" if enabled else "disabled")
+    except Exception:
+        pass        # widget destroyed while its task was running
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+import tkinter as tk
+
+PAGE_SIZE = 200         # rows fetched per database round trip
+MAX_CACHED_PAGES = 8    # pages kept in memory; older ones are dropped
+BUFFER_ROWS = 10        # extra rows materialized below the viewport
+ROW_HEIGHT = 20         # default ttk.Treeview row height in pixels
+WHEEL_ROWS = 3          # rows moved per mouse wheel notch
+
+
+class VirtualTree:
+    """Shows a large result set in a ttk.Treeview while only materializing the rows in view.
+
+    count() returns the total number of rows and fetch(offset, limit) one
+    window of them; both run on the TaskRunner. The tree holds at most the
+    visible rows plus BUFFER_ROWS items, which are reused as the user
+    scrolls, and the scrollbar is driven from the total count so it behaves
+    as if every row were present.
+    """
+
+    def __init__(self, tree, scrollbar, tasks, name, count, fetch, to_values, on_error=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.tasks = tasks
+        self.name = name
+        self.count = count
+        self.fetch = fetch
+        self.to_values = to_values
+        self.on_error = on_error
+        self.total = 0
+        self.first = 0
+        self.visible = int(tree.cget("height") or 10)
+        self._pages = OrderedDict()
+        self._pending = set()
+        self._generation = 0
+        self._placeholder = ("…",) + ("",) * (len(tree["columns"]) - 1)
+
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind("<Configure>", self._on_resize)
+        tree.bind("<MouseWheel>", lambda e: self.scroll_by(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        tree.bind("<Button-4>", lambda e: self.scroll_by(-WHEEL_ROWS))
+        tree.bind("<Button-5>", lambda e: self.scroll_by(WHEEL_ROWS))
+        tree.bind("<Prior>", lambda e: self.scroll_by(-self.visible))
+        tree.bind("<Next>", lambda e: self.scroll_by(self.visible))
+
+    def refresh(self):
+        """Drop cached rows and reload the count and the rows in view"""
+        self._generation += 1
+        generation = self._generation
+        self._pages.clear()
+        self._pending.clear()
+        self.tasks.submit(f"{self.name}:count", self.count,
+                          on_done=lambda total: self._counted(generation, total),
+                          on_error=self.on_error)
+
+    def clear(self):
+        """Show an empty list and ignore results still in flight"""
+        self._generation += 1
+        self._pages.clear()
+        self._pending.clear()
+        self.total = 0
+        self.first = 0
+        self._render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def scroll_to(self, first):
+        first = max(0, min(int(first), self.total - self.visible))
+        if first != self.first:
+            self.first = first
+            self.tree.selection_remove(self.tree.selection())
+            self._render()
+
+    def _counted(self, generation, total):
+        if generation != self._generation:
+            return
+        self.total = total
+        self.first = max(0, min(self.first, total - self.visible))
+        self._render()
+
+    def _loaded(self, generation, page, rows):
+        if generation != self._generation:
+            return
+        self._pending.discard(page)
+        self._pages[page] = rows
+        while len(self._pages) > MAX_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        self._render()
+
+    def _failed(self, generation, page, error):
+        if generation == self._generation:
+            self._pending.discard(page)
+            if self.on_error is not None:
+                self.on_error(error)
+
+    def _request(self, page):
+        if page in self._pending or page in self._pages:
+            return
+        self._pending.add(page)
+        generation = self._generation
+        self.tasks.submit(f"{self.name}:page:{page}", self.fetch, page * PAGE_SIZE, PAGE_SIZE,
+                          on_done=lambda rows: self._loaded(generation, page, rows),
+                          on_error=lambda e: self._failed(generation, page, e))
+
+    def _row_values(self, index):
+        page, offset = divmod(index, PAGE_SIZE)
+        rows = self._pages.get(page)
+        if rows is None:
+            self._request(page)
+            return self._placeholder
+        self._pages.move_to_end(page)
+        if offset >= len(rows):
+            return self._placeholder        # table shrank since the count was taken
+        return self.to_values(rows[offset])
+
+    def _render(self):
+        shown = max(0, min(self.visible + BUFFER_ROWS, self.total - self.first))
+        values = [self._row_values(i) for i in range(self.first, self.first + shown)]
+        # prefetch the page just below the viewport so steady scrolling never waits
+        if self.first + shown < self.total:
+            self._request((self.first + shown) // PAGE_SIZE)
+
+        items = self.tree.get_children()
+        for item, row in zip(items, values):
+            self.tree.item(item, values=row)
+        for row in values[len(items):]:
+            self.tree.insert("", tk.END, values=row)
+        if len(items) > len(values):
+            self.tree.delete(*items[len(values):])
+
+        if self.total:
+            self.scrollbar.set(self.first / self.total, min(1.0, (self.first + self.visible) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.total)
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // ROW_HEIGHT - 1)       # one row for the headings
+        if visible != self.visible:
+            self.visible = visible
+            self.first = max(0, min(self.first, self.total - self.visible))
+            self._render()
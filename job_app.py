@@ -1,16 +1,18 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pyodbc
-from datetime import datetime, timedelta
+from tkinter import ttk, messagebox, filedialog
 import uuid
 
-# Database connection configuration
-CONN_STR = (
-    r"DRIVER={ODBC Driver 17 for SQL Server};"
-    r"SERVER=ALIOSAMA155\SQLEXPRESS;"
-    r"DATABASE=my_project;"
-    r"Trusted_Connection=Yes;"
-)
+import analytics_engine
+import analytics_report
+import db_backend
+import gui_tasks
+import gui_virtual_list
+import job_service
+import profiler
+import search_index
+import skill_matrix
+import trending
+from job_service import ServiceError
 
 # Color schemes for light and dark modes
 LIGHT_COLORS = {
@@ -34,16 +36,6 @@ current_colors = LIGHT_COLORS.copy()
 is_dark_mode = False
 logged_in_user = None
 
-def get_connection():
-    """Establish database connection with error handling"""
-    try:
-        conn = pyodbc.connect(CONN_STR)
-        return conn
-    except Exception as e:
-        messagebox.showerror("Connection Error",
-                             f"Failed to connect to database: {str(e)}")
-        return None
-
 # ─── Theme Management ───────────────────────────────────────────
 def toggle_theme():
     global current_colors, is_dark_mode
@@ -73,9 +65,30 @@ def update_widget_colors(widget):
     for child in widget.winfo_children():
         update_widget_colors(child)
 
+# ─── Background Database Calls ───────────────────────────────────────────
+def run_db(key, fn, *args, on_done=None, error_prefix="Query error", error_title="Error",
+           integrity_message=None, widgets=()):
+    """Run a job_service call off the Tk thread and report failures in a messagebox.
+
+    A newer call with the same key supersedes an older one still in flight.
+    """
+    def on_error(e):
+        if isinstance(e, ServiceError):
+            messagebox.showerror(error_title, str(e))
+        elif integrity_message and isinstance(e, db_backend.INTEGRITY_ERRORS):
+            messagebox.showerror(error_title, integrity_message)
+        else:
+            messagebox.showerror(error_title, f"{error_prefix}: {str(e)}")
+    tasks.submit(key, fn, *args, on_done=on_done, on_error=on_error, widgets=widgets)
+
+def replace_tree_rows(tree, rows):
+    for item in tree.get_children():
+        tree.delete(item)
+    for values in rows:
+        tree.insert("", tk.END, values=values)
+
 # ─── Authentication Functions ───────────────────────────────────────────
 def login():
-    global logged_in_user
     email = login_email_entry.get().strip()
     password = login_password_entry.get().strip()
 
@@ -88,55 +101,34 @@ def login():
             "Login Error", "Password must be at least 6 characters!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT UserID, Name, Email, Role 
-                FROM [User] 
-                WHERE Email = ? AND Password = ?
-            """, (email, password))
-            user = cursor.fetchone()
-            if user:
-                user_info = {
-                    'user_id': user.UserID,
-                    'name': user.Name,
-                    'email': user.Email,
-                    'role': 'Employer' if user.Role == 0 else 'JobSeeker'
-                }
-                if user.Role == 0:
-                    cursor.execute(
-                        "SELECT ComName FROM Employer WHERE UserID = ?", user.UserID)
-                    employer_info = cursor.fetchone()
-                    user_info['company_name'] = employer_info.ComName if employer_info else None
-                logged_in_user = user_info
-                messagebox.showinfo(
-                    "Success", f"Login successful! Welcome {user_info['name']}")
-
-                notebook.tab(0, state="hidden")
-                notebook.tab(1, state="hidden")
-                notebook.tab(
-                    2, state="normal" if user_info['role'] == 'Employer' else "disabled")
-                notebook.tab(
-                    3, state="normal" if user_info['role'] == 'JobSeeker' else "disabled")
-                notebook.tab(4, state="normal")
-                notebook.tab(5, state="normal")
-                notebook.select(2 if user_info['role'] == 'Employer' else 3)
-
-                update_job_tree()
-                update_user_tree()
-                update_saved_jobs_tree()
-                update_applications_tree()
-                logout_button.pack(side=tk.RIGHT, padx=10)
-            else:
-                messagebox.showerror(
-                    "Login Error", "Invalid email or password")
-        except Exception as e:
-            messagebox.showerror("Login Error", f"Login failed: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def logged_in(user_info):
+        global logged_in_user
+        if not user_info:
+            messagebox.showerror(
+                "Login Error", "Invalid email or password")
+            return
+        logged_in_user = user_info
+        messagebox.showinfo(
+            "Success", f"Login successful! Welcome {user_info['name']}")
+
+        notebook.tab(0, state="hidden")
+        notebook.tab(1, state="hidden")
+        notebook.tab(
+            2, state="normal" if user_info['role'] == 'Employer' else "disabled")
+        notebook.tab(
+            3, state="normal" if user_info['role'] == 'JobSeeker' else "disabled")
+        notebook.tab(4, state="normal")
+        notebook.tab(5, state="normal")
+        notebook.select(2 if user_info['role'] == 'Employer' else 3)
+
+        update_job_tree()
+        update_user_tree()
+        update_saved_jobs_tree()
+        update_applications_tree()
+        logout_button.pack(side=tk.RIGHT, padx=10)
+
+    run_db("login", job_service.authenticate, email, password, on_done=logged_in,
+           error_title="Login Error", error_prefix="Login failed", widgets=(login_button,))
 
 def register_user():
     name = reg_name_entry.get().strip()
@@ -179,42 +171,15 @@ def register_user():
         kwargs = {"resume_link": resume_link,
                   "industry": industry, "location": location}
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO [User] (Name, Email, Phone, Role, Password)
-                OUTPUT INSERTED.UserID
-                VALUES (?, ?, ?, ?, ?)
-            """, name, email, phone, role, password)
-            user_id = cursor.fetchone().UserID
-
-            if role == 0:
-                cursor.execute("""
-                    INSERT INTO Employer (UserID, ComName, ComIndustry, Location, AnnouncedJobCount)
-                    VALUES (?, ?, ?, ?, 0)
-                """, user_id, kwargs["company_name"], kwargs["industry"], kwargs["location"])
-            else:
-                cursor.execute("""
-                    INSERT INTO JobSeeker (UserID, ResumeLink, Industry, PreferredLocation, AppliedJobCount)
-                    VALUES (?, ?, ?, ?, 0)
-                """, user_id, kwargs["resume_link"], kwargs["industry"], kwargs["location"])
-
-            conn.commit()
-            messagebox.showinfo(
-                "Success", f"User registered successfully! UserID: {user_id}")
-            clear_fields()
-            notebook.select(0)
-            logged_in_user = None
-        except pyodbc.IntegrityError:
-            messagebox.showerror("Error", "Email already exists!")
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Failed to register user: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def registered(user_id):
+        messagebox.showinfo(
+            "Success", f"User registered successfully! UserID: {user_id}")
+        clear_fields()
+        notebook.select(0)
+
+    run_db("register", lambda: job_service.register_user(name, email, phone, role, password, **kwargs),
+           on_done=registered, error_prefix="Failed to register user",
+           integrity_message="Email already exists!", widgets=(register_button,))
 
 def clear_fields():
     reg_name_entry.delete(0, tk.END)
@@ -231,6 +196,9 @@ def clear_fields():
 def logout():
     global logged_in_user
     logged_in_user = None
+    user_list.clear()
+    for key in ("saved_jobs_tree", "applications_tree"):
+        tasks.cancel(key)
     notebook.tab(0, state="normal")
     notebook.tab(1, state="normal")
     notebook.tab(2, state="disabled")
@@ -242,6 +210,32 @@ def logout():
     messagebox.showinfo("Success", "Logged out successfully!")
 
 # ─── Job Management Functions ──────────────────────────────────────────
+def read_job_id(entry):
+    """Parse the Job ID typed into entry; returns None after showing the problem"""
+    job_id_input = entry.get().strip()
+    if not job_id_input:
+        messagebox.showerror("Error", "Job ID is required!")
+        return None
+    try:
+        return int(job_id_input)
+    except ValueError:
+        messagebox.showerror("Error", "Job ID must be a valid number!")
+        return None
+
+def read_job_ids(entry, tree):
+    """Job IDs typed into entry (comma separated) or else selected in tree; None after showing the problem"""
+    parts = [part.strip() for part in entry.get().split(",") if part.strip()]
+    if not parts:
+        parts = [str(tree.item(item)['values'][0]) for item in tree.selection()]
+    if not parts:
+        messagebox.showerror("Error", "Job ID is required!")
+        return None
+    try:
+        return [int(part) for part in parts]
+    except ValueError:
+        messagebox.showerror("Error", "Job ID must be a valid number!")
+        return None
+
 def create_job():
     title = title_entry_employer.get().strip()
     desc = desc_entry_employer.get().strip()
@@ -266,27 +260,15 @@ def create_job():
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         messagebox.showerror("Error", "You must be logged in as an Employer to create a job!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO VacancyJob (EmployerID, Title, Description, Industry, Location, ReqSkill, EXPRequired, AppCount, Status)
-                OUTPUT INSERTED.JobID
-                VALUES (?, ?, ?, ?, ?, ?, ?, 0, 'Open')
-            """, logged_in_user['user_id'], title, desc, industry, location, skills, exp)
-            job_id = cursor.fetchone().JobID
-            cursor.execute("UPDATE Employer SET AnnouncedJobCount = AnnouncedJobCount + 1 WHERE UserID = ?", logged_in_user['user_id'])
-            conn.commit()
-            messagebox.showinfo("Success", f"Job created successfully! JobID: {job_id}")
-            clear_job_fields()
-            update_job_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Failed to create job: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+
+    def created(job_id):
+        messagebox.showinfo("Success", f"Job created successfully! JobID: {job_id}")
+        clear_job_fields()
+        update_job_tree()
+
+    run_db("create_job", job_service.create_job, logged_in_user['user_id'], title, desc, industry,
+           location, skills, exp, on_done=created, error_prefix="Failed to create job",
+           widgets=(create_job_button,))
 
 def clear_job_fields():
     title_entry_employer.delete(0, tk.END)
@@ -297,125 +279,44 @@ def clear_job_fields():
     exp_entry_employer.delete(0, tk.END)
 
 def hide_job():
-    job_id_input = job_id_entry_employer.get().strip()
-    if not job_id_input:
-        messagebox.showerror("Error", "Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        messagebox.showerror("Error", "Job ID must be a valid number!")
+    job_id = read_job_id(job_id_entry_employer)
+    if job_id is None:
         return
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         messagebox.showerror("Error", "You must be logged in as an Employer to hide a job!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT JobID FROM VacancyJob WHERE JobID = ? AND EmployerID = ?", job_id, logged_in_user['user_id'])
-            job = cursor.fetchone()
-            if not job:
-                messagebox.showerror("Error", f"No job found with JobID: {job_id} for this Employer!")
-                return
-            cursor.execute("UPDATE VacancyJob SET Status = 'Closed' WHERE JobID = ?", job_id)
-            conn.commit()
-            messagebox.showinfo("Success", f"JobID: {job_id} has been hidden successfully")
-            job_id_entry_employer.delete(0, tk.END)
-            update_job_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Hide error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+
+    def hidden(_):
+        messagebox.showinfo("Success", f"JobID: {job_id} has been hidden successfully")
+        job_id_entry_employer.delete(0, tk.END)
+        update_job_tree()
+
+    run_db("hide_job", job_service.hide_job, logged_in_user['user_id'], job_id,
+           on_done=hidden, error_prefix="Hide error", widgets=(hide_job_button, delete_job_button))
 
 def delete_user():
     email = reg_email_entry.get().strip()
     if not logged_in_user or logged_in_user['email'] != email:
         messagebox.showerror("Error", "You can only delete your own account!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT UserID, Role FROM [User] WHERE Email = ?", email)
-            user = cursor.fetchone()
-            if not user:
-                messagebox.showerror(
-                    "Error", f"No user found with email: {email}")
-                return
-            user_id = user.UserID
-            role = user.Role
-            if role == 0:
-                cursor.execute(
-                    "DELETE FROM Application WHERE JobID IN (SELECT JobID FROM VacancyJob WHERE EmployerID = ?)", user_id)
-                cursor.execute(
-                    "DELETE FROM SavedVacancy WHERE JobID IN (SELECT JobID FROM VacancyJob WHERE EmployerID = ?)", user_id)
-                cursor.execute(
-                    "DELETE FROM VacancyJob WHERE EmployerID = ?", user_id)
-                cursor.execute(
-                    "DELETE FROM Employer WHERE UserID = ?", user_id)
-            else:
-                cursor.execute(
-                    "DELETE FROM Application WHERE SeekerID = ?", user_id)
-                cursor.execute(
-                    "DELETE FROM SavedVacancy WHERE SeekerID = ?", user_id)
-                cursor.execute(
-                    "DELETE FROM HasSkills WHERE UserID = ?", user_id)
-                cursor.execute(
-                    "DELETE FROM JobSeeker WHERE UserID = ?", user_id)
-            cursor.execute("DELETE FROM [User] WHERE Email = ?", email)
-            conn.commit()
-            logout()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Delete error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    run_db("delete_user", job_service.delete_user, email, on_done=lambda _: logout(),
+           error_prefix="Delete error", widgets=(delete_user_button,))
 
 def delete_job():
-    job_id_input = job_id_entry_employer.get().strip()
-    if not job_id_input:
-        messagebox.showerror("Error", "Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        messagebox.showerror("Error", "Job ID must be a valid number!")
+    job_id = read_job_id(job_id_entry_employer)
+    if job_id is None:
         return
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         messagebox.showerror("Error", "You must be logged in as an Employer to delete a job!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT EmployerID FROM VacancyJob WHERE JobID = ?", job_id)
-            job = cursor.fetchone()
-            if not job:
-                messagebox.showerror("Error", f"No job found with JobID: {job_id}")
-                return
-            if job.EmployerID != logged_in_user['user_id']:
-                messagebox.showerror("Error", "You can only delete jobs that you created!")
-                return
-            cursor.execute("DELETE FROM Application WHERE JobID = ?", job_id)
-            cursor.execute("DELETE FROM SavedVacancy WHERE JobID = ?", job_id)
-            cursor.execute("DELETE FROM VacancyJob WHERE JobID = ?", job_id)
-            cursor.execute("UPDATE Employer SET AnnouncedJobCount = AnnouncedJobCount - 1 WHERE UserID = ?",
-                           logged_in_user['user_id'])
-            conn.commit()
-            messagebox.showinfo("Success", f"Deleted job with JobID: {job_id}")
-            job_id_entry_employer.delete(0, tk.END)
-            update_job_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Delete error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+
+    def deleted(_):
+        messagebox.showinfo("Success", f"Deleted job with JobID: {job_id}")
+        job_id_entry_employer.delete(0, tk.END)
+        update_job_tree()
+
+    run_db("delete_job", job_service.delete_job, logged_in_user['user_id'], job_id,
+           on_done=deleted, error_prefix="Delete error", widgets=(hide_job_button, delete_job_button))
 
 def update_user():
     name = name_entry.get().strip() or None
@@ -442,50 +343,18 @@ def update_user():
             "Error", "You must be logged in to update your details!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            updates = []
-            values = []
-            if name:
-                updates.append("Name = ?")
-                values.append(name)
-            if email:
-                updates.append("Email = ?")
-                values.append(email)
-            if phone:
-                updates.append("Phone = ?")
-                values.append(phone)
-            if password:
-                updates.append("Password = ?")
-                values.append(password)
-            set_clause = ", ".join(updates)
-            values.append(logged_in_user['user_id'])
-            cursor.execute(
-                f"UPDATE [User] SET {set_clause} WHERE UserID = ?", *values)
-            conn.commit()
-            messagebox.showinfo("Success", "User updated successfully!")
-            clear_fields()
-            update_user_tree()
-        except pyodbc.IntegrityError:
-            messagebox.showerror("Error", "Email already exists!")
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Update error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def updated(_):
+        messagebox.showinfo("Success", "User updated successfully!")
+        clear_fields()
+        update_user_tree()
+
+    run_db("update_user", job_service.update_user, logged_in_user['user_id'], name, email, phone,
+           password, on_done=updated, error_prefix="Update error",
+           integrity_message="Email already exists!", widgets=(update_user_button,))
 
 def update_job():
-    job_id_input = job_id_entry_employer.get().strip()
-    if not job_id_input:
-        messagebox.showerror("Error", "Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        messagebox.showerror("Error", "Job ID must be a valid number!")
+    job_id = read_job_id(job_id_entry_employer)
+    if job_id is None:
         return
 
     title = title_entry_employer.get().strip() or None
@@ -514,141 +383,49 @@ def update_job():
         messagebox.showerror("Error", "You must be logged in as an Employer to update job details!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            updates = []
-            values = []
-            if title:
-                updates.append("Title = ?")
-                values.append(title)
-            if desc:
-                updates.append("Description = ?")
-                values.append(desc)
-            if industry:
-                updates.append("Industry = ?")
-                values.append(industry)
-            if location:
-                updates.append("Location = ?")
-                values.append(location)
-            if skills:
-                updates.append("ReqSkill = ?")
-                values.append(skills)
-            if exp is not None:
-                updates.append("EXPRequired = ?")
-                values.append(exp)
-            set_clause = ", ".join(updates)
-            values.append(job_id)
-            cursor.execute(f"UPDATE VacancyJob SET {set_clause} WHERE JobID = ?", *values)
-            conn.commit()
-            messagebox.showinfo("Success", f"Job updated successfully! JobID: {job_id}")
-            clear_job_fields()
-            update_job_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Update error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def updated(_):
+        messagebox.showinfo("Success", f"Job updated successfully! JobID: {job_id}")
+        clear_job_fields()
+        update_job_tree()
+
+    run_db("update_job", job_service.update_job, job_id, title, desc, industry, location, skills, exp,
+           on_done=updated, error_prefix="Update error")
 
 def update_user_tree():
-    for item in user_tree.get_children():
-        user_tree.delete(item)
-    conn = get_connection()
-    if conn and logged_in_user and logged_in_user['role'] == 'Employer':
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT UserID, Name, Email, Role FROM [User]")
-            rows = cursor.fetchall()
-            for row in rows:
-                role = "Employer" if row.Role == 0 else "JobSeeker"
-                user_tree.insert("", tk.END, values=(
-                    row.UserID, row.Name, row.Email, role))
-        except Exception as e:
-            messagebox.showerror("Error", f"Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    if not logged_in_user or logged_in_user['role'] != 'Employer':
+        user_list.clear()
+        return
+    user_list.refresh()
 
 def update_job_tree():
-    for item in job_tree.get_children():
-        job_tree.delete(item)
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.JobID, v.Title, v.Location, e.ComName, e.ComIndustry
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.Status = 'Open'
-            """)
-            rows = cursor.fetchall()
-            for row in rows:
-                job_tree.insert("", tk.END, values=(
-                    row.JobID, row.Title, row.Location, row.ComName, row.ComIndustry))
-        except Exception as e:
-            messagebox.showerror("Error", f"Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    job_list.refresh()
+
+def show_select_error(e):
+    messagebox.showerror("Error", f"Select error: {str(e)}")
 
 def update_saved_jobs_tree():
-    for item in saved_jobs_tree.get_children():
-        saved_jobs_tree.delete(item)
     if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
+        tasks.cancel("saved_jobs_tree")
+        replace_tree_rows(saved_jobs_tree, [])
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT sv.JobID, v.Title, v.Description, v.Industry, v.Location
-                FROM SavedVacancy sv
-                JOIN VacancyJob v ON sv.JobID = v.JobID
-                WHERE sv.SeekerID = ?
-            """, logged_in_user['user_id'])
-            rows = cursor.fetchall()
-            for row in rows:
-                saved_jobs_tree.insert("", tk.END, values=(
-                    row.JobID, row.Title, row.Description, row.Industry, row.Location))
-        except Exception as e:
-            messagebox.showerror("Error", f"Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    run_db("saved_jobs_tree", job_service.list_saved_jobs, logged_in_user['user_id'],
+           error_prefix="Select error", on_done=lambda rows: replace_tree_rows(
+               saved_jobs_tree, [(row.JobID, row.Title, row.Description, row.Industry, row.Location) for row in rows]))
 
 def update_applications_tree():
-    for item in applications_tree.get_children():
-        applications_tree.delete(item)
     if not logged_in_user or logged_in_user['role'] != 'Employer':
+        tasks.cancel("applications_tree")
+        replace_tree_rows(applications_tree, [])
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT a.AppID, a.JobID, v.Title, u.Name, a.Status
-                FROM Application a
-                JOIN VacancyJob v ON a.JobID = v.JobID
-                JOIN [User] u ON a.SeekerID = u.UserID
-                WHERE v.EmployerID = ?
-            """, logged_in_user['user_id'])
-            rows = cursor.fetchall()
-            for row in rows:
-                applications_tree.insert("", tk.END, values=(
-                    row.AppID, row.JobID, row.Title, row.Name, row.Status))
-        except Exception as e:
-            messagebox.showerror("Error", f"Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    run_db("applications_tree", job_service.list_applications, logged_in_user['user_id'],
+           error_prefix="Select error", on_done=lambda rows: replace_tree_rows(
+               applications_tree, [(row.AppID, row.JobID, row.Title, row.Name, row.Status) for row in rows]))
 
 def filter_vacancies():
     industry = industry_entry_filter.get().strip() or None
     location = location_entry_filter.get().strip() or None
     exp_input = exp_entry_filter.get().strip() or None
+    exp = None
     if exp_input:
         try:
             exp = int(exp_input)
@@ -659,46 +436,66 @@ def filter_vacancies():
             messagebox.showerror("Error", "Maximum experience must be a valid number!")
             return
 
-    for item in filtered_vacancies_tree.get_children():
-        filtered_vacancies_tree.delete(item)
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            conditions = []
-            values = []
-            query = """
-                SELECT v.JobID, v.Title, v.Description, v.Industry, v.Location, v.ReqSkill, v.EXPRequired, e.ComName
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.Status = 'Open'
-            """
-            if industry:
-                conditions.append("v.Industry = ?")
-                values.append(industry)
-            if location:
-                conditions.append("v.Location = ?")
-                values.append(location)
-            if exp_input:
-                conditions.append("v.EXPRequired <= ?")
-                values.append(exp)
-            if conditions:
-                query += " AND " + " AND ".join(conditions)
-            cursor.execute(query, *values)
-            rows = cursor.fetchall()
-            for row in rows:
-                filtered_vacancies_tree.insert("", tk.END, values=(
-                    row.JobID, row.Title, row.Description, row.Industry, row.Location, row.ReqSkill, row.EXPRequired, row.ComName))
-        except Exception as e:
-            messagebox.showerror("Error", f"Filter error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    # A second click supersedes the first: only the latest filter's rows are shown
+    run_db("filter_vacancies", job_service.filter_vacancies, industry, location, exp,
+           error_prefix="Filter error", on_done=lambda rows: replace_tree_rows(
+               filtered_vacancies_tree, [(row.JobID, row.Title, row.Description, row.Industry, row.Location,
+                                          row.ReqSkill, row.EXPRequired, row.ComName) for row in rows]))
+
+def search_vacancies():
+    query = search_entry_filter.get().strip()
+    if not query:
+        messagebox.showerror("Error", "Keywords are required!")
+        return
+    # shares the filter key: whichever of search/filter was clicked last fills the tree
+    run_db("filter_vacancies", search_index.search_jobs, query,
+           error_prefix="Search error", on_done=lambda rows: replace_tree_rows(
+               filtered_vacancies_tree, [(row.JobID, row.Title, row.Description, row.Industry, row.Location,
+                                          row.ReqSkill, row.EXPRequired, row.ComName) for row in rows]))
+
+def recommended_jobs():
+    if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
+        messagebox.showerror("Error", "You must be logged in as a JobSeeker to get recommendations!")
+        return
+    run_db("filter_vacancies", skill_matrix.recommend_jobs, logged_in_user['user_id'],
+           error_prefix="Recommendation error", on_done=lambda ranked: replace_tree_rows(
+               filtered_vacancies_tree, [(row.JobID, row.Title, row.Description, row.Industry, row.Location,
+                                          row.ReqSkill, row.EXPRequired, row.ComName) for row, score in ranked]))
+
+def trending_jobs():
+    # ranked within the industry and location typed in the filter fields, if any
+    industry = industry_entry_filter.get().strip() or None
+    location = location_entry_filter.get().strip() or None
+    run_db("filter_vacancies", trending.trending_jobs, trending.TRENDING_LIMIT, industry, location,
+           on_done=lambda ranked: replace_tree_rows(
+               filtered_vacancies_tree, [(row.JobID, row.Title, row.Description, row.Industry, row.Location,
+                                          row.ReqSkill, row.EXPRequired, row.ComName) for row, score in ranked]))
+
+def best_candidates():
+    if not logged_in_user or logged_in_user['role'] != 'Employer':
+        messagebox.showerror("Error", "You must be logged in as an Employer to rank candidates!")
+        return
+    job_id = read_job_id(job_id_entry_employer)
+    if job_id is None:
+        return
+
+    def show(ranked):
+        if ranked:
+            lines = [f"{row.Name} (UserID: {row.UserID}, {row.Email}) - {row.Industry}, {row.PreferredLocation}: "
+                     f"{score:.0%}" for row, score in ranked]
+            messagebox.showinfo(f"Best Candidates for JobID {job_id}", "\n".join(lines))
+        else:
+            messagebox.showinfo(f"Best Candidates for JobID {job_id}", "No matching candidates found.")
+
+    run_db("best_candidates", skill_matrix.rank_candidates, logged_in_user['user_id'], job_id,
+           skill_matrix.CANDIDATE_LIMIT, applicants_only_var.get(), on_done=show, error_prefix="Ranking error",
+           widgets=(best_candidates_button,))
 
 def filter_job_seekers():
     industry = industry_entry_seeker.get().strip() or None
     location = location_entry_seeker.get().strip() or None
     exp_input = exp_entry_seeker.get().strip() or None
+    exp = None
     if exp_input:
         try:
             exp = int(exp_input)
@@ -710,149 +507,64 @@ def filter_job_seekers():
                 "Error", "Minimum experience must be a valid number!")
             return
 
-    for item in filtered_seekers_tree.get_children():
-        filtered_seekers_tree.delete(item)
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            conditions = []
-            values = []
-            query = """
-                SELECT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
-                FROM [User] u
-                JOIN JobSeeker j ON u.UserID = j.UserID
-                WHERE u.Role = 1
-            """
-            if exp_input:
-                query = """
-                    SELECT DISTINCT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
-                    FROM [User] u
-                    JOIN JobSeeker j ON u.UserID = j.UserID
-                    JOIN HasSkills hs ON j.UserID = hs.UserID
-                    WHERE u.Role = 1 AND hs.EXPYears >= ?
-                """
-                values.append(exp)
-            if industry:
-                conditions.append("j.Industry = ?")
-                values.append(industry)
-            if location:
-                conditions.append("j.PreferredLocation = ?")
-                values.append(location)
-            if conditions:
-                query += " AND " + " AND ".join(conditions)
-            cursor.execute(query, *values)
-            rows = cursor.fetchall()
-            for row in rows:
-                filtered_seekers_tree.insert("", tk.END, values=(
-                    row.UserID, row.Name, row.Email, row.Industry, row.PreferredLocation))
-        except Exception as e:
-            messagebox.showerror("Error", f"Filter error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    run_db("filter_job_seekers", job_service.filter_job_seekers, industry, location, exp,
+           error_prefix="Filter error", on_done=lambda rows: replace_tree_rows(
+               filtered_seekers_tree, [(row.UserID, row.Name, row.Email, row.Industry, row.PreferredLocation)
+                                       for row in rows]))
 
 def apply_for_job():
-    job_id_input = job_id_entry_seeker.get().strip()
-    if not job_id_input:
-        messagebox.showerror("Error", "Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        messagebox.showerror("Error", "Job ID must be a valid number!")
+    job_ids = read_job_ids(job_id_entry_seeker, filtered_vacancies_tree)
+    if job_ids is None:
         return
     if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
         messagebox.showerror(
             "Error", "You must be logged in as a JobSeeker to apply for a job!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT Status FROM VacancyJob WHERE JobID = ?", job_id)
-            job = cursor.fetchone()
-            if not job:
-                messagebox.showerror(
-                    "Error", f"No job found with JobID: {job_id}")
-                return
-            if job.Status != 'Open':
-                messagebox.showerror(
-                    "Error", "This job is not open for applications!")
-                return
-            cursor.execute("SELECT AppID FROM Application WHERE SeekerID = ? AND JobID = ?",
-                           logged_in_user['user_id'], job_id)
-            if cursor.fetchone():
-                messagebox.showerror(
-                    "Error", "You have already applied for this job!")
-                return
-            cursor.execute("INSERT INTO Application (JobID, SeekerID, Status, ApplyDate) VALUES (?, ?, 'Pending', ?)",
-                           job_id, logged_in_user['user_id'], datetime.now().date())
-            cursor.execute(
-                "UPDATE VacancyJob SET AppCount = AppCount + 1 WHERE JobID = ?", job_id)
-            cursor.execute(
-                "UPDATE JobSeeker SET AppliedJobCount = AppliedJobCount + 1 WHERE UserID = ?", logged_in_user['user_id'])
-            conn.commit()
-            messagebox.showinfo(
-                "Success", f"Successfully applied for JobID: {job_id}")
-            job_id_entry_seeker.delete(0, tk.END)
-            update_applications_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Apply error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
 
-def save_job():
-    job_id_input = job_id_entry_seeker.get().strip()
-    if not job_id_input:
-        messagebox.showerror("Error", "Job ID is required!")
+    if len(job_ids) > 1:
+        def applied_bulk(result):
+            applied, failures = result
+            problems = "\n".join(f"JobID {job_id}: {reason}" for job_id, reason in failures.items())
+            if applied:
+                message = f"Successfully applied for JobIDs: {', '.join(map(str, applied))}"
+                messagebox.showinfo("Success", message + (f"\n\nSkipped:\n{problems}" if problems else ""))
+                job_id_entry_seeker.delete(0, tk.END)
+                update_applications_tree()
+            else:
+                messagebox.showerror("Error", problems)
+
+        run_db("apply_for_job", job_service.apply_bulk, logged_in_user['user_id'], job_ids,
+               on_done=applied_bulk, error_prefix="Apply error", widgets=(apply_button, save_button))
         return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        messagebox.showerror("Error", "Job ID must be a valid number!")
+
+    job_id = job_ids[0]
+
+    def applied(_):
+        messagebox.showinfo(
+            "Success", f"Successfully applied for JobID: {job_id}")
+        job_id_entry_seeker.delete(0, tk.END)
+        update_applications_tree()
+
+    run_db("apply_for_job", job_service.apply, logged_in_user['user_id'], job_id,
+           on_done=applied, error_prefix="Apply error", widgets=(apply_button, save_button))
+
+def save_job():
+    job_id = read_job_id(job_id_entry_seeker)
+    if job_id is None:
         return
     if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
         messagebox.showerror(
             "Error", "You must be logged in as a JobSeeker to save a job!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT Status FROM VacancyJob WHERE JobID = ?", job_id)
-            job = cursor.fetchone()
-            if not job:
-                messagebox.showerror(
-                    "Error", f"No job found with JobID: {job_id}")
-                return
-            if job.Status != 'Open':
-                messagebox.showerror(
-                    "Error", "This job is not open and cannot be saved!")
-                return
-            cursor.execute("SELECT JobID FROM SavedVacancy WHERE SeekerID = ? AND JobID = ?",
-                           logged_in_user['user_id'], job_id)
-            if cursor.fetchone():
-                messagebox.showerror(
-                    "Error", "You have already saved this job!")
-                return
-            cursor.execute("INSERT INTO SavedVacancy (JobID, SeekerID, SaveDate) VALUES (?, ?, ?)",
-                           job_id, logged_in_user['user_id'], datetime.now().date())
-            conn.commit()
-            messagebox.showinfo(
-                "Success", f"Successfully saved JobID: {job_id}")
-            job_id_entry_seeker.delete(0, tk.END)
-            update_saved_jobs_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Save error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+
+    def saved(_):
+        messagebox.showinfo(
+            "Success", f"Successfully saved JobID: {job_id}")
+        job_id_entry_seeker.delete(0, tk.END)
+        update_saved_jobs_tree()
+
+    run_db("save_job", job_service.save, logged_in_user['user_id'], job_id,
+           on_done=saved, error_prefix="Save error", widgets=(apply_button, save_button))
 
 def show_job_details(event):
     selected_item = job_tree.selection()
@@ -863,44 +575,23 @@ def show_job_details(event):
         messagebox.showerror("Error", "Invalid Job ID selected!")
         return
     job_id = int(job_id_value)
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.Title, v.Description, v.Industry, v.Location, v.ReqSkill, v.EXPRequired, e.ComName
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.JobID = ?
-            """, job_id)
-            job = cursor.fetchone()
-            if job:
-                details = f"Title: {job.Title}\nDescription: {job.Description}\nIndustry: {job.Industry}\nLocation: {job.Location}\nRequired Skills: {job.ReqSkill}\nMin Experience: {job.EXPRequired}\nCompany: {job.ComName}"
-                messagebox.showinfo(f"Job Details (ID: {job_id})", details)
-        except Exception as e:
-            messagebox.showerror(
-                "Error", f"Error fetching job details: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+
+    def show(job):
+        if job:
+            details = f"Title: {job.Title}\nDescription: {job.Description}\nIndustry: {job.Industry}\nLocation: {job.Location}\nRequired Skills: {job.ReqSkill}\nMin Experience: {job.EXPRequired}\nCompany: {job.ComName}"
+            messagebox.showinfo(f"Job Details (ID: {job_id})", details)
+
+    run_db("job_details", job_service.get_job_details, job_id, on_done=show,
+           error_prefix="Error fetching job details")
 
 def update_application_status(app_id, new_status):
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "UPDATE Application SET Status = ? WHERE AppID = ?", new_status, app_id)
-            conn.commit()
-            messagebox.showinfo(
-                "Success", f"Application status updated to {new_status}")
-            update_applications_tree()
-        except Exception as e:
-            conn.rollback()
-            messagebox.showerror("Error", f"Update error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def updated(_):
+        messagebox.showinfo(
+            "Success", f"Application status updated to {new_status}")
+        update_applications_tree()
+
+    run_db("application_status", job_service.set_application_status, app_id, new_status,
+           on_done=updated, error_prefix="Update error", widgets=(accept_button, reject_button))
 
 def accept_application():
     selected_item = applications_tree.selection()
@@ -927,197 +618,140 @@ def toggle_fields():
         seeker_frame.grid()
 
 # ─── Analytics Functions ──────────────────────────────────────────
+analytics_source = analytics_engine if analytics_engine.ANALYTICS_SOURCE == "columnar" else job_service
+
+def run_analytics(name, fn, show, *args):
+    """Run one analytics query in the background with its dashboard button disabled"""
+    run_db(name, fn, *args, on_done=show, widgets=(analytics_buttons[name],))
+
+def read_analytics_window():
+    """(start, end, label) of the time window entry, or None after reporting a bad one"""
+    try:
+        return job_service.parse_window(analytics_window_entry.get())
+    except ServiceError as e:
+        messagebox.showerror("Error", str(e))
+        return None
+
 def most_interesting_job():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.Title, v.AppCount
-                FROM VacancyJob v
-                WHERE v.AppCount = (SELECT MAX(AppCount) FROM VacancyJob)
-            """)
-            row = cursor.fetchone()
-            if row:
-                messagebox.showinfo("Most Interesting Job",
-                                    f"Job Title: {row.Title}\nApplicants: {row.AppCount}")
-            else:
-                messagebox.showinfo("Most Interesting Job", "No jobs found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    window = read_analytics_window()
+    if window is None:
+        return
+    start, end, label = window
+    def show(row):
+        if row:
+            messagebox.showinfo(f"Most Interesting Job ({label})",
+                                f"Job Title: {row.Title}\nApplicants: {row.AppCount}")
+        else:
+            messagebox.showinfo(f"Most Interesting Job ({label})", f"No jobs with applications ({label}).")
+    run_analytics("most_interesting_job", analytics_source.most_interesting_job, show, start, end)
 
 def job_no_applicants_last_month():
-    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
-    last_month_start = last_month_start.replace(day=1)
-    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
-    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
-
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.Title
-                FROM VacancyJob v
-                LEFT JOIN Application a ON v.JobID = a.JobID
-                AND a.ApplyDate BETWEEN ? AND ?
-                WHERE v.Status = 'Open' AND a.AppID IS NULL
-            """, last_month_start.date(), last_month_end.date())
-            rows = cursor.fetchall()
-            if rows:
-                titles = "\n".join(row.Title for row in rows)
-                messagebox.showinfo("Jobs with No Applicants Last Month",
-                                    f"Job Titles:\n{titles}")
-            else:
-                messagebox.showinfo("Jobs with No Applicants Last Month",
-                                    "No jobs without applicants last month.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    window = read_analytics_window()
+    if window is None:
+        return
+    start, end, label = window
+    def show(job_titles):
+        if job_titles:
+            titles = "\n".join(job_titles)
+            messagebox.showinfo(f"Jobs with No Applicants ({label})",
+                                f"Job Titles:\n{titles}")
+        else:
+            messagebox.showinfo(f"Jobs with No Applicants ({label})",
+                                f"No jobs without applicants ({label}).")
+    run_analytics("job_no_applicants_last_month", analytics_source.jobs_without_applicants, show, start, end)
 
 def employer_max_announcements():
-    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
-    last_month_start = last_month_start.replace(day=1)
-    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
-    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
-
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT e.ComName, COUNT(DISTINCT a.JobID) as JobCount
-                FROM Employer e
-                LEFT JOIN VacancyJob v ON e.UserID = v.EmployerID
-                LEFT JOIN Application a ON v.JobID = a.JobID
-                AND a.ApplyDate BETWEEN ? AND ?
-                GROUP BY e.ComName
-                HAVING COUNT(DISTINCT a.JobID) = (
-                    SELECT MAX(JobCount)
-                    FROM (
-                        SELECT COUNT(DISTINCT a2.JobID) as JobCount
-                        FROM VacancyJob v2
-                        JOIN Application a2 ON v2.JobID = a2.JobID
-                        WHERE a2.ApplyDate BETWEEN ? AND ?
-                        GROUP BY v2.EmployerID
-                    ) AS sub
-                )
-            """, last_month_start.date(), last_month_end.date(),
-                last_month_start.date(), last_month_end.date())
-            row = cursor.fetchone()
-            if row:
-                messagebox.showinfo("Employer with Max Announcements",
-                                    f"Employer: {row.ComName}\nJobs with Applications: {row.JobCount}")
-            else:
-                messagebox.showinfo("Employer with Max Announcements",
-                                    "No jobs with applications last month.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    window = read_analytics_window()
+    if window is None:
+        return
+    start, end, label = window
+    def show(row):
+        if row:
+            messagebox.showinfo(f"Employer with Max Announcements ({label})",
+                                f"Employer: {row.ComName}\nJobs with Applications: {row.JobCount}")
+        else:
+            messagebox.showinfo(f"Employer with Max Announcements ({label})",
+                                f"No jobs with applications ({label}).")
+    run_analytics("employer_max_announcements", analytics_source.employer_max_announcements, show, start, end)
 
 def employers_no_announcements():
-    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
-    last_month_start = last_month_start.replace(day=1)
-    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
-    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
-
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT e.ComName
-                FROM Employer e
-                LEFT JOIN VacancyJob v ON e.UserID = v.EmployerID
-                LEFT JOIN Application a ON v.JobID = a.JobID
-                AND a.ApplyDate BETWEEN ? AND ?
-                WHERE a.AppID IS NULL OR v.JobID IS NULL
-                GROUP BY e.ComName
-            """, last_month_start.date(), last_month_end.date())
-            rows = cursor.fetchall()
-            if rows:
-                employers = "\n".join(row.ComName for row in rows)
-                messagebox.showinfo("Employers with No Announcements Last Month",
-                                    f"Employers:\n{employers}")
-            else:
-                messagebox.showinfo("Employers with No Announcements Last Month",
-                                    "All employers had jobs with applications last month.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    window = read_analytics_window()
+    if window is None:
+        return
+    start, end, label = window
+    def show(names):
+        if names:
+            employers = "\n".join(names)
+            messagebox.showinfo(f"Employers with No Announcements ({label})",
+                                f"Employers:\n{employers}")
+        else:
+            messagebox.showinfo(f"Employers with No Announcements ({label})",
+                                f"All employers had jobs with applications ({label}).")
+    run_analytics("employers_no_announcements", analytics_source.employers_without_announcements, show, start, end)
 
 def available_positions_last_month():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT e.ComName, v.Title
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.Status = 'Open'
-                ORDER BY e.ComName
-            """)
-            rows = cursor.fetchall()
-            if rows:
-                result = {}
-                for row in rows:
-                    if row.ComName not in result:
-                        result[row.ComName] = []
-                    result[row.ComName].append(row.Title)
-                output = "\n".join(
-                    f"{emp}: {', '.join(titles)}" for emp, titles in result.items())
-                messagebox.showinfo("Available Positions", output)
-            else:
-                messagebox.showinfo("Available Positions",
-                                    "No open positions found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def show(result):
+        if result:
+            output = "\n".join(
+                f"{emp}: {', '.join(titles)}" for emp, titles in result.items())
+            messagebox.showinfo("Available Positions", output)
+        else:
+            messagebox.showinfo("Available Positions",
+                                "No open positions found.")
+    run_analytics("available_positions_last_month", analytics_source.available_positions, show)
 
 def job_seeker_applications():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT u.UserID, u.Name, u.Email, u.Phone, j.Industry, j.PreferredLocation, j.AppliedJobCount
-                FROM [User] u
-                JOIN JobSeeker j ON u.UserID = j.UserID
-                WHERE u.Role = 1
-                ORDER BY u.Name
-            """)
-            rows = cursor.fetchall()
-            if rows:
-                output = "\n".join(
-                    f"Name: {row.Name}\nEmail: {row.Email}\nPhone: {row.Phone}\nIndustry: {row.Industry}\nLocation: {row.PreferredLocation}\nJobs Applied: {row.AppliedJobCount}\n"
-                    for row in rows)
-                messagebox.showinfo("Job Seeker Applications", output)
-            else:
-                messagebox.showinfo("Job Seeker Applications",
-                                    "No job seekers found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def show(rows):
+        if rows:
+            output = "\n".join(
+                f"Name: {row.Name}\nEmail: {row.Email}\nPhone: {row.Phone}\nIndustry: {row.Industry}\nLocation: {row.PreferredLocation}\nJobs Applied: {row.AppliedJobCount}\n"
+                for row in rows)
+            messagebox.showinfo("Job Seeker Applications", output)
+        else:
+            messagebox.showinfo("Job Seeker Applications",
+                                "No job seekers found.")
+    run_analytics("job_seeker_applications", analytics_source.job_seeker_applications, show)
+
+def full_report():
+    window = read_analytics_window()
+    if window is None:
+        return
+    path = filedialog.asksaveasfilename(title="Export Analytics Report", defaultextension=".txt",
+                                        filetypes=[("Text", "*.txt"), ("JSON", "*.json")])
+    if not path:
+        return
+    def build():
+        report = analytics_report.run_report(*window)
+        analytics_report.export_report(report, path)
+        return report
+    def show(report):
+        failed = [section['title'] for section in report['sections'] if section['error']]
+        message = f"Report saved to {path}\nCompleted in {report['seconds']:.2f}s"
+        if failed:
+            message += "\n\nFailed sections:\n" + "\n".join(failed)
+        messagebox.showinfo("Full Report", message)
+    run_analytics("full_report", build, show)
+
+# Buttons timed by --profile; wrapped before the widgets bind them
+PROFILED_ACTIONS = (
+    "login", "register_user", "logout", "update_user", "delete_user", "toggle_theme",
+    "create_job", "hide_job", "delete_job", "best_candidates", "accept_application", "reject_application",
+    "apply_for_job", "save_job", "filter_vacancies", "search_vacancies", "recommended_jobs",
+    "trending_jobs", "filter_job_seekers", "show_job_details",
+    "most_interesting_job", "job_no_applicants_last_month", "employer_max_announcements",
+    "employers_no_announcements", "available_positions_last_month", "job_seeker_applications", "full_report",
+)
+if profiler.setup():
+    profiler.instrument(globals(), actions=PROFILED_ACTIONS, prefix="gui", action_phase="render")
+    profiler.instrument(messagebox, waits=("showinfo", "showerror", "showwarning", "askyesno"))
+    profiler.instrument(filedialog, waits=("asksaveasfilename",))
 
 # Initialize GUI
 root = tk.Tk()
 root.title("Job Application System")
 root.geometry("1000x700")
 root.configure(bg=current_colors["BG_COLOR"])
+tasks = gui_tasks.TaskRunner(root)
 
 # Theme and logout buttons
 theme_frame = tk.Frame(root, bg=current_colors["BG_COLOR"])
@@ -1151,8 +785,9 @@ tk.Label(login_frame, text="Password:", bg=current_colors["FRAME_COLOR"], fg=cur
 login_password_entry = tk.Entry(login_frame, show="*")
 login_password_entry.grid(row=1, column=1, padx=5, pady=5)
 
-tk.Button(login_frame, text="Login", command=login,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=15).grid(row=2, column=0, columnspan=2, pady=10)
+login_button = tk.Button(login_frame, text="Login", command=login,
+                         bg=current_colors["BUTTON_COLOR"], fg="white", width=15)
+login_button.grid(row=2, column=0, columnspan=2, pady=10)
 tk.Button(login_frame, text="Register", command=lambda: notebook.select(
     1), bg=current_colors["BUTTON_COLOR"], fg="white", width=15).grid(row=3, column=0, columnspan=2, pady=5)
 
@@ -1224,8 +859,9 @@ tk.Label(seeker_frame, text="Preferred Location:", bg=current_colors["FRAME_COLO
 reg_js_location_entry = tk.Entry(seeker_frame)
 reg_js_location_entry.grid(row=2, column=1, padx=5, pady=5)
 
-tk.Button(register_frame, text="Register", command=register_user,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=15).grid(row=7, column=0, columnspan=2, pady=5)
+register_button = tk.Button(register_frame, text="Register", command=register_user,
+                            bg=current_colors["BUTTON_COLOR"], fg="white", width=15)
+register_button.grid(row=7, column=0, columnspan=2, pady=5)
 tk.Button(register_frame, text="Clear", command=clear_fields, bg="#0e3f4f",
           fg="white", width=15).grid(row=8, column=0, columnspan=2, pady=5)
 
@@ -1276,8 +912,9 @@ tk.Label(job_frame, text="Job ID:", bg=current_colors["FRAME_COLOR"], fg=current
 job_id_entry_employer = tk.Entry(job_frame)
 job_id_entry_employer.grid(row=10, column=1, padx=5, pady=5)
 
-tk.Button(job_frame, text="Create Job", command=create_job,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=7, column=0, columnspan=2, pady=5)
+create_job_button = tk.Button(job_frame, text="Create Job", command=create_job,
+                              bg=current_colors["BUTTON_COLOR"], fg="white")
+create_job_button.grid(row=7, column=0, columnspan=2, pady=5)
 tk.Button(job_frame, text="Clear", command=clear_job_fields,
           bg="#0e3f4f", fg="white").grid(row=8, column=0, columnspan=2, pady=5)
 
@@ -1287,10 +924,18 @@ tk.Label(job_frame, text="Job ID:", bg=current_colors["FRAME_COLOR"], fg=current
     row=10, column=0, padx=5, pady=5, sticky="e")
 job_id_entry_employer = tk.Entry(job_frame)
 job_id_entry_employer.grid(row=10, column=1, padx=5, pady=5)
-tk.Button(job_frame, text="Hide Job", command=hide_job,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=11, column=0, pady=5)
-tk.Button(job_frame, text="Delete Job", command=delete_job,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=11, column=1, pady=5)
+hide_job_button = tk.Button(job_frame, text="Hide Job", command=hide_job,
+                            bg=current_colors["BUTTON_COLOR"], fg="white")
+hide_job_button.grid(row=11, column=0, pady=5)
+delete_job_button = tk.Button(job_frame, text="Delete Job", command=delete_job,
+                              bg=current_colors["BUTTON_COLOR"], fg="white")
+delete_job_button.grid(row=11, column=1, pady=5)
+best_candidates_button = tk.Button(job_frame, text="Best Candidates", command=best_candidates,
+                                   bg=current_colors["BUTTON_COLOR"], fg="white")
+best_candidates_button.grid(row=12, column=0, pady=5)
+applicants_only_var = tk.BooleanVar(value=False)
+tk.Checkbutton(job_frame, text="Applicants only", variable=applicants_only_var,
+               bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(row=12, column=1, pady=5)
 
 job_tree_frame = tk.Frame(employer_frame, bg=current_colors["FRAME_COLOR"])
 job_tree_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
@@ -1301,8 +946,14 @@ job_tree.heading("Title", text="Title")
 job_tree.heading("Location", text="Location")
 job_tree.heading("Company", text="Company")
 job_tree.heading("Industry", text="Industry")
+job_tree_scrollbar = ttk.Scrollbar(job_tree_frame, orient=tk.VERTICAL)
+job_tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 job_tree.pack(fill=tk.BOTH, expand=True)
 job_tree.bind("<Double-1>", show_job_details)
+job_list_source = trending if trending.JOB_SORT == "trending" else job_service
+job_list = gui_virtual_list.VirtualTree(
+    job_tree, job_tree_scrollbar, tasks, "job_tree", job_list_source.count_open_jobs, job_list_source.list_open_jobs_window,
+    lambda row: (row.JobID, row.Title, row.Location, row.ComName, row.ComIndustry), on_error=show_select_error)
 update_job_tree()
 
 applications_frame = tk.Frame(employer_frame, bg=current_colors["FRAME_COLOR"])
@@ -1319,10 +970,12 @@ applications_tree.heading("Status", text="Status")
 applications_tree.pack(fill=tk.BOTH, expand=True)
 btn_frame = tk.Frame(applications_frame, bg=current_colors["FRAME_COLOR"])
 btn_frame.pack(pady=5)
-tk.Button(btn_frame, text="Accept", command=accept_application,
-          bg=current_colors["BUTTON_COLOR"], fg="white").pack(side=tk.LEFT, padx=5)
-tk.Button(btn_frame, text="Reject", command=reject_application,
-          bg=current_colors["BUTTON_COLOR"], fg="white").pack(side=tk.LEFT, padx=5)
+accept_button = tk.Button(btn_frame, text="Accept", command=accept_application,
+                          bg=current_colors["BUTTON_COLOR"], fg="white")
+accept_button.pack(side=tk.LEFT, padx=5)
+reject_button = tk.Button(btn_frame, text="Reject", command=reject_application,
+                          bg=current_colors["BUTTON_COLOR"], fg="white")
+reject_button.pack(side=tk.LEFT, padx=5)
 update_applications_tree()
 
 # Tab 3: JobSeeker Functions
@@ -1337,14 +990,16 @@ apply_frame.pack(padx=20, pady=10)
 
 tk.Label(apply_frame, text="Apply/Save Job:", font=("Arial", 12),
          bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(row=0, column=0, columnspan=2, pady=5)
-tk.Label(apply_frame, text="Job ID:", bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(
+tk.Label(apply_frame, text="Job ID(s):", bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(
     row=1, column=0, padx=5, pady=5, sticky="e")
 job_id_entry_seeker = tk.Entry(apply_frame)
 job_id_entry_seeker.grid(row=1, column=1, padx=5, pady=5)
-tk.Button(apply_frame, text="Apply for Job", command=apply_for_job,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=2, column=0, pady=5)
-tk.Button(apply_frame, text="Save Job", command=save_job,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=2, column=1, pady=5)
+apply_button = tk.Button(apply_frame, text="Apply for Job", command=apply_for_job,
+                         bg=current_colors["BUTTON_COLOR"], fg="white")
+apply_button.grid(row=2, column=0, pady=5)
+save_button = tk.Button(apply_frame, text="Save Job", command=save_job,
+                        bg=current_colors["BUTTON_COLOR"], fg="white")
+save_button.grid(row=2, column=1, pady=5)
 
 filter_frame = tk.Frame(seeker_frame, bg=current_colors["FRAME_COLOR"])
 filter_frame.pack(padx=20, pady=10)
@@ -1366,6 +1021,20 @@ exp_entry_filter.grid(row=3, column=1, padx=5, pady=5)
 tk.Button(filter_frame, text="Filter Vacancies", command=filter_vacancies,
           bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=4, column=0, columnspan=2, pady=5)
 
+tk.Label(filter_frame, text="Search Vacancies:", font=("Arial", 12),
+         bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(row=0, column=2, columnspan=2, pady=5)
+tk.Label(filter_frame, text="Keywords:", bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(
+    row=1, column=2, padx=5, pady=5, sticky="e")
+search_entry_filter = tk.Entry(filter_frame)
+search_entry_filter.grid(row=1, column=3, padx=5, pady=5)
+search_entry_filter.bind("<Return>", lambda e: search_vacancies())
+tk.Button(filter_frame, text="Search", command=search_vacancies,
+          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=2, column=2, columnspan=2, pady=5)
+tk.Button(filter_frame, text="Recommended Jobs", command=recommended_jobs,
+          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=3, column=2, columnspan=2, pady=5)
+tk.Button(filter_frame, text="Trending Jobs", command=trending_jobs,
+          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=4, column=2, columnspan=2, pady=5)
+
 tk.Label(filter_frame, text="Filter Job Seekers:", font=("Arial", 12),
          bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(row=5, column=0, columnspan=2, pady=5)
 tk.Label(filter_frame, text="Industry:", bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(
@@ -1387,7 +1056,8 @@ filtered_vacancies_tree_frame = tk.Frame(
     seeker_frame, bg=current_colors["FRAME_COLOR"])
 filtered_vacancies_tree_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
 filtered_vacancies_tree = ttk.Treeview(filtered_vacancies_tree_frame, columns=(
-    "JobID", "Title", "Description", "Industry", "Location", "Skills", "Experience", "Company"), show="headings")
+    "JobID", "Title", "Description", "Industry", "Location", "Skills", "Experience", "Company"), show="headings",
+    selectmode="extended")      # select several rows to apply to them all at once
 filtered_vacancies_tree.heading("JobID", text="Job ID")
 filtered_vacancies_tree.heading("Title", text="Title")
 filtered_vacancies_tree.heading("Description", text="Description")
@@ -1452,8 +1122,9 @@ tk.Label(user_frame_inner, text="New Password:", bg=current_colors["FRAME_COLOR"
     row=4, column=0, padx=5, pady=5, sticky="e")
 password_entry = tk.Entry(user_frame_inner, show="*")
 password_entry.grid(row=4, column=1, padx=5, pady=5)
-tk.Button(user_frame_inner, text="Update User", command=update_user,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=5, column=0, columnspan=2, pady=5)
+update_user_button = tk.Button(user_frame_inner, text="Update User", command=update_user,
+                               bg=current_colors["BUTTON_COLOR"], fg="white")
+update_user_button.grid(row=5, column=0, columnspan=2, pady=5)
 tk.Button(user_frame_inner, text="Clear", command=clear_fields,
           bg="#0e3f4f", fg="white").grid(row=6, column=0, columnspan=2, pady=5)
 
@@ -1463,8 +1134,9 @@ tk.Label(user_frame_inner, text="Email:", bg=current_colors["FRAME_COLOR"], fg=c
     row=8, column=0, padx=5, pady=5, sticky="e")
 email_entry_delete = tk.Entry(user_frame_inner)
 email_entry_delete.grid(row=8, column=1, padx=5, pady=5)
-tk.Button(user_frame_inner, text="Delete User", command=delete_user,
-          bg=current_colors["BUTTON_COLOR"], fg="white").grid(row=9, column=0, columnspan=2, pady=5)
+delete_user_button = tk.Button(user_frame_inner, text="Delete User", command=delete_user,
+                               bg=current_colors["BUTTON_COLOR"], fg="white")
+delete_user_button.grid(row=9, column=0, columnspan=2, pady=5)
 
 user_tree_frame = tk.Frame(user_frame, bg=current_colors["FRAME_COLOR"])
 user_tree_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
@@ -1474,7 +1146,13 @@ user_tree.heading("UserID", text="User ID")
 user_tree.heading("Name", text="Name")
 user_tree.heading("Email", text="Email")
 user_tree.heading("Role", text="Role")
+user_tree_scrollbar = ttk.Scrollbar(user_tree_frame, orient=tk.VERTICAL)
+user_tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 user_tree.pack(fill=tk.BOTH, expand=True)
+user_list = gui_virtual_list.VirtualTree(
+    user_tree, user_tree_scrollbar, tasks, "user_tree", job_service.count_users, job_service.list_users_window,
+    lambda row: (row.UserID, row.Name, row.Email, "Employer" if row.Role == 0 else "JobSeeker"),
+    on_error=show_select_error)
 update_user_tree()
 
 # Tab 5: Analytics
@@ -1484,21 +1162,28 @@ notebook.add(analytics_frame, text="Analytics")
 tk.Label(analytics_frame, text="Analytics Dashboard", font=("Arial", 16, "bold"),
          bg=current_colors["FRAME_COLOR"], fg=current_colors["TEXT_COLOR"]).pack(pady=20)
 
+analytics_window_frame = tk.Frame(analytics_frame, bg=current_colors["FRAME_COLOR"])
+analytics_window_frame.pack(padx=20)
+tk.Label(analytics_window_frame, text="Time Window (days, or YYYY-MM-DD YYYY-MM-DD; blank = last month):",
+         bg=current_colors["FRAME_COLOR"], fg=current_colors["LABEL_COLOR"]).grid(row=0, column=0, padx=5, pady=5)
+analytics_window_entry = tk.Entry(analytics_window_frame)
+analytics_window_entry.grid(row=0, column=1, padx=5, pady=5)
+
 analytics_buttons_frame = tk.Frame(analytics_frame, bg=current_colors["FRAME_COLOR"])
 analytics_buttons_frame.pack(padx=20, pady=10)
 
-tk.Button(analytics_buttons_frame, text="Most Interesting Job", command=most_interesting_job,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=30).grid(row=0, column=0, padx=5, pady=5)
-tk.Button(analytics_buttons_frame, text="Jobs with No Applicants Last Month", command=job_no_applicants_last_month,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=30).grid(row=1, column=0, padx=5, pady=5)
-tk.Button(analytics_buttons_frame, text="Employer with Max Announcements", command=employer_max_announcements,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=30).grid(row=2, column=0, padx=5, pady=5)
-tk.Button(analytics_buttons_frame, text="Employers with No Announcements", command=employers_no_announcements,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=30).grid(row=3, column=0, padx=5, pady=5)
-tk.Button(analytics_buttons_frame, text="Available Positions", command=available_positions_last_month,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=30).grid(row=4, column=0, padx=5, pady=5)
-tk.Button(analytics_buttons_frame, text="Job Seeker Applications", command=job_seeker_applications,
-          bg=current_colors["BUTTON_COLOR"], fg="white", width=30).grid(row=5, column=0, padx=5, pady=5)
+analytics_buttons = {}
+for row_index, (name, label, command) in enumerate([
+        ("most_interesting_job", "Most Interesting Job", most_interesting_job),
+        ("job_no_applicants_last_month", "Jobs with No Applicants Last Month", job_no_applicants_last_month),
+        ("employer_max_announcements", "Employer with Max Announcements", employer_max_announcements),
+        ("employers_no_announcements", "Employers with No Announcements", employers_no_announcements),
+        ("available_positions_last_month", "Available Positions", available_positions_last_month),
+        ("job_seeker_applications", "Job Seeker Applications", job_seeker_applications),
+        ("full_report", "Full Report (Export)", full_report)]):
+    analytics_buttons[name] = tk.Button(analytics_buttons_frame, text=label, command=command,
+                                        bg=current_colors["BUTTON_COLOR"], fg="white", width=30)
+    analytics_buttons[name].grid(row=row_index, column=0, padx=5, pady=5)
 
 # Initially hide all tabs except login
 notebook.tab(1, state="normal")
@@ -1508,4 +1193,5 @@ notebook.tab(4, state="disabled")
 notebook.tab(5, state="disabled")
 notebook.select(0)
 
-root.mainloop()
\ No newline at end of file
+root.mainloop()
+tasks.shutdown()
\ No newline at end of file
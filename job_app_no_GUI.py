@@ -1,26 +1,21 @@
-import pyodbc
-from datetime import datetime, timedelta
+import os
 import uuid
 
-# Database connection configuration
-CONN_STR = (
-    r"DRIVER={ODBC Driver 17 for SQL Server};"
-    r"SERVER=ALIOSAMA155\SQLEXPRESS;"
-    r"DATABASE=my_project;"
-    r"Trusted_Connection=Yes;"
-)
+import analytics_engine
+import analytics_report
+import db_backend
+import job_service
+import profiler
+import search_index
+import skill_matrix
+import trending
+from job_service import ServiceError
 
 # Global variables
 logged_in_user = None
-
-def get_connection():
-    """Establish database connection with error handling"""
-    try:
-        conn = pyodbc.connect(CONN_STR)
-        return conn
-    except Exception as e:
-        print(f"Connection Error: Failed to connect to database: {str(e)}")
-        return None
+PAGE_SIZE = int(os.environ.get("JOBAPP_PAGE_SIZE", job_service.PAGE_SIZE))
+analytics_window = ""       # time window of the analytics menu as typed; blank is last month
+analytics_source = analytics_engine if analytics_engine.ANALYTICS_SOURCE == "columnar" else job_service
 
 # ─── Authentication Functions ───────────────────────────────────────────
 def login():
@@ -35,40 +30,16 @@ def login():
         print("Login Error: Password must be at least 6 characters!")
         return False
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT UserID, Name, Email, Role 
-                FROM [User] 
-                WHERE Email = ? AND Password = ?
-            """, (email, password))
-            user = cursor.fetchone()
-            if user:
-                user_info = {
-                    'user_id': user.UserID,
-                    'name': user.Name,
-                    'email': user.Email,
-                    'role': 'Employer' if user.Role == 0 else 'JobSeeker'
-                }
-                if user.Role == 0:
-                    cursor.execute(
-                        "SELECT ComName FROM Employer WHERE UserID = ?", user.UserID)
-                    employer_info = cursor.fetchone()
-                    user_info['company_name'] = employer_info.ComName if employer_info else None
-                logged_in_user = user_info
-                print(f"Login successful! Welcome {user_info['name']}")
-                return True
-            else:
-                print("Login Error: Invalid email or password")
-                return False
-        except Exception as e:
-            print(f"Login Error: Login failed: {str(e)}")
-            return False
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        user_info = job_service.authenticate(email, password)
+    except Exception as e:
+        print(f"Login Error: Login failed: {str(e)}")
+        return False
+    if user_info:
+        logged_in_user = user_info
+        print(f"Login successful! Welcome {user_info['name']}")
+        return True
+    print("Login Error: Invalid email or password")
     return False
 
 def register_user():
@@ -112,38 +83,13 @@ def register_user():
             return
         kwargs = {"resume_link": resume_link, "industry": industry, "location": location}
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO [User] (Name, Email, Phone, Role, Password)
-                OUTPUT INSERTED.UserID
-                VALUES (?, ?, ?, ?, ?)
-            """, name, email, phone, role_num, password)
-            user_id = cursor.fetchone().UserID
-
-            if role == "Employer":
-                cursor.execute("""
-                    INSERT INTO Employer (UserID, ComName, ComIndustry, Location, AnnouncedJobCount)
-                    VALUES (?, ?, ?, ?, 0)
-                """, user_id, kwargs["company_name"], kwargs["industry"], kwargs["location"])
-            else:
-                cursor.execute("""
-                    INSERT INTO JobSeeker (UserID, ResumeLink, Industry, PreferredLocation, AppliedJobCount)
-                    VALUES (?, ?, ?, ?, 0)
-                """, user_id, kwargs["resume_link"], kwargs["industry"], kwargs["location"])
-
-            conn.commit()
-            print(f"User registered successfully! UserID: {user_id}")
-        except pyodbc.IntegrityError:
-            print("Error: Email already exists!")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Failed to register user: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        user_id = job_service.register_user(name, email, phone, role_num, password, **kwargs)
+        print(f"User registered successfully! UserID: {user_id}")
+    except db_backend.INTEGRITY_ERRORS:
+        print("Error: Email already exists!")
+    except Exception as e:
+        print(f"Error: Failed to register user: {str(e)}")
 
 def logout():
     global logged_in_user
@@ -151,6 +97,31 @@ def logout():
     print("Logged out successfully!")
 
 # ─── Job Management Functions ──────────────────────────────────────────
+def read_job_id():
+    """Prompt for a Job ID; returns it as int, or None after printing the problem"""
+    job_id_input = input("Enter Job ID: ").strip()
+    if not job_id_input:
+        print("Error: Job ID is required!")
+        return None
+    try:
+        return int(job_id_input)
+    except ValueError:
+        print("Error: Job ID must be a valid number!")
+        return None
+
+def read_job_ids():
+    """Prompt for one or more comma-separated Job IDs; returns a list, or None after printing the problem"""
+    job_ids_input = input("Enter Job ID(s), comma separated: ").strip()
+    parts = [part.strip() for part in job_ids_input.split(",") if part.strip()]
+    if not parts:
+        print("Error: Job ID is required!")
+        return None
+    try:
+        return [int(part) for part in parts]
+    except ValueError:
+        print("Error: Job ID must be a valid number!")
+        return None
+
 def create_job():
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         print("Error: You must be logged in as an Employer to create a job!")
@@ -161,7 +132,7 @@ def create_job():
     location = input("Enter Location: ").strip()
     skills = input("Enter Required Skills: ").strip()
     exp_input = input("Enter Minimum Experience (years): ").strip()
-    
+
     if not exp_input:
         print("Error: Minimum experience is required!")
         return
@@ -177,189 +148,90 @@ def create_job():
         print("Error: All fields are required!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO VacancyJob (EmployerID, Title, Description, Industry, Location, ReqSkill, EXPRequired, AppCount, Status)
-                OUTPUT INSERTED.JobID
-                VALUES (?, ?, ?, ?, ?, ?, ?, 0, 'Open')
-            """, logged_in_user['user_id'], title, desc, industry, location, skills, exp)
-            job_id = cursor.fetchone().JobID
-            cursor.execute("UPDATE Employer SET AnnouncedJobCount = AnnouncedJobCount + 1 WHERE UserID = ?", logged_in_user['user_id'])
-            conn.commit()
-            print(f"Job created successfully! JobID: {job_id}")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Failed to create job: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_id = job_service.create_job(logged_in_user['user_id'], title, desc, industry, location, skills, exp)
+        print(f"Job created successfully! JobID: {job_id}")
+    except Exception as e:
+        print(f"Error: Failed to create job: {str(e)}")
 
 def hide_job():
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         print("Error: You must be logged in as an Employer to hide a job!")
         return
-    job_id_input = input("Enter Job ID: ").strip()
-    if not job_id_input:
-        print("Error: Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        print("Error: Job ID must be a valid number!")
+    job_id = read_job_id()
+    if job_id is None:
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT JobID FROM VacancyJob WHERE JobID = ? AND EmployerID = ?", job_id, logged_in_user['user_id'])
-            job = cursor.fetchone()
-            if not job:
-                print(f"Error: No job found with JobID: {job_id} for this Employer!")
-                return
-            cursor.execute("UPDATE VacancyJob SET Status = 'Closed' WHERE JobID = ?", job_id)
-            conn.commit()
-            print(f"JobID: {job_id} has been hidden successfully")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Hide error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_service.hide_job(logged_in_user['user_id'], job_id)
+        print(f"JobID: {job_id} has been hidden successfully")
+    except ServiceError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error: Hide error: {str(e)}")
 
 def delete_job():
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         print("Error: You must be logged in as an Employer to delete a job!")
         return
-    job_id_input = input("Enter Job ID: ").strip()
-    if not job_id_input:
-        print("Error: Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        print("Error: Job ID must be a valid number!")
+    job_id = read_job_id()
+    if job_id is None:
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT EmployerID FROM VacancyJob WHERE JobID = ?", job_id)
-            job = cursor.fetchone()
-            if not job:
-                print(f"Error: No job found with JobID: {job_id}")
-                return
-            if job.EmployerID != logged_in_user['user_id']:
-                print("Error: You can only delete jobs that you created!")
-                return
-            cursor.execute("DELETE FROM Application WHERE JobID = ?", job_id)
-            cursor.execute("DELETE FROM SavedVacancy WHERE JobID = ?", job_id)
-            cursor.execute("DELETE FROM VacancyJob WHERE JobID = ?", job_id)
-            cursor.execute("UPDATE Employer SET AnnouncedJobCount = AnnouncedJobCount - 1 WHERE UserID = ?",
-                           logged_in_user['user_id'])
-            conn.commit()
-            print(f"Deleted job with JobID: {job_id}")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Delete error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_service.delete_job(logged_in_user['user_id'], job_id)
+        print(f"Deleted job with JobID: {job_id}")
+    except ServiceError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error: Delete error: {str(e)}")
 
 def apply_for_job():
     if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
         print("Error: You must be logged in as a JobSeeker to apply for a job!")
         return
-    job_id_input = input("Enter Job ID: ").strip()
-    if not job_id_input:
-        print("Error: Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        print("Error: Job ID must be a valid number!")
+    job_ids = read_job_ids()
+    if job_ids is None:
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
+    if len(job_ids) > 1:
         try:
-            cursor.execute("SELECT Status FROM VacancyJob WHERE JobID = ?", job_id)
-            job = cursor.fetchone()
-            if not job:
-                print(f"Error: No job found with JobID: {job_id}")
-                return
-            if job.Status != 'Open':
-                print("Error: This job is not open for applications!")
-                return
-            cursor.execute("SELECT AppID FROM Application WHERE SeekerID = ? AND JobID = ?",
-                           logged_in_user['user_id'], job_id)
-            if cursor.fetchone():
-                print("Error: You have already applied for this job!")
-                return
-            cursor.execute("INSERT INTO Application (JobID, SeekerID, Status, ApplyDate) VALUES (?, ?, 'Pending', ?)",
-                           job_id, logged_in_user['user_id'], datetime.now().date())
-            cursor.execute("UPDATE VacancyJob SET AppCount = AppCount + 1 WHERE JobID = ?", job_id)
-            cursor.execute("UPDATE JobSeeker SET AppliedJobCount = AppliedJobCount + 1 WHERE UserID = ?", logged_in_user['user_id'])
-            conn.commit()
-            print(f"Successfully applied for JobID: {job_id}")
+            applied, failures = job_service.apply_bulk(logged_in_user['user_id'], job_ids)
         except Exception as e:
-            conn.rollback()
             print(f"Error: Apply error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+            return
+        if applied:
+            print(f"Successfully applied for JobIDs: {', '.join(map(str, applied))}")
+        for job_id, reason in failures.items():
+            print(f"Error: JobID {job_id}: {reason}")
+        return
+
+    job_id = job_ids[0]
+    try:
+        job_service.apply(logged_in_user['user_id'], job_id)
+        print(f"Successfully applied for JobID: {job_id}")
+    except ServiceError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error: Apply error: {str(e)}")
 
 def save_job():
     if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
         print("Error: You must be logged in as a JobSeeker to save a job!")
         return
-    job_id_input = input("Enter Job ID: ").strip()
-    if not job_id_input:
-        print("Error: Job ID is required!")
-        return
-    try:
-        job_id = int(job_id_input)
-    except ValueError:
-        print("Error: Job ID must be a valid number!")
+    job_id = read_job_id()
+    if job_id is None:
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT Status FROM VacancyJob WHERE JobID = ?", job_id)
-            job = cursor.fetchone()
-            if not job:
-                print(f"Error: No job found with JobID: {job_id}")
-                return
-            if job.Status != 'Open':
-                print("Error: This job is not open and cannot be saved!")
-                return
-            cursor.execute("SELECT JobID FROM SavedVacancy WHERE SeekerID = ? AND JobID = ?",
-                           logged_in_user['user_id'], job_id)
-            if cursor.fetchone():
-                print("Error: You have already saved this job!")
-                return
-            cursor.execute("INSERT INTO SavedVacancy (JobID, SeekerID, SaveDate) VALUES (?, ?, ?)",
-                           job_id, logged_in_user['user_id'], datetime.now().date())
-            conn.commit()
-            print(f"Successfully saved JobID: {job_id}")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Save error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_service.save(logged_in_user['user_id'], job_id)
+        print(f"Successfully saved JobID: {job_id}")
+    except ServiceError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error: Save error: {str(e)}")
 
-def accept_application():
-    if not logged_in_user or logged_in_user['role'] != 'Employer':
-        print("Error: You must be logged in as an Employer to accept applications!")
-        return
+def set_application_status(new_status):
     app_id = input("Enter Application ID: ").strip()
     if not app_id:
         print("Error: Application ID is required!")
@@ -370,134 +242,115 @@ def accept_application():
         print("Error: Application ID must be a valid number!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("UPDATE Application SET Status = 'Accepted' WHERE AppID = ?", app_id)
-            conn.commit()
-            print(f"Application status updated to Accepted for AppID: {app_id}")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Update error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_service.set_application_status(app_id, new_status)
+        print(f"Application status updated to {new_status} for AppID: {app_id}")
+    except Exception as e:
+        print(f"Error: Update error: {str(e)}")
+
+def accept_application():
+    if not logged_in_user or logged_in_user['role'] != 'Employer':
+        print("Error: You must be logged in as an Employer to accept applications!")
+        return
+    set_application_status("Accepted")
 
 def reject_application():
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         print("Error: You must be logged in as an Employer to reject applications!")
         return
-    app_id = input("Enter Application ID: ").strip()
-    if not app_id:
-        print("Error: Application ID is required!")
-        return
-    try:
-        app_id = int(app_id)
-    except ValueError:
-        print("Error: Application ID must be a valid number!")
-        return
+    set_application_status("Rejected")
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("UPDATE Application SET Status = 'Rejected' WHERE AppID = ?", app_id)
-            conn.commit()
-            print(f"Application status updated to Rejected for AppID: {app_id}")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Update error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+def browse_pages(title, fetch_page, key, show_row):
+    """Print rows one page at a time with next/previous navigation; False if there are none.
 
-def list_jobs():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.JobID, v.Title, v.Location, e.ComName, e.ComIndustry
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.Status = 'Open'
-            """)
-            rows = cursor.fetchall()
-            if rows:
-                print("\nOpen Jobs:")
-                for row in rows:
-                    print(f"JobID: {row.JobID}, Title: {row.Title}, Location: {row.Location}, "
-                          f"Company: {row.ComName}, Industry: {row.ComIndustry}")
+    fetch_page(after=..., before=..., page_size=...) returns (rows, more) as
+    the job_service *_page functions do, and key(row) gives the row's seek key.
+    """
+    rows, has_next = fetch_page(page_size=PAGE_SIZE)
+    if not rows:
+        return False
+    has_prev = False
+    page = 1
+    while True:
+        print(f"\n{title}:" if page == 1 else f"\n{title} (page {page}):")
+        for row in rows:
+            show_row(row)
+        if not has_next and not has_prev:
+            return True
+        while True:
+            options = (["[n]ext"] if has_next else []) + (["[p]revious"] if has_prev else [])
+            choice = input(f"Page {page}: {' / '.join(options)} page, or Enter to go back: ").strip().lower()
+            if not choice:
+                return True
+            if choice == "n" and has_next:
+                next_rows, more = fetch_page(after=key(rows[-1]), page_size=PAGE_SIZE)
+                if next_rows:
+                    rows, has_next, has_prev, page = next_rows, more, True, page + 1
+                    break
+                has_next = False        # the rows after this page were deleted meanwhile
+                print("No more rows.")
+            elif choice == "p" and has_prev:
+                prev_rows, more = fetch_page(before=key(rows[0]), page_size=PAGE_SIZE)
+                if prev_rows:
+                    rows, has_next, has_prev, page = prev_rows, True, more, page - 1
+                    break
+                has_prev = False
+                print("No more rows.")
             else:
-                print("No open jobs found.")
-        except Exception as e:
-            print(f"Error: Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+                print("Invalid choice!")
+
+def list_jobs():
+    def show(row):
+        print(f"JobID: {row.JobID}, Title: {row.Title}, Location: {row.Location}, "
+              f"Company: {row.ComName}, Industry: {row.ComIndustry}")
+    fetch_page = trending.open_jobs_page if trending.JOB_SORT == "trending" else job_service.open_jobs_page
+    try:
+        found = browse_pages("Open Jobs", fetch_page, lambda row: row.JobID, show)
+    except Exception as e:
+        print(f"Error: Select error: {str(e)}")
+        return
+    if not found:
+        print("No open jobs found.")
 
 def list_saved_jobs():
     if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
         print("Error: You must be logged in as a JobSeeker to view saved jobs!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT sv.JobID, v.Title, v.Description, v.Industry, v.Location
-                FROM SavedVacancy sv
-                JOIN VacancyJob v ON sv.JobID = v.JobID
-                WHERE sv.SeekerID = ?
-            """, logged_in_user['user_id'])
-            rows = cursor.fetchall()
-            if rows:
-                print("\nSaved Jobs:")
-                for row in rows:
-                    print(f"JobID: {row.JobID}, Title: {row.Title}, Description: {row.Description}, "
-                          f"Industry: {row.Industry}, Location: {row.Location}")
-            else:
-                print("No saved jobs found.")
-        except Exception as e:
-            print(f"Error: Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        rows = job_service.list_saved_jobs(logged_in_user['user_id'])
+    except Exception as e:
+        print(f"Error: Select error: {str(e)}")
+        return
+    if rows:
+        print("\nSaved Jobs:")
+        for row in rows:
+            print(f"JobID: {row.JobID}, Title: {row.Title}, Description: {row.Description}, "
+                  f"Industry: {row.Industry}, Location: {row.Location}")
+    else:
+        print("No saved jobs found.")
 
 def list_applications():
     if not logged_in_user or logged_in_user['role'] != 'Employer':
         print("Error: You must be logged in as an Employer to view applications!")
         return
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT a.AppID, a.JobID, v.Title, u.Name, a.Status
-                FROM Application a
-                JOIN VacancyJob v ON a.JobID = v.JobID
-                JOIN [User] u ON a.SeekerID = u.UserID
-                WHERE v.EmployerID = ?
-            """, logged_in_user['user_id'])
-            rows = cursor.fetchall()
-            if rows:
-                print("\nApplications:")
-                for row in rows:
-                    print(f"AppID: {row.AppID}, JobID: {row.JobID}, Job Title: {row.Title}, "
-                          f"Seeker Name: {row.Name}, Status: {row.Status}")
-            else:
-                print("No applications found.")
-        except Exception as e:
-            print(f"Error: Select error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        rows = job_service.list_applications(logged_in_user['user_id'])
+    except Exception as e:
+        print(f"Error: Select error: {str(e)}")
+        return
+    if rows:
+        print("\nApplications:")
+        for row in rows:
+            print(f"AppID: {row.AppID}, JobID: {row.JobID}, Job Title: {row.Title}, "
+                  f"Seeker Name: {row.Name}, Status: {row.Status}")
+    else:
+        print("No applications found.")
 
 def filter_vacancies():
     industry = input("Enter Industry (or press Enter to skip): ").strip() or None
     location = input("Enter Location (or press Enter to skip): ").strip() or None
     exp_input = input("Enter Maximum Experience (or press Enter to skip): ").strip() or None
+    exp = None
     if exp_input:
         try:
             exp = int(exp_input)
@@ -508,49 +361,77 @@ def filter_vacancies():
             print("Error: Maximum experience must be a valid number!")
             return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            conditions = []
-            values = []
-            query = """
-                SELECT v.JobID, v.Title, v.Description, v.Industry, v.Location, v.ReqSkill, v.EXPRequired, e.ComName
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.Status = 'Open'
-            """
-            if industry:
-                conditions.append("v.Industry = ?")
-                values.append(industry)
-            if location:
-                conditions.append("v.Location = ?")
-                values.append(location)
-            if exp_input:
-                conditions.append("v.EXPRequired <= ?")
-                values.append(exp)
-            if conditions:
-                query += " AND " + " AND ".join(conditions)
-            cursor.execute(query, *values)
-            rows = cursor.fetchall()
-            if rows:
-                print("\nFiltered Vacancies:")
-                for row in rows:
-                    print(f"JobID: {row.JobID}, Title: {row.Title}, Description: {row.Description}, "
-                          f"Industry: {row.Industry}, Location: {row.Location}, Skills: {row.ReqSkill}, "
-                          f"Min Experience: {row.EXPRequired}, Company: {row.ComName}")
-            else:
-                print("No vacancies match the criteria.")
-        except Exception as e:
-            print(f"Error: Filter error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    def fetch_page(**page):
+        return job_service.filter_vacancies_page(industry, location, exp, **page)
+
+    def show(row):
+        print(f"JobID: {row.JobID}, Title: {row.Title}, Description: {row.Description}, "
+              f"Industry: {row.Industry}, Location: {row.Location}, Skills: {row.ReqSkill}, "
+              f"Min Experience: {row.EXPRequired}, Company: {row.ComName}")
+    try:
+        found = browse_pages("Filtered Vacancies", fetch_page, lambda row: row.JobID, show)
+    except Exception as e:
+        print(f"Error: Filter error: {str(e)}")
+        return
+    if not found:
+        print("No vacancies match the criteria.")
+
+def search_vacancies():
+    query = input("Enter keywords (title, skills or description): ").strip()
+    if not query:
+        print("Error: Keywords are required!")
+        return
+    try:
+        rows = search_index.search_jobs(query)
+    except Exception as e:
+        print(f"Error: Search error: {str(e)}")
+        return
+    if rows:
+        print(f"\nTop {len(rows)} matches:")
+        for row in rows:
+            print(f"JobID: {row.JobID}, Title: {row.Title}, Industry: {row.Industry}, Location: {row.Location}, "
+                  f"Skills: {row.ReqSkill}, Min Experience: {row.EXPRequired}, Company: {row.ComName}")
+    else:
+        print("No vacancies match the keywords.")
+
+def recommended_jobs():
+    if not logged_in_user or logged_in_user['role'] != 'JobSeeker':
+        print("Error: You must be logged in as a JobSeeker to get recommendations!")
+        return
+    try:
+        ranked = skill_matrix.recommend_jobs(logged_in_user['user_id'])
+    except Exception as e:
+        print(f"Error: Recommendation error: {str(e)}")
+        return
+    if ranked:
+        print("\nRecommended Jobs:")
+        for row, score in ranked:
+            print(f"JobID: {row.JobID}, Title: {row.Title}, Skills: {row.ReqSkill}, "
+                  f"Min Experience: {row.EXPRequired}, Company: {row.ComName}, Match: {score:.0%}")
+    else:
+        print("No open jobs match your skills.")
+
+def trending_jobs():
+    industry = input("Enter Industry (or press Enter to skip): ").strip() or None
+    location = input("Enter Location (or press Enter to skip): ").strip() or None
+    try:
+        ranked = trending.trending_jobs(trending.TRENDING_LIMIT, industry, location)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if ranked:
+        print("\nTrending Jobs:")
+        for row, score in ranked:
+            print(f"JobID: {row.JobID}, Title: {row.Title}, Industry: {row.Industry}, Location: {row.Location}, "
+                  f"Company: {row.ComName}, Trend Score: {score:.2f}")
+    else:
+        print("No recent activity on matching jobs.")
 
 def filter_job_seekers():
     industry = input("Enter Industry (or press Enter to skip): ").strip() or None
     location = input("Enter Location (or press Enter to skip): ").strip() or None
     exp_input = input("Enter Minimum Experience (or press Enter to skip): ").strip() or None
+    exp = None
     if exp_input:
         try:
             exp = int(exp_input)
@@ -561,88 +442,64 @@ def filter_job_seekers():
             print("Error: Minimum experience must be a valid number!")
             return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            conditions = []
-            values = []
-            query = """
-                SELECT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
-                FROM [User] u
-                JOIN JobSeeker j ON u.UserID = j.UserID
-                WHERE u.Role = 1
-            """
-            if exp_input:
-                query = """
-                    SELECT DISTINCT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
-                    FROM [User] u
-                    JOIN JobSeeker j ON u.UserID = j.UserID
-                    JOIN HasSkills hs ON j.UserID = hs.UserID
-                    WHERE u.Role = 1 AND hs.EXPYears >= ?
-                """
-                values.append(exp)
-            if industry:
-                conditions.append("j.Industry = ?")
-                values.append(industry)
-            if location:
-                conditions.append("j.PreferredLocation = ?")
-                values.append(location)
-            if conditions:
-                query += " AND " + " AND ".join(conditions)
-            cursor.execute(query, *values)
-            rows = cursor.fetchall()
-            if rows:
-                print("\nFiltered Job Seekers:")
-                for row in rows:
-                    print(f"UserID: {row.UserID}, Name: {row.Name}, Email: {row.Email}, "
-                          f"Industry: {row.Industry}, Preferred Location: {row.PreferredLocation}")
-            else:
-                print("No job seekers match the criteria.")
-        except Exception as e:
-            print(f"Error: Filter error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        rows = job_service.filter_job_seekers(industry, location, exp)
+    except Exception as e:
+        print(f"Error: Filter error: {str(e)}")
+        return
+    if rows:
+        print("\nFiltered Job Seekers:")
+        for row in rows:
+            print(f"UserID: {row.UserID}, Name: {row.Name}, Email: {row.Email}, "
+                  f"Industry: {row.Industry}, Preferred Location: {row.PreferredLocation}")
+    else:
+        print("No job seekers match the criteria.")
 
-def show_job_details():
-    job_id_input = input("Enter Job ID: ").strip()
-    if not job_id_input:
-        print("Error: Job ID is required!")
+def best_candidates():
+    if not logged_in_user or logged_in_user['role'] != 'Employer':
+        print("Error: You must be logged in as an Employer to rank candidates!")
         return
+    job_id = read_job_id()
+    if job_id is None:
+        return
+    applicants_only = input("Only rank applicants to this job? (y/n): ").strip().lower() == "y"
     try:
-        job_id = int(job_id_input)
-    except ValueError:
-        print("Error: Job ID must be a valid number!")
+        ranked = skill_matrix.rank_candidates(logged_in_user['user_id'], job_id, applicants_only=applicants_only)
+    except ServiceError as e:
+        print(f"Error: {e}")
+        return
+    except Exception as e:
+        print(f"Error: Ranking error: {str(e)}")
+        return
+    if ranked:
+        print(f"\nBest Candidates for JobID {job_id}:")
+        for row, score in ranked:
+            print(f"UserID: {row.UserID}, Name: {row.Name}, Email: {row.Email}, Industry: {row.Industry}, "
+                  f"Location: {row.PreferredLocation}, Match: {score:.0%}")
+    else:
+        print("No matching candidates found.")
+
+def show_job_details():
+    job_id = read_job_id()
+    if job_id is None:
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.Title, v.Description, v.Industry, v.Location, v.ReqSkill, v.EXPRequired, e.ComName
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.JobID = ?
-            """, job_id)
-            job = cursor.fetchone()
-            if job:
-                print(f"\nJob Details (ID: {job_id}):")
-                print(f"Title: {job.Title}")
-                print(f"Description: {job.Description}")
-                print(f"Industry: {job.Industry}")
-                print(f"Location: {job.Location}")
-                print(f"Required Skills: {job.ReqSkill}")
-                print(f"Min Experience: {job.EXPRequired}")
-                print(f"Company: {job.ComName}")
-            else:
-                print(f"No job found with JobID: {job_id}")
-        except Exception as e:
-            print(f"Error: Error fetching job details: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job = job_service.get_job_details(job_id)
+    except Exception as e:
+        print(f"Error: Error fetching job details: {str(e)}")
+        return
+    if job:
+        print(f"\nJob Details (ID: {job_id}):")
+        print(f"Title: {job.Title}")
+        print(f"Description: {job.Description}")
+        print(f"Industry: {job.Industry}")
+        print(f"Location: {job.Location}")
+        print(f"Required Skills: {job.ReqSkill}")
+        print(f"Min Experience: {job.EXPRequired}")
+        print(f"Company: {job.ComName}")
+    else:
+        print(f"No job found with JobID: {job_id}")
 
 # ─── User Management Functions ──────────────────────────────────────────
 def update_user():
@@ -667,37 +524,13 @@ def update_user():
         print("Error: No update fields provided!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            updates = []
-            values = []
-            if name:
-                updates.append("Name = ?")
-                values.append(name)
-            if email:
-                updates.append("Email = ?")
-                values.append(email)
-            if phone:
-                updates.append("Phone = ?")
-                values.append(phone)
-            if password:
-                updates.append("Password = ?")
-                values.append(password)
-            set_clause = ", ".join(updates)
-            values.append(logged_in_user['user_id'])
-            cursor.execute(f"UPDATE [User] SET {set_clause} WHERE UserID = ?", *values)
-            conn.commit()
-            print("User updated successfully!")
-        except pyodbc.IntegrityError:
-            print("Error: Email already exists!")
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Update error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_service.update_user(logged_in_user['user_id'], name, email, phone, password)
+        print("User updated successfully!")
+    except db_backend.INTEGRITY_ERRORS:
+        print("Error: Email already exists!")
+    except Exception as e:
+        print(f"Error: Update error: {str(e)}")
 
 def delete_user():
     if not logged_in_user:
@@ -708,221 +541,126 @@ def delete_user():
         print("Error: You can only delete your own account!")
         return
 
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT UserID, Role FROM [User] WHERE Email = ?", email)
-            user = cursor.fetchone()
-            if not user:
-                print(f"Error: No user found with email: {email}")
-                return
-            user_id = user.UserID
-            role = user.Role
-            if role == 0:
-                cursor.execute("DELETE FROM Application WHERE JobID IN (SELECT JobID FROM VacancyJob WHERE EmployerID = ?)", user_id)
-                cursor.execute("DELETE FROM SavedVacancy WHERE JobID IN (SELECT JobID FROM VacancyJob WHERE EmployerID = ?)", user_id)
-                cursor.execute("DELETE FROM VacancyJob WHERE EmployerID = ?", user_id)
-                cursor.execute("DELETE FROM Employer WHERE UserID = ?", user_id)
-            else:
-                cursor.execute("DELETE FROM Application WHERE SeekerID = ?", user_id)
-                cursor.execute("DELETE FROM SavedVacancy WHERE SeekerID = ?", user_id)
-                cursor.execute("DELETE FROM HasSkills WHERE UserID = ?", user_id)
-                cursor.execute("DELETE FROM JobSeeker WHERE UserID = ?", user_id)
-            cursor.execute("DELETE FROM [User] WHERE Email = ?", email)
-            conn.commit()
-            print("User deleted successfully!")
-            logout()
-        except Exception as e:
-            conn.rollback()
-            print(f"Error: Delete error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        job_service.delete_user(email)
+        print("User deleted successfully!")
+        logout()
+    except ServiceError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"Error: Delete error: {str(e)}")
 
 # ─── Analytics Functions ──────────────────────────────────────────
+def set_analytics_window():
+    global analytics_window
+    text = input("Time window (Enter for last month, a number of days such as 7/30/90, "
+                 "or YYYY-MM-DD YYYY-MM-DD): ").strip()
+    try:
+        label = job_service.parse_window(text)[2]
+    except ServiceError as e:
+        print(f"Error: {e}")
+        return
+    analytics_window = text
+    print(f"Analytics now cover: {label}")
+
 def most_interesting_job():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.Title, v.AppCount
-                FROM VacancyJob v
-                WHERE v.AppCount = (SELECT MAX(AppCount) FROM VacancyJob)
-            """)
-            row = cursor.fetchone()
-            if row:
-                print(f"Most Interesting Job: {row.Title}, Applicants: {row.AppCount}")
-            else:
-                print("No jobs found.")
-        except Exception as e:
-            print(f"Error: Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        start, end, label = job_service.parse_window(analytics_window)
+        row = analytics_source.most_interesting_job(start, end)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if row:
+        print(f"Most Interesting Job ({label}): {row.Title}, Applicants: {row.AppCount}")
+    else:
+        print(f"No jobs with applications ({label}).")
 
 def job_no_applicants_last_month():
-    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
-    last_month_start = last_month_start.replace(day=1)
-    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
-    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
-
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT v.Title
-                FROM VacancyJob v
-                LEFT JOIN Application a ON v.JobID = a.JobID
-                AND a.ApplyDate BETWEEN ? AND ?
-                WHERE v.Status = 'Open' AND a.AppID IS NULL
-            """, last_month_start.date(), last_month_end.date())
-            rows = cursor.fetchall()
-            if rows:
-                print("\nJobs with No Applicants Last Month:")
-                for row in rows:
-                    print(row.Title)
-            else:
-                print("No jobs without applicants last month.")
-        except Exception as e:
-            print(f"Error: Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        start, end, label = job_service.parse_window(analytics_window)
+        titles = analytics_source.jobs_without_applicants(start, end)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if titles:
+        print(f"\nJobs with No Applicants ({label}):")
+        for title in titles:
+            print(title)
+    else:
+        print(f"No jobs without applicants ({label}).")
 
 def employer_max_announcements():
-    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
-    last_month_start = last_month_start.replace(day=1)
-    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
-    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
-
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT e.ComName, COUNT(DISTINCT a.JobID) as JobCount
-                FROM Employer e
-                LEFT JOIN VacancyJob v ON e.UserID = v.EmployerID
-                LEFT JOIN Application a ON v.JobID = a.JobID
-                AND a.ApplyDate BETWEEN ? AND ?
-                GROUP BY e.ComName
-                HAVING COUNT(DISTINCT a.JobID) = (
-                    SELECT MAX(JobCount)
-                    FROM (
-                        SELECT COUNT(DISTINCT a2.JobID) as JobCount
-                        FROM VacancyJob v2
-                        JOIN Application a2 ON v2.JobID = a2.JobID
-                        WHERE a2.ApplyDate BETWEEN ? AND ?
-                        GROUP BY v2.EmployerID
-                    ) AS sub
-                )
-            """, last_month_start.date(), last_month_end.date(),
-                last_month_start.date(), last_month_end.date())
-            row = cursor.fetchone()
-            if row:
-                print(f"Employer with Max Announcements: {row.ComName}, Jobs with Applications: {row.JobCount}")
-            else:
-                print("No jobs with applications last month.")
-        except Exception as e:
-            print(f"Error: Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        start, end, label = job_service.parse_window(analytics_window)
+        row = analytics_source.employer_max_announcements(start, end)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if row:
+        print(f"Employer with Max Announcements: {row.ComName}, Jobs with Applications: {row.JobCount}")
+    else:
+        print(f"No jobs with applications ({label}).")
 
 def employers_no_announcements():
-    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
-    last_month_start = last_month_start.replace(day=1)
-    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
-    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
-
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT e.ComName
-                FROM Employer e
-                LEFT JOIN VacancyJob v ON e.UserID = v.EmployerID
-                LEFT JOIN Application a ON v.JobID = a.JobID
-                AND a.ApplyDate BETWEEN ? AND ?
-                WHERE a.AppID IS NULL OR v.JobID IS NULL
-                GROUP BY e.ComName
-            """, last_month_start.date(), last_month_end.date())
-            rows = cursor.fetchall()
-            if rows:
-                print("\nEmployers with No Announcements Last Month:")
-                for row in rows:
-                    print(row.ComName)
-            else:
-                print("All employers had jobs with applications last month.")
-        except Exception as e:
-            print(f"Error: Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        start, end, label = job_service.parse_window(analytics_window)
+        employers = analytics_source.employers_without_announcements(start, end)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if employers:
+        print(f"\nEmployers with No Announcements ({label}):")
+        for name in employers:
+            print(name)
+    else:
+        print(f"All employers had jobs with applications ({label}).")
 
 def available_positions_last_month():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                SELECT e.ComName, v.Title
-                FROM VacancyJob v
-                JOIN Employer e ON v.EmployerID = e.UserID
-                WHERE v.Status = 'Open'
-                ORDER BY e.ComName
-            """)
-            rows = cursor.fetchall()
-            if rows:
-                result = {}
-                for row in rows:
-                    if row.ComName not in result:
-                        result[row.ComName] = []
-                    result[row.ComName].append(row.Title)
-                print("\nAvailable Positions:")
-                for emp, titles in result.items():
-                    print(f"{emp}: {', '.join(titles)}")
-            else:
-                print("No open positions found.")
-        except Exception as e:
-            print(f"Error: Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+    try:
+        result = analytics_source.available_positions()
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if result:
+        print("\nAvailable Positions:")
+        for emp, titles in result.items():
+            print(f"{emp}: {', '.join(titles)}")
+    else:
+        print("No open positions found.")
 
 def job_seeker_applications():
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor()
+    def show(row):
+        print(f"Name: {row.Name}")
+        print(f"Email: {row.Email}")
+        print(f"Phone: {row.Phone}")
+        print(f"Industry: {row.Industry}")
+        print(f"Location: {row.PreferredLocation}")
+        print(f"Jobs Applied: {row.AppliedJobCount}\n")
+    try:
+        found = browse_pages("Job Seeker Applications", analytics_source.job_seeker_applications_page,
+                             lambda row: row.UserID, show)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    if not found:
+        print("No job seekers found.")
+
+def full_report():
+    try:
+        start, end, label = job_service.parse_window(analytics_window)
+        report = analytics_report.run_report(start, end, label)
+    except Exception as e:
+        print(f"Error: Query error: {str(e)}")
+        return
+    print("\n" + analytics_report.format_report(report))
+    path = input("Export to file (.txt or .json, Enter to skip): ").strip()
+    if path:
         try:
-            cursor.execute("""
-                SELECT u.UserID, u.Name, u.Email, u.Phone, j.Industry, j.PreferredLocation, j.AppliedJobCount
-                FROM [User] u
-                JOIN JobSeeker j ON u.UserID = j.UserID
-                WHERE u.Role = 1
-                ORDER BY u.Name
-            """)
-            rows = cursor.fetchall()
-            if rows:
-                print("\nJob Seeker Applications:")
-                for row in rows:
-                    print(f"Name: {row.Name}")
-                    print(f"Email: {row.Email}")
-                    print(f"Phone: {row.Phone}")
-                    print(f"Industry: {row.Industry}")
-                    print(f"Location: {row.PreferredLocation}")
-                    print(f"Jobs Applied: {row.AppliedJobCount}\n")
-            else:
-                print("No job seekers found.")
-        except Exception as e:
-            print(f"Error: Query error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+            analytics_report.export_report(report, path)
+        except OSError as e:
+            print(f"Error: Could not write {path}: {str(e)}")
+            return
+        print(f"Report saved to {path}")
 
 # ─── Menu Functions ──────────────────────────────────────────
 def employer_menu():
@@ -938,9 +676,10 @@ def employer_menu():
         print("8. Update User")
         print("9. Delete User")
         print("10. Filter Job Seekers")
-        print("11. Analytics")
-        print("12. Logout")
-        choice = input("Enter choice (1-12): ").strip()
+        print("11. Best Candidates for Job")
+        print("12. Analytics")
+        print("13. Logout")
+        choice = input("Enter choice (1-13): ").strip()
 
         if choice == "1":
             create_job()
@@ -965,8 +704,10 @@ def employer_menu():
         elif choice == "10":
             filter_job_seekers()
         elif choice == "11":
-            analytics_menu()
+            best_candidates()
         elif choice == "12":
+            analytics_menu()
+        elif choice == "13":
             logout()
             break
         else:
@@ -980,12 +721,15 @@ def job_seeker_menu():
         print("3. List Jobs")
         print("4. List Saved Jobs")
         print("5. Filter Vacancies")
-        print("6. Show Job Details")
-        print("7. Update User")
-        print("8. Delete User")
-        print("9. Analytics")
-        print("10. Logout")
-        choice = input("Enter choice (1-10): ").strip()
+        print("6. Search Vacancies")
+        print("7. Recommended Jobs")
+        print("8. Trending Jobs")
+        print("9. Show Job Details")
+        print("10. Update User")
+        print("11. Delete User")
+        print("12. Analytics")
+        print("13. Logout")
+        choice = input("Enter choice (1-13): ").strip()
 
         if choice == "1":
             apply_for_job()
@@ -998,16 +742,22 @@ def job_seeker_menu():
         elif choice == "5":
             filter_vacancies()
         elif choice == "6":
-            show_job_details()
+            search_vacancies()
         elif choice == "7":
-            update_user()
+            recommended_jobs()
         elif choice == "8":
+            trending_jobs()
+        elif choice == "9":
+            show_job_details()
+        elif choice == "10":
+            update_user()
+        elif choice == "11":
             delete_user()
             if not logged_in_user:
                 break
-        elif choice == "9":
+        elif choice == "12":
             analytics_menu()
-        elif choice == "10":
+        elif choice == "13":
             logout()
             break
         else:
@@ -1022,8 +772,10 @@ def analytics_menu():
         print("4. Employers with No Announcements")
         print("5. Available Positions")
         print("6. Job Seeker Applications")
-        print("7. Back")
-        choice = input("Enter choice (1-7): ").strip()
+        print("7. Full Report")
+        print(f"8. Time Window ({job_service.parse_window(analytics_window)[2]})")
+        print("9. Back")
+        choice = input("Enter choice (1-9): ").strip()
 
         if choice == "1":
             most_interesting_job()
@@ -1038,6 +790,10 @@ def analytics_menu():
         elif choice == "6":
             job_seeker_applications()
         elif choice == "7":
+            full_report()
+        elif choice == "8":
+            set_analytics_window()
+        elif choice == "9":
             break
         else:
             print("Invalid choice! Please try again.")
@@ -1064,5 +820,19 @@ def main_menu():
         else:
             print("Invalid choice! Please try again.")
 
+# Menu entries timed by --profile
+PROFILED_ACTIONS = (
+    "login", "register_user", "logout", "update_user", "delete_user",
+    "create_job", "hide_job", "delete_job", "list_jobs", "list_applications", "accept_application",
+    "reject_application", "filter_job_seekers", "best_candidates",
+    "apply_for_job", "save_job", "list_saved_jobs", "filter_vacancies", "search_vacancies",
+    "recommended_jobs", "trending_jobs", "show_job_details",
+    "most_interesting_job", "job_no_applicants_last_month", "employer_max_announcements",
+    "employers_no_announcements", "available_positions_last_month", "job_seeker_applications",
+    "full_report", "set_analytics_window",
+)
+
 if __name__ == "__main__":
+    if profiler.setup():
+        profiler.instrument(globals(), actions=PROFILED_ACTIONS, render=("print",), waits=("input",))
     main_menu()
\ No newline at end of file
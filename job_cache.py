@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_TTL = 60              # seconds before a cached entry is reloaded from the database
+CACHE_MAX_ENTRIES = 1024    # entries kept before the least recently used one is evicted
+
+
+class TtlCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds.
+
+    get_or_load() is read-through: on a miss it calls the loader outside the
+    lock and keeps the result. If an invalidation happens while the loader
+    runs, the value it read may predate the write, so it is returned to that
+    caller but not stored. A ttl of 0 disables caching.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()       # key -> (expires_at, value)
+        self._generation = 0                # bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() to fill it on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+        value = loader()
+        if self.ttl <= 0:
+            return value
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (self._clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *keys):
+        """Drop the given keys and discard any load already in flight"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,1054 @@
+"""Data-access functions shared by the GUI (job_app.py) and the CLI (job_app_no_GUI.py).
+
+Every function checks out a pooled connection, runs its statements through the
+connection's statement cache and returns plain rows (attribute access, like
+pyodbc.Row) or simple values. Business-rule failures raise ServiceError with a
+message ready to show the user; database errors propagate unchanged.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, timedelta
+
+import counters
+import db_backend
+import db_pool
+import job_cache
+import rollups
+
+EMPLOYER = 0
+JOB_SEEKER = 1
+
+PAGE_SIZE = 20          # default rows per page for the *_page functions
+FETCH_SIZE = 500        # rows per fetchmany() round trip for the iter_* generators
+OPEN_JOBS_CACHE_MAX_ROWS = 100000   # larger open-job sets are read from the database every time
+
+
+class ServiceError(Exception):
+    """A request the data layer refused, e.g. applying to a closed job"""
+
+
+# ─── Authentication ───────────────────────────────────────────
+def authenticate(email, password):
+    """Return the user_info dict for matching credentials, or None"""
+    with db_pool.connection() as conn:
+        user = conn.execute("""
+            SELECT UserID, Name, Email, Role
+            FROM [User]
+            WHERE Email = ? AND Password = ?
+        """, email, password).fetchone()
+        if not user:
+            return None
+        user_info = {
+            'user_id': user.UserID,
+            'name': user.Name,
+            'email': user.Email,
+            'role': 'Employer' if user.Role == EMPLOYER else 'JobSeeker'
+        }
+        if user.Role == EMPLOYER:
+            employer_info = conn.execute(
+                "SELECT ComName FROM Employer WHERE UserID = ?", user.UserID).fetchone()
+            user_info['company_name'] = employer_info.ComName if employer_info else None
+        return user_info
+
+
+def register_user(name, email, phone, role, password, industry, location,
+                  company_name=None, resume_link=None):
+    """Create a User plus its Employer (role 0) or JobSeeker (role 1) row; returns UserID"""
+    def write(conn):
+        user_id = conn.execute("""
+            INSERT INTO [User] (Name, Email, Phone, Role, Password)
+            OUTPUT INSERTED.UserID
+            VALUES (?, ?, ?, ?, ?)
+        """, name, email, phone, role, password).fetchone().UserID
+        if role == EMPLOYER:
+            conn.execute("""
+                INSERT INTO Employer (UserID, ComName, ComIndustry, Location, AnnouncedJobCount)
+                VALUES (?, ?, ?, ?, 0)
+            """, user_id, company_name, industry, location)
+        else:
+            conn.execute("""
+                INSERT INTO JobSeeker (UserID, ResumeLink, Industry, PreferredLocation, AppliedJobCount)
+                VALUES (?, ?, ?, ?, 0)
+            """, user_id, resume_link, industry, location)
+        return user_id
+    user_id = db_pool.transaction(write)
+    if role != EMPLOYER:
+        _seekers_changed("created", [user_id])
+    return user_id
+
+
+# ─── Change notifications ───────────────────────────────────────────
+# Caches of job data. The write paths below invalidate them after their
+# transaction commits; other processes writing to the same database are
+# only seen once an entry's TTL runs out.
+_cache = job_cache.TtlCache()
+_OPEN_JOBS_KEY = "open_jobs"
+_job_listeners = []
+_activity_listeners = []
+_seeker_listeners = []
+
+
+def add_job_listener(listener):
+    """Call listener(event, job_ids) after jobs are 'created', 'updated', 'closed' or 'deleted'"""
+    _job_listeners.append(listener)
+
+
+def remove_job_listener(listener):
+    _job_listeners.remove(listener)
+
+
+def _jobs_changed(event, job_ids):
+    _cache.invalidate(_OPEN_JOBS_KEY, *[("job", job_id) for job_id in job_ids])
+    for listener in list(_job_listeners):
+        try:
+            listener(event, job_ids)
+        except Exception as e:
+            # the change is already committed; a broken listener must not report it as failed
+            print(f"Job listener failed: {e}")
+
+
+def add_activity_listener(listener):
+    """Call listener(kind, job_ids, seeker_id) after a seeker has 'applied' to or 'saved' jobs"""
+    _activity_listeners.append(listener)
+
+
+def remove_activity_listener(listener):
+    _activity_listeners.remove(listener)
+
+
+def _job_activity(kind, job_ids, seeker_id):
+    for listener in list(_activity_listeners):
+        try:
+            listener(kind, job_ids, seeker_id)
+        except Exception as e:
+            print(f"Activity listener failed: {e}")
+
+
+def add_seeker_listener(listener):
+    """Call listener(event, seeker_ids) after job seekers are 'created' or 'deleted'"""
+    _seeker_listeners.append(listener)
+
+
+def remove_seeker_listener(listener):
+    _seeker_listeners.remove(listener)
+
+
+def _seekers_changed(event, seeker_ids):
+    for listener in list(_seeker_listeners):
+        try:
+            listener(event, seeker_ids)
+        except Exception as e:
+            print(f"Seeker listener failed: {e}")
+
+
+def cache_stats():
+    """Hit/miss counters of the job cache"""
+    return _cache.stats()
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def switch_database(backend):
+    """Move the data layer to another backend (or a URL for one), e.g. between test databases"""
+    counters.reset_aggregator()     # pending deltas belong to the old database
+    rollups.reset_aggregator()
+    rollups.reset_buckets()
+    db_pool.reset_pool()
+    db_backend.set_backend(backend)
+    clear_cache()
+
+
+# ─── Jobs ───────────────────────────────────────────
+def create_job(employer_id, title, description, industry, location, skills, exp_required):
+    """Post an open vacancy for the employer; returns the new JobID"""
+    job_id = db_pool.transaction(lambda conn: conn.execute("""
+        INSERT INTO VacancyJob (EmployerID, Title, Description, Industry, Location, ReqSkill, EXPRequired, AppCount, Status)
+        OUTPUT INSERTED.JobID
+        VALUES (?, ?, ?, ?, ?, ?, ?, 0, 'Open')
+    """, employer_id, title, description, industry, location, skills, exp_required).fetchone().JobID)
+    counters.add("announced_job_count", employer_id)
+    _jobs_changed("created", [job_id])
+    return job_id
+
+
+def hide_job(employer_id, job_id):
+    """Close one of the employer's vacancies"""
+    def write(conn):
+        job = conn.execute("SELECT JobID FROM VacancyJob WHERE JobID = ? AND EmployerID = ?",
+                           job_id, employer_id).fetchone()
+        if not job:
+            raise ServiceError(f"No job found with JobID: {job_id} for this Employer!")
+        conn.execute("UPDATE VacancyJob SET Status = 'Closed' WHERE JobID = ?", job_id)
+    db_pool.transaction(write)
+    _jobs_changed("closed", [job_id])
+
+
+def update_job(job_id, title=None, description=None, industry=None, location=None,
+               skills=None, exp_required=None):
+    """Update the given vacancy fields; None leaves a field unchanged"""
+    updates = []
+    values = []
+    for column, value in (("Title", title), ("Description", description), ("Industry", industry),
+                          ("Location", location), ("ReqSkill", skills)):
+        if value:
+            updates.append(f"{column} = ?")
+            values.append(value)
+    if exp_required is not None:
+        updates.append("EXPRequired = ?")
+        values.append(exp_required)
+    if not updates:
+        raise ServiceError("No update fields provided!")
+    values.append(job_id)
+    sql = f"UPDATE VacancyJob SET {', '.join(updates)} WHERE JobID = ?"
+    db_pool.transaction(lambda conn: conn.execute(sql, *values))
+    _jobs_changed("updated", [job_id])
+
+
+def delete_job(employer_id, job_id):
+    """Delete one of the employer's vacancies with its applications and saves"""
+    def write(conn):
+        job = conn.execute("SELECT EmployerID FROM VacancyJob WHERE JobID = ?", job_id).fetchone()
+        if not job:
+            raise ServiceError(f"No job found with JobID: {job_id}")
+        if job.EmployerID != employer_id:
+            raise ServiceError("You can only delete jobs that you created!")
+        removed = conn.execute("""
+            SELECT ApplyDate, COUNT(*) AS Apps FROM Application WHERE JobID = ? GROUP BY ApplyDate
+        """, job_id).fetchall()
+        conn.execute("DELETE FROM Application WHERE JobID = ?", job_id)
+        conn.execute("DELETE FROM SavedVacancy WHERE JobID = ?", job_id)
+        conn.execute("DELETE FROM VacancyJob WHERE JobID = ?", job_id)
+        return removed
+    removed = db_pool.transaction(write)
+    counters.add("announced_job_count", employer_id, -1)
+    for row in removed:
+        rollups.add(job_id, employer_id, row.ApplyDate, -row.Apps)
+    _jobs_changed("deleted", [job_id])
+
+
+# Outcomes of try_apply() and try_save()
+APPLIED = "applied"
+SAVED = "saved"
+DUPLICATE = "duplicate"
+CLOSED = "closed"
+NOT_FOUND = "not_found"
+
+_APPLY_ERRORS = {
+    NOT_FOUND: "No job found with JobID: {job_id}",
+    CLOSED: "This job is not open for applications!",
+    DUPLICATE: "You have already applied for this job!",
+}
+_SAVE_ERRORS = {
+    NOT_FOUND: "No job found with JobID: {job_id}",
+    CLOSED: "This job is not open and cannot be saved!",
+    DUPLICATE: "You have already saved this job!",
+}
+
+
+def _insert_outcome(table, seeker_id, job_id):
+    """NOT_FOUND, CLOSED or DUPLICATE: why an insert into table (Application or SavedVacancy) was refused.
+
+    None if nothing stands in the way.
+    """
+    with db_pool.connection() as conn:
+        row = conn.execute(f"""
+            SELECT v.Status, t.SeekerID
+            FROM VacancyJob v
+            LEFT JOIN {table} t ON t.JobID = v.JobID AND t.SeekerID = ?
+            WHERE v.JobID = ?
+        """, seeker_id, job_id).fetchone()
+    if not row:
+        return NOT_FOUND
+    if row.Status != 'Open':
+        return CLOSED
+    return DUPLICATE if row.SeekerID is not None else None
+
+
+def try_apply(seeker_id, job_id):
+    """Submit a pending application from the seeker to an open job; returns APPLIED, DUPLICATE, CLOSED or NOT_FOUND.
+
+    The job's status check and the insert are one statement, and the unique
+    index on Application (JobID, SeekerID) turns the loser of two concurrent
+    applications into DUPLICATE. Only a refused application costs a second
+    query, to tell why.
+    """
+    today = datetime.now().date()
+    try:
+        inserted = db_pool.transaction(lambda conn: conn.execute("""
+            INSERT INTO Application (JobID, SeekerID, Status, ApplyDate)
+            SELECT JobID, ?, 'Pending', ? FROM VacancyJob
+            WHERE JobID = ? AND Status = 'Open'
+              AND NOT EXISTS (SELECT 1 FROM Application WHERE JobID = ? AND SeekerID = ?)
+        """, seeker_id, today, job_id, job_id, seeker_id).rowcount)
+    except db_backend.INTEGRITY_ERRORS:
+        # a concurrent insert of the same pair won; anything else (an unknown seeker) is a real error
+        outcome = _insert_outcome("Application", seeker_id, job_id)
+        if outcome is None:
+            raise
+        return outcome
+    if not inserted:
+        # None: the row that blocked the insert was deleted since
+        return _insert_outcome("Application", seeker_id, job_id) or DUPLICATE
+    # counters and rollups are written behind so a popular job's rows are not a lock hot spot
+    counters.add("app_count", job_id)
+    counters.add("applied_job_count", seeker_id)
+    rollups.add(job_id, None, today)   # the employer is looked up when the rollups are written
+    _job_activity("applied", [job_id], seeker_id)
+    return APPLIED
+
+
+def apply(seeker_id, job_id):
+    """Submit a pending application from the seeker to an open job; raises ServiceError if it is refused"""
+    outcome = try_apply(seeker_id, job_id)
+    if outcome != APPLIED:
+        raise ServiceError(_APPLY_ERRORS[outcome].format(job_id=job_id))
+
+
+def apply_bulk(seeker_id, job_ids):
+    """Apply the seeker to many jobs in one transaction.
+
+    Returns (applied, failures): the JobIDs applied to, in the order given,
+    and a dict of JobID -> reason for the ones skipped. Validation, the
+    inserts and both counter updates are each a single statement (per 500
+    ids), however many jobs are given; the counters are written behind.
+    If a concurrent application to one of the jobs gets in between the
+    check and the inserts, the jobs are applied to one by one instead.
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+    today = datetime.now().date()
+
+    def write(conn):
+        found = {}
+        for chunk, marks in _in_chunks(job_ids):
+            for row in conn.execute(f"""
+                SELECT v.JobID, v.Status, v.EmployerID, a.AppID
+                FROM VacancyJob v
+                LEFT JOIN Application a ON a.JobID = v.JobID AND a.SeekerID = ?
+                WHERE v.JobID IN ({marks})
+            """, seeker_id, *chunk).fetchall():
+                found[row.JobID] = row
+        applied = []
+        failures = {}
+        for job_id in job_ids:
+            row = found.get(job_id)
+            outcome = NOT_FOUND if not row else CLOSED if row.Status != 'Open' else \
+                DUPLICATE if row.AppID is not None else APPLIED
+            if outcome == APPLIED:
+                applied.append(job_id)
+            else:
+                failures[job_id] = _APPLY_ERRORS[outcome].format(job_id=job_id)
+        if applied:
+            conn.executemany("INSERT INTO Application (JobID, SeekerID, Status, ApplyDate) VALUES (?, ?, 'Pending', ?)",
+                             [(job_id, seeker_id, today) for job_id in applied])
+        return found, applied, failures
+
+    try:
+        found, applied, failures = db_pool.transaction(write)
+    except db_backend.INTEGRITY_ERRORS:
+        outcomes = {job_id: try_apply(seeker_id, job_id) for job_id in job_ids}
+        applied = [job_id for job_id, outcome in outcomes.items() if outcome == APPLIED]
+        failures = {job_id: _APPLY_ERRORS[outcome].format(job_id=job_id)
+                    for job_id, outcome in outcomes.items() if outcome != APPLIED}
+        return applied, failures
+    for job_id in applied:
+        counters.add("app_count", job_id)
+        rollups.add(job_id, found[job_id].EmployerID, today)
+    if applied:
+        counters.add("applied_job_count", seeker_id, len(applied))
+        _job_activity("applied", applied, seeker_id)
+    return applied, failures
+
+
+def try_save(seeker_id, job_id):
+    """Bookmark an open job for the seeker; returns SAVED, DUPLICATE, CLOSED or NOT_FOUND (see try_apply())"""
+    try:
+        inserted = db_pool.transaction(lambda conn: conn.execute("""
+            INSERT INTO SavedVacancy (JobID, SeekerID, SaveDate)
+            SELECT JobID, ?, ? FROM VacancyJob
+            WHERE JobID = ? AND Status = 'Open'
+              AND NOT EXISTS (SELECT 1 FROM SavedVacancy WHERE JobID = ? AND SeekerID = ?)
+        """, seeker_id, datetime.now().date(), job_id, job_id, seeker_id).rowcount)
+    except db_backend.INTEGRITY_ERRORS:
+        # see try_apply()
+        outcome = _insert_outcome("SavedVacancy", seeker_id, job_id)
+        if outcome is None:
+            raise
+        return outcome
+    if not inserted:
+        return _insert_outcome("SavedVacancy", seeker_id, job_id) or DUPLICATE
+    _job_activity("saved", [job_id], seeker_id)
+    return SAVED
+
+
+def save(seeker_id, job_id):
+    """Bookmark an open job for the seeker; raises ServiceError if it is refused"""
+    outcome = try_save(seeker_id, job_id)
+    if outcome != SAVED:
+        raise ServiceError(_SAVE_ERRORS[outcome].format(job_id=job_id))
+
+
+def set_application_status(app_id, status):
+    """Mark an application 'Accepted' or 'Rejected'"""
+    db_pool.transaction(lambda conn: conn.execute("UPDATE Application SET Status = ? WHERE AppID = ?", status, app_id))
+
+
+# ─── Paging ───────────────────────────────────────────
+def _seek_page(query, key, values=(), after=None, before=None, page_size=PAGE_SIZE):
+    """Run one keyset page of query, which must end inside its WHERE clause.
+
+    Rows are ordered by the unique column key. after/before is the key of the
+    last/first row of the page the caller is on; the index seek on key makes
+    every page cost the same no matter how deep it is. Returns (rows, more)
+    where more tells whether another page lies further in that direction.
+    """
+    values = list(values)
+    if before is not None:
+        query += f" AND {key} < ? ORDER BY {key} DESC"
+        values.append(before)
+    elif after is not None:
+        query += f" AND {key} > ? ORDER BY {key}"
+        values.append(after)
+    else:
+        query += f" ORDER BY {key}"
+    query += " OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+    values += [0, page_size + 1]        # one extra row says whether there is a further page
+    with db_pool.connection() as conn:
+        rows = conn.execute(query, *values).fetchall()
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before is not None:
+        rows.reverse()
+    return rows, more
+
+
+def _stream(query, values=(), batch_size=FETCH_SIZE):
+    """Yield the rows of query, fetching batch_size at a time.
+
+    The pooled connection stays checked out until the generator is exhausted
+    or closed, so consume it promptly.
+    """
+    with db_pool.connection() as conn:
+        cursor = conn.execute(query, *values)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+
+def _in_chunks(ids, size=500):
+    # keep IN lists well below SQL Server's 2100-parameter limit
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        chunk = ids[i:i + size]
+        yield chunk, ", ".join("?" * len(chunk))
+
+
+# ─── Listings ───────────────────────────────────────────
+_OPEN_JOBS_SQL = """
+    SELECT v.JobID, v.Title, v.Location, e.ComName, e.ComIndustry
+    FROM VacancyJob v
+    JOIN Employer e ON v.EmployerID = e.UserID
+    WHERE v.Status = 'Open'
+"""
+
+
+def _load_open_jobs():
+    # (rows, job_ids) in JobID order, or None when the set is too large to keep in memory
+    rows = []
+    for row in iter_open_jobs():
+        if len(rows) >= OPEN_JOBS_CACHE_MAX_ROWS:
+            return None
+        rows.append(row)
+    return rows, [row.JobID for row in rows]
+
+
+def _cached_open_jobs():
+    return _cache.get_or_load(_OPEN_JOBS_KEY, _load_open_jobs)
+
+
+def list_open_jobs():
+    """Rows of (JobID, Title, Location, ComName, ComIndustry) for every open job"""
+    cached = _cached_open_jobs()
+    if cached is not None:
+        return list(cached[0])
+    with db_pool.connection() as conn:
+        return conn.execute(_OPEN_JOBS_SQL).fetchall()
+
+
+def open_jobs_page(after=None, before=None, page_size=PAGE_SIZE):
+    """(rows, more) for one page of list_open_jobs() keyed on JobID"""
+    cached = _cached_open_jobs()
+    if cached is None:
+        return _seek_page(_OPEN_JOBS_SQL, "v.JobID", (), after, before, page_size)
+    rows, job_ids = cached
+    if before is not None:
+        end = bisect_left(job_ids, before)
+        start = max(0, end - page_size)
+        return rows[start:end], start > 0
+    start = bisect_right(job_ids, after) if after is not None else 0
+    return rows[start:start + page_size], start + page_size < len(rows)
+
+
+def iter_open_jobs(batch_size=FETCH_SIZE):
+    """Stream list_open_jobs() rows in JobID order"""
+    return _stream(_OPEN_JOBS_SQL + " ORDER BY v.JobID", (), batch_size)
+
+
+def count_open_jobs():
+    """Number of open jobs"""
+    cached = _cached_open_jobs()
+    if cached is not None:
+        return len(cached[0])
+    with db_pool.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM VacancyJob WHERE Status = 'Open'").fetchone()[0]
+
+
+def list_open_jobs_window(offset, limit):
+    """One window of list_open_jobs() rows ordered by JobID"""
+    cached = _cached_open_jobs()
+    if cached is not None:
+        return cached[0][offset:offset + limit]
+    with db_pool.connection() as conn:
+        return conn.execute(_OPEN_JOBS_SQL + " ORDER BY v.JobID OFFSET ? ROWS FETCH NEXT ? ROWS ONLY",
+                            offset, limit).fetchall()
+
+
+def open_jobs_by_ids(job_ids):
+    """list_open_jobs() rows for the given jobs, in the order the ids are given; closed ones are skipped"""
+    cached = _cached_open_jobs()
+    if cached is not None:
+        rows, cached_ids = cached
+        found = []
+        for job_id in job_ids:
+            i = bisect_left(cached_ids, job_id)
+            if i < len(cached_ids) and cached_ids[i] == job_id:
+                found.append(rows[i])
+        return found
+    found = {}
+    with db_pool.connection() as conn:
+        for chunk, marks in _in_chunks(job_ids):
+            for row in conn.execute(_OPEN_JOBS_SQL + f" AND v.JobID IN ({marks})", *chunk).fetchall():
+                found[row.JobID] = row
+    return [found[job_id] for job_id in job_ids if job_id in found]
+
+
+def list_saved_jobs(seeker_id):
+    """Rows of (JobID, Title, Description, Industry, Location) saved by the seeker"""
+    with db_pool.connection() as conn:
+        return conn.execute("""
+            SELECT sv.JobID, v.Title, v.Description, v.Industry, v.Location
+            FROM SavedVacancy sv
+            JOIN VacancyJob v ON sv.JobID = v.JobID
+            WHERE sv.SeekerID = ?
+        """, seeker_id).fetchall()
+
+
+def list_applications(employer_id):
+    """Rows of (AppID, JobID, Title, Name, Status) for the employer's vacancies"""
+    with db_pool.connection() as conn:
+        return conn.execute("""
+            SELECT a.AppID, a.JobID, v.Title, u.Name, a.Status
+            FROM Application a
+            JOIN VacancyJob v ON a.JobID = v.JobID
+            JOIN [User] u ON a.SeekerID = u.UserID
+            WHERE v.EmployerID = ?
+        """, employer_id).fetchall()
+
+
+def list_users():
+    """Rows of (UserID, Name, Email, Role) for every user"""
+    with db_pool.connection() as conn:
+        return conn.execute("SELECT UserID, Name, Email, Role FROM [User]").fetchall()
+
+
+def count_users():
+    """Number of users"""
+    with db_pool.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM [User]").fetchone()[0]
+
+
+def list_users_window(offset, limit):
+    """One window of list_users() rows ordered by UserID"""
+    with db_pool.connection() as conn:
+        return conn.execute("""
+            SELECT UserID, Name, Email, Role
+            FROM [User]
+            ORDER BY UserID
+            OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+        """, offset, limit).fetchall()
+
+
+def _vacancy_filter(industry, location, max_exp):
+    conditions = []
+    values = []
+    query = """
+        SELECT v.JobID, v.Title, v.Description, v.Industry, v.Location, v.ReqSkill, v.EXPRequired, e.ComName
+        FROM VacancyJob v
+        JOIN Employer e ON v.EmployerID = e.UserID
+        WHERE v.Status = 'Open'
+    """
+    if industry:
+        conditions.append("v.Industry = ?")
+        values.append(industry)
+    if location:
+        conditions.append("v.Location = ?")
+        values.append(location)
+    if max_exp is not None:
+        conditions.append("v.EXPRequired <= ?")
+        values.append(max_exp)
+    if conditions:
+        query += " AND " + " AND ".join(conditions)
+    return query, values
+
+
+def filter_vacancies(industry=None, location=None, max_exp=None):
+    """Open jobs matching every given filter, with description, skills and company"""
+    query, values = _vacancy_filter(industry, location, max_exp)
+    with db_pool.connection() as conn:
+        return conn.execute(query, *values).fetchall()
+
+
+def filter_vacancies_page(industry=None, location=None, max_exp=None,
+                          after=None, before=None, page_size=PAGE_SIZE):
+    """(rows, more) for one page of filter_vacancies() keyed on JobID"""
+    query, values = _vacancy_filter(industry, location, max_exp)
+    return _seek_page(query, "v.JobID", values, after, before, page_size)
+
+
+def iter_filtered_vacancies(industry=None, location=None, max_exp=None, batch_size=FETCH_SIZE):
+    """Stream filter_vacancies() rows in JobID order"""
+    query, values = _vacancy_filter(industry, location, max_exp)
+    return _stream(query + " ORDER BY v.JobID", values, batch_size)
+
+
+def jobs_by_ids(job_ids):
+    """filter_vacancies()-style rows for the given open jobs, in the order the ids are given"""
+    found = {}
+    with db_pool.connection() as conn:
+        for chunk, marks in _in_chunks(job_ids):
+            query, values = _vacancy_filter(None, None, None)
+            for row in conn.execute(query + f" AND v.JobID IN ({marks})", *values, *chunk).fetchall():
+                found[row.JobID] = row
+    return [found[job_id] for job_id in job_ids if job_id in found]
+
+
+def iter_job_texts(job_ids=None, batch_size=FETCH_SIZE):
+    """Stream (JobID, Title, Description, ReqSkill) of open jobs, all of them or just job_ids"""
+    query = "SELECT JobID, Title, Description, ReqSkill FROM VacancyJob WHERE Status = 'Open'"
+    if job_ids is None:
+        yield from _stream(query, (), batch_size)
+        return
+    for chunk, marks in _in_chunks(job_ids):
+        yield from _stream(query + f" AND JobID IN ({marks})", chunk, batch_size)
+
+
+def iter_job_requirements(job_ids=None, batch_size=FETCH_SIZE):
+    """Stream (JobID, Industry, Location, ReqSkill, EXPRequired) of open jobs, all of them or just job_ids"""
+    query = "SELECT JobID, Industry, Location, ReqSkill, EXPRequired FROM VacancyJob WHERE Status = 'Open'"
+    if job_ids is None:
+        yield from _stream(query, (), batch_size)
+        return
+    for chunk, marks in _in_chunks(job_ids):
+        yield from _stream(query + f" AND JobID IN ({marks})", chunk, batch_size)
+
+
+def iter_daily_activity(since, until, batch_size=FETCH_SIZE):
+    """Stream (JobID, Day, Applications, Saves) per job and day from since up to, not including, until"""
+    rollups.flush()
+    yield from _stream("""
+        SELECT JobID, Day, AppCount AS Applications, 0 AS Saves
+        FROM JobDailyApplications WHERE Day >= ? AND Day < ?
+    """, (since, until), batch_size)
+    yield from _stream("""
+        SELECT JobID, SaveDate AS Day, 0 AS Applications, COUNT(*) AS Saves
+        FROM SavedVacancy WHERE SaveDate >= ? AND SaveDate < ?
+        GROUP BY JobID, SaveDate
+    """, (since, until), batch_size)
+
+
+def iter_activity(since, batch_size=FETCH_SIZE):
+    """Stream (Kind, JobID, SeekerID, Day) of every application ('applied') and save ('saved') from since on"""
+    yield from _stream("""
+        SELECT 'applied' AS Kind, JobID, SeekerID, ApplyDate AS Day FROM Application WHERE ApplyDate >= ?
+    """, (since,), batch_size)
+    yield from _stream("""
+        SELECT 'saved' AS Kind, JobID, SeekerID, SaveDate AS Day FROM SavedVacancy WHERE SaveDate >= ?
+    """, (since,), batch_size)
+
+
+def seeker_skills(seeker_id):
+    """Rows of (SkillName, EXPYears) for the seeker"""
+    with db_pool.connection() as conn:
+        return conn.execute("""
+            SELECT s.SkillName, hs.EXPYears
+            FROM HasSkills hs
+            JOIN Skills s ON hs.SkillID = s.SkillID
+            WHERE hs.UserID = ?
+        """, seeker_id).fetchall()
+
+
+def get_job_requirements(job_id):
+    """Row of (JobID, EmployerID, Industry, Location, ReqSkill, EXPRequired) for any job, or None"""
+    with db_pool.connection() as conn:
+        return conn.execute(
+            "SELECT JobID, EmployerID, Industry, Location, ReqSkill, EXPRequired FROM VacancyJob WHERE JobID = ?",
+            job_id).fetchone()
+
+
+def applicant_ids(job_id):
+    """SeekerIDs that applied to the job"""
+    with db_pool.connection() as conn:
+        return [row.SeekerID for row in conn.execute(
+            "SELECT SeekerID FROM Application WHERE JobID = ?", job_id).fetchall()]
+
+
+def iter_seeker_profiles(user_ids=None, batch_size=FETCH_SIZE):
+    """Stream (UserID, Industry, PreferredLocation) of job seekers, all of them or just user_ids"""
+    query = "SELECT UserID, Industry, PreferredLocation FROM JobSeeker"
+    if user_ids is None:
+        yield from _stream(query, (), batch_size)
+        return
+    for chunk, marks in _in_chunks(user_ids):
+        yield from _stream(query + f" WHERE UserID IN ({marks})", chunk, batch_size)
+
+
+def iter_seeker_skills(user_ids=None, batch_size=FETCH_SIZE):
+    """Stream (UserID, SkillName, EXPYears) of job seekers' skills, all of them or just user_ids'"""
+    query = """
+        SELECT hs.UserID, s.SkillName, hs.EXPYears
+        FROM HasSkills hs
+        JOIN Skills s ON hs.SkillID = s.SkillID
+    """
+    if user_ids is None:
+        yield from _stream(query, (), batch_size)
+        return
+    for chunk, marks in _in_chunks(user_ids):
+        yield from _stream(query + f" WHERE hs.UserID IN ({marks})", chunk, batch_size)
+
+
+def seekers_by_ids(user_ids):
+    """Rows of (UserID, Name, Email, Industry, PreferredLocation) in the order the ids are given"""
+    found = {}
+    with db_pool.connection() as conn:
+        for chunk, marks in _in_chunks(user_ids):
+            for row in conn.execute(f"""
+                SELECT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
+                FROM [User] u
+                JOIN JobSeeker j ON u.UserID = j.UserID
+                WHERE u.UserID IN ({marks})
+            """, *chunk).fetchall():
+                found[row.UserID] = row
+    return [found[user_id] for user_id in user_ids if user_id in found]
+
+
+def filter_job_seekers(industry=None, location=None, min_exp=None):
+    """Job seekers matching every given filter (min_exp: any skill with that many years)"""
+    conditions = []
+    values = []
+    query = """
+        SELECT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
+        FROM [User] u
+        JOIN JobSeeker j ON u.UserID = j.UserID
+        WHERE u.Role = 1
+    """
+    if min_exp is not None:
+        query = """
+            SELECT DISTINCT u.UserID, u.Name, u.Email, j.Industry, j.PreferredLocation
+            FROM [User] u
+            JOIN JobSeeker j ON u.UserID = j.UserID
+            JOIN HasSkills hs ON j.UserID = hs.UserID
+            WHERE u.Role = 1 AND hs.EXPYears >= ?
+        """
+        values.append(min_exp)
+    if industry:
+        conditions.append("j.Industry = ?")
+        values.append(industry)
+    if location:
+        conditions.append("j.PreferredLocation = ?")
+        values.append(location)
+    if conditions:
+        query += " AND " + " AND ".join(conditions)
+    with db_pool.connection() as conn:
+        return conn.execute(query, *values).fetchall()
+
+
+def get_job_details(job_id):
+    """Row of (Title, Description, Industry, Location, ReqSkill, EXPRequired, ComName), or None"""
+    def load():
+        with db_pool.connection() as conn:
+            return conn.execute("""
+                SELECT v.Title, v.Description, v.Industry, v.Location, v.ReqSkill, v.EXPRequired, e.ComName
+                FROM VacancyJob v
+                JOIN Employer e ON v.EmployerID = e.UserID
+                WHERE v.JobID = ?
+            """, job_id).fetchone()
+    return _cache.get_or_load(("job", job_id), load)
+
+
+# ─── Users ───────────────────────────────────────────
+def update_user(user_id, name=None, email=None, phone=None, password=None):
+    """Update the given account fields; None leaves a field unchanged"""
+    updates = []
+    values = []
+    for column, value in (("Name", name), ("Email", email), ("Phone", phone), ("Password", password)):
+        if value:
+            updates.append(f"{column} = ?")
+            values.append(value)
+    if not updates:
+        raise ServiceError("No update fields provided!")
+    values.append(user_id)
+    sql = f"UPDATE [User] SET {', '.join(updates)} WHERE UserID = ?"
+    db_pool.transaction(lambda conn: conn.execute(sql, *values))
+
+
+def delete_user(email):
+    """Delete the account with this email and everything that belongs to it"""
+    def write(conn):
+        user = conn.execute("SELECT UserID, Role FROM [User] WHERE Email = ?", email).fetchone()
+        if not user:
+            raise ServiceError(f"No user found with email: {email}")
+        user_id = user.UserID
+        job_ids = []
+        # applications about to go, per job and day, for the rollups
+        owner = "v.EmployerID" if user.Role == EMPLOYER else "a.SeekerID"
+        removed = conn.execute(f"""
+            SELECT a.JobID, v.EmployerID, a.ApplyDate, COUNT(*) AS Apps
+            FROM Application a
+            JOIN VacancyJob v ON v.JobID = a.JobID
+            WHERE {owner} = ?
+            GROUP BY a.JobID, v.EmployerID, a.ApplyDate
+        """, user_id).fetchall()
+        if user.Role == EMPLOYER:
+            job_ids = [row.JobID for row in conn.execute(
+                "SELECT JobID FROM VacancyJob WHERE EmployerID = ?", user_id).fetchall()]
+            conn.execute("DELETE FROM Application WHERE JobID IN (SELECT JobID FROM VacancyJob WHERE EmployerID = ?)", user_id)
+            conn.execute("DELETE FROM SavedVacancy WHERE JobID IN (SELECT JobID FROM VacancyJob WHERE EmployerID = ?)", user_id)
+            conn.execute("DELETE FROM VacancyJob WHERE EmployerID = ?", user_id)
+            conn.execute("DELETE FROM Employer WHERE UserID = ?", user_id)
+        else:
+            conn.execute("DELETE FROM Application WHERE SeekerID = ?", user_id)
+            conn.execute("DELETE FROM SavedVacancy WHERE SeekerID = ?", user_id)
+            conn.execute("DELETE FROM HasSkills WHERE UserID = ?", user_id)
+            conn.execute("DELETE FROM JobSeeker WHERE UserID = ?", user_id)
+        conn.execute("DELETE FROM [User] WHERE Email = ?", email)
+        return user, removed, job_ids
+    user, removed, job_ids = db_pool.transaction(write)
+    for row in removed:
+        rollups.add(row.JobID, row.EmployerID, row.ApplyDate, -row.Apps)
+    if job_ids:
+        _jobs_changed("deleted", job_ids)
+    if user.Role != EMPLOYER:
+        _seekers_changed("deleted", [user.UserID])
+
+
+# ─── Analytics ───────────────────────────────────────────
+# The analytics below cover last month unless given a start and end date.
+# Rows of the windowed analytics, shaped like the query rows they stand in for
+JobApplicants = namedtuple("JobApplicants", "Title AppCount")
+CompanyJobs = namedtuple("CompanyJobs", "ComName JobCount")
+
+
+def last_month_range():
+    """(first day, last day) of the previous calendar month as dates"""
+    last_month_start = datetime.now().replace(day=1) - timedelta(days=1)
+    last_month_start = last_month_start.replace(day=1)
+    last_month_end = last_month_start.replace(day=28) + timedelta(days=4)
+    last_month_end = last_month_end.replace(day=1) - timedelta(days=1)
+    return last_month_start.date(), last_month_end.date()
+
+
+def last_days_range(days):
+    """(first day, last day) of the last `days` days, today included"""
+    today = datetime.now().date()
+    return today - timedelta(days=days - 1), today
+
+
+def parse_window(text):
+    """(start, end, label) for an analytics window typed by the user.
+
+    Blank means last month, a number N the last N days, and two dates
+    (YYYY-MM-DD YYYY-MM-DD) that range.
+    """
+    parts = (text or "").replace("..", " ").split()
+    try:
+        if not parts or " ".join(parts).lower() == "last month":
+            start, end = last_month_range()
+            return start, end, "Last Month"
+        if len(parts) == 1 and parts[0].isdigit() and int(parts[0]) > 0:
+            start, end = last_days_range(int(parts[0]))
+            return start, end, f"Last {int(parts[0])} Days"
+        if len(parts) == 2:
+            start, end = date.fromisoformat(parts[0]), date.fromisoformat(parts[1])
+            if start <= end:
+                return start, end, f"{start} to {end}"
+    except ValueError:
+        pass
+    raise ServiceError("Invalid time window! Enter a number of days or two dates (YYYY-MM-DD YYYY-MM-DD).")
+
+
+def _window(start, end):
+    # last month unless a window is given; whole calendar months can be read from the monthly rollups
+    if start is None and end is None:
+        start, end = last_month_range()
+    elif start is None or end is None or start > end:
+        raise ServiceError("A time window needs a start date on or before its end date!")
+    return start, end, start.day == 1 and end == rollups.month_end(start)
+
+
+def most_interesting_job(start=None, end=None):
+    """Row of (Title, AppCount) for the job with the most applicants, or None.
+
+    Given a window, AppCount counts only the applications made in it.
+    """
+    if start is None and end is None:
+        counters.flush()
+        with db_pool.connection() as conn:
+            return conn.execute("""
+                SELECT v.Title, v.AppCount
+                FROM VacancyJob v
+                WHERE v.AppCount = (SELECT MAX(AppCount) FROM VacancyJob)
+            """).fetchone()
+    start, end, _ = _window(start, end)
+    best = max(rollups.get_buckets().counts(start, end), key=lambda item: item[2], default=None)
+    if best is None:
+        return None
+    with db_pool.connection() as conn:
+        row = conn.execute("SELECT Title FROM VacancyJob WHERE JobID = ?", best[0]).fetchone()
+    return JobApplicants(row.Title, best[2]) if row else None
+
+
+def jobs_without_applicants(start=None, end=None):
+    """Titles of open jobs that received no application in the window"""
+    start, end, whole_month = _window(start, end)
+    if whole_month:
+        rollups.flush()
+        with db_pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT v.Title
+                FROM VacancyJob v
+                WHERE v.Status = 'Open' AND NOT EXISTS (
+                    SELECT 1 FROM JobMonthlyApplications m WHERE m.JobID = v.JobID AND m.Month = ?
+                )
+            """, start).fetchall()
+        return [row.Title for row in rows]
+    buckets = rollups.get_buckets()
+    cached = _cached_open_jobs()
+    rows = cached[0] if cached is not None else _stream("SELECT JobID, Title FROM VacancyJob WHERE Status = 'Open'")
+    return [row.Title for row in rows if not buckets.count(row.JobID, start, end)]
+
+
+def _jobs_applied(start, end):
+    # employer -> number of its jobs with an application in the window
+    applied = defaultdict(int)
+    for _, employer_id, _ in rollups.get_buckets().counts(start, end):
+        applied[employer_id] += 1
+    return applied
+
+
+def employer_max_announcements(start=None, end=None):
+    """Row of (ComName, JobCount) for the employer with most jobs applied to in the window, or None"""
+    start, end, whole_month = _window(start, end)
+    if whole_month:
+        rollups.flush()
+        with db_pool.connection() as conn:
+            return conn.execute("""
+                SELECT e.ComName, SUM(s.JobsApplied) AS JobCount
+                FROM EmployerMonthlyStats s
+                JOIN Employer e ON e.UserID = s.EmployerID
+                WHERE s.Month = ?
+                GROUP BY e.ComName
+                HAVING SUM(s.JobsApplied) = (SELECT MAX(JobsApplied) FROM EmployerMonthlyStats WHERE Month = ?)
+            """, start, start).fetchone()
+    applied = _jobs_applied(start, end)
+    if not applied:
+        return None
+    most = max(applied.values())
+    companies = defaultdict(int)
+    for chunk, marks in _in_chunks(list(applied)):
+        with db_pool.connection() as conn:
+            for row in conn.execute(f"SELECT UserID, ComName FROM Employer WHERE UserID IN ({marks})", *chunk).fetchall():
+                companies[row.ComName] += applied[row.UserID]
+    # like the monthly query, a company qualifies when its total equals the best single employer's
+    for name, jobs in companies.items():
+        if jobs == most:
+            return CompanyJobs(name, jobs)
+    return None
+
+
+def employers_without_announcements(start=None, end=None):
+    """Company names of employers with no job, or with a job nobody applied to in the window"""
+    start, end, whole_month = _window(start, end)
+    if whole_month:
+        rollups.flush()
+        with db_pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT e.ComName
+                FROM Employer e
+                LEFT JOIN (SELECT EmployerID, COUNT(*) AS Jobs FROM VacancyJob GROUP BY EmployerID) v
+                    ON v.EmployerID = e.UserID
+                LEFT JOIN EmployerMonthlyStats s ON s.EmployerID = e.UserID AND s.Month = ?
+                WHERE v.Jobs IS NULL OR COALESCE(s.JobsApplied, 0) < v.Jobs
+                GROUP BY e.ComName
+            """, start).fetchall()
+        return [row.ComName for row in rows]
+    applied = _jobs_applied(start, end)
+    announced = {row.EmployerID: row.Jobs for row in _stream(
+        "SELECT EmployerID, COUNT(*) AS Jobs FROM VacancyJob GROUP BY EmployerID")}
+    names = set()
+    for row in _stream("SELECT UserID, ComName FROM Employer"):
+        jobs = announced.get(row.UserID, 0)
+        if not jobs or applied.get(row.UserID, 0) < jobs:
+            names.add(row.ComName)
+    # NULL company names sort first, as they do in SQL Server
+    return sorted(names, key=lambda name: (name is not None, name or ""))
+
+
+def available_positions():
+    """Dict of company name -> list of open job titles, ordered by company"""
+    cached = _cached_open_jobs()
+    if cached is not None:
+        # NULL company names sort first, as they do in SQL Server
+        rows = sorted(cached[0], key=lambda row: (row.ComName is not None, row.ComName or ""))
+    else:
+        with db_pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT e.ComName, v.Title
+                FROM VacancyJob v
+                JOIN Employer e ON v.EmployerID = e.UserID
+                WHERE v.Status = 'Open'
+                ORDER BY e.ComName
+            """).fetchall()
+    result = {}
+    for row in rows:
+        result.setdefault(row.ComName, []).append(row.Title)
+    return result
+
+
+_SEEKER_APPLICATIONS_SQL = """
+    SELECT u.UserID, u.Name, u.Email, u.Phone, j.Industry, j.PreferredLocation, j.AppliedJobCount
+    FROM [User] u
+    JOIN JobSeeker j ON u.UserID = j.UserID
+    WHERE u.Role = 1
+"""
+
+
+def job_seeker_applications():
+    """Rows of seeker contact details with AppliedJobCount, ordered by name"""
+    counters.flush()
+    with db_pool.connection() as conn:
+        return conn.execute(_SEEKER_APPLICATIONS_SQL + " ORDER BY u.Name").fetchall()
+
+
+def job_seeker_applications_page(after=None, before=None, page_size=PAGE_SIZE):
+    """(rows, more) for one page of job_seeker_applications() keyed on UserID"""
+    counters.flush()
+    return _seek_page(_SEEKER_APPLICATIONS_SQL, "u.UserID", (), after, before, page_size)
+
+
+def iter_job_seeker_applications(batch_size=FETCH_SIZE):
+    """Stream job_seeker_applications() rows in UserID order"""
+    counters.flush()
+    return _stream(_SEEKER_APPLICATIONS_SQL + " ORDER BY u.UserID", (), batch_size)
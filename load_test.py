@@ -0,0 +1,426 @@
+"""Load generator: many seekers and employers using the app at once.
+
+    python load_test.py                                       # 8 processes for 30s on the small dataset
+    python load_test.py --processes 16 --duration 120 --hot-jobs 5 --hot-share 0.8
+    python load_test.py --db mssql --mix browse=20,apply=60,employer=20 --save load.json
+
+Every process replays sessions against job_service, as the CLI would,
+picking each session from --mix:
+
+    browse      list open jobs, the next page, one job's details
+    filter      filter vacancies, then search
+    save        open a job and save it
+    apply       open a job and apply to it
+    employer    list the employer's applications and accept or reject pending ones
+    analytics   one of the six analytics over last month
+
+With --hot-jobs N, --hot-share of the saves and applications go to the N
+open jobs with the most applications, to load their rows and counters the
+way a viral posting would. The report gives throughput and latency
+percentiles per operation and counts outcomes: rejected (a ServiceError
+the user would see), deadlocks and lock timeouts left after the retries of
+db_pool.transaction(), conflicts (constraint violations) and other errors,
+plus how often write transactions were retried. Lost updates are
+checked afterwards on every job and seeker the processes drew from:
+duplicate applications and AppCount/AppliedJobCount drift against the
+Application rows, before and after the run.
+
+Without --db a fresh copy of a benchmark.py dataset (--size) is used;
+SQLite needs a file shared by the processes, not :memory:.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import analytics_report
+import benchmark
+import counters
+import db_backend
+import db_pool
+import job_service
+import reconcile_counters
+import rollups
+import search_index
+
+PROCESSES = 8
+DURATION = 30.0             # seconds of load
+START_DELAY = 3.0           # seconds for every process to start up before the load begins together
+DEFAULT_MIX = "browse=30,filter=20,save=15,apply=20,employer=10,analytics=5"
+HOT_SHARE = 0.8             # of saves and applications that go to the hot jobs when --hot-jobs is set
+ACCEPTED_SHARE = 0.2        # of the applications an employer decides
+DECISIONS = 3               # pending applications an employer decides per session at most
+FLUSH_ATTEMPTS = 5          # tries to write a worker's buffered counters at the end
+ERROR_SAMPLES = 3           # error messages kept per operation and outcome
+OUTCOMES = ("ok", "rejected", "deadlocks", "lock_timeouts", "conflicts", "errors")
+
+SESSIONS = {}               # name -> LoadWorker method, filled by @session
+
+
+def session(fn):
+    SESSIONS[fn.__name__] = fn
+    return fn
+
+
+def parse_mix(text):
+    """{session: weight} from "browse=30,apply=20,..." """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SESSIONS:
+            raise ValueError(f"Unknown session {name!r}; choose from {', '.join(SESSIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The mix needs a session with a weight above 0")
+    return mix
+
+
+def classify(error):
+    """Outcome name for an exception raised by an operation"""
+    if isinstance(error, job_service.ServiceError):
+        return "rejected"
+    kind = db_pool.conflict(error)     # what db_pool.transaction() still lost after its retries
+    if kind is not None:
+        return kind
+    if isinstance(error, db_backend.INTEGRITY_ERRORS):
+        return "conflicts"
+    return "errors"
+
+
+class OperationStats:
+    """Latencies and outcomes of one operation"""
+
+    def __init__(self):
+        self.latencies = []
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.samples = defaultdict(list)    # outcome -> first error messages
+
+    def as_dict(self):
+        return {'latencies': self.latencies, 'outcomes': self.outcomes, 'samples': dict(self.samples)}
+
+    def merge(self, data):
+        """Add the as_dict() of another process's stats"""
+        self.latencies += data['latencies']
+        for outcome, count in data['outcomes'].items():
+            self.outcomes[outcome] += count
+        for outcome, messages in data['samples'].items():
+            self.samples[outcome] = (self.samples[outcome] + messages)[:ERROR_SAMPLES]
+
+
+class LoadWorker:
+    """Replays sessions in one process until the deadline"""
+
+    def __init__(self, index, sample, hot_jobs, options):
+        self.rng = random.Random(f"{options['seed']}:{index}")
+        self.sample = sample
+        self.hot_jobs = hot_jobs
+        self.hot_share = options['hot_share']
+        self.think = options['think']
+        self.mix = list(options['mix'].items())
+        self.stats = defaultdict(OperationStats)
+        self.sessions = defaultdict(int)
+
+    def op(self, name, fn, *args, **kwargs):
+        """Run one timed operation; returns its result (None if it failed)"""
+        if self.think:
+            time.sleep(self.rng.expovariate(1 / self.think))
+        stats = self.stats[name]
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            stats.latencies.append(time.perf_counter() - started)
+            outcome = classify(e)
+            stats.outcomes[outcome] += 1
+            if len(stats.samples[outcome]) < ERROR_SAMPLES:
+                stats.samples[outcome].append(str(e)[:200])
+            return None
+        stats.latencies.append(time.perf_counter() - started)
+        stats.outcomes["ok"] += 1
+        return result
+
+    def _target_job(self):
+        if self.hot_jobs and self.rng.random() < self.hot_share:
+            return self.rng.choice(self.hot_jobs)
+        return self.rng.choice(self.sample.open_jobs)
+
+    def _seeker(self):
+        return self.rng.choice(self.sample.seekers)[0]
+
+    @session
+    def browse(self):
+        page = self.op("list_jobs", job_service.open_jobs_page)
+        if page and page[0]:
+            self.op("list_jobs_next_page", job_service.open_jobs_page, after=page[0][-1].JobID)
+        self.op("show_job_details", job_service.get_job_details, self.rng.choice(self.sample.jobs))
+
+    @session
+    def filter(self):
+        rng = self.rng
+        self.op("filter_vacancies", job_service.filter_vacancies_page,
+                rng.choice([None] + self.sample.industries), rng.choice([None] + self.sample.locations),
+                rng.choice([None, rng.randint(0, 10)]))
+        self.op("search_vacancies", search_index.search_jobs, rng.choice(self.sample.words))
+
+    @session
+    def save(self):
+        job_id = self._target_job()
+        self.op("show_job_details", job_service.get_job_details, job_id)
+        self.op("save_job", job_service.save, self._seeker(), job_id)
+
+    @session
+    def apply(self):
+        job_id = self._target_job()
+        self.op("show_job_details", job_service.get_job_details, job_id)
+        self.op("apply_for_job", job_service.apply, self._seeker(), job_id)
+
+    @session
+    def employer(self):
+        rows = self.op("list_applications", job_service.list_applications, self.rng.choice(self.sample.employers)[0])
+        pending = [row.AppID for row in rows or () if row.Status == "Pending"]
+        for app_id in self.rng.sample(pending, min(len(pending), DECISIONS)):
+            status = "Accepted" if self.rng.random() < ACCEPTED_SHARE else "Rejected"
+            self.op("set_application_status", job_service.set_application_status, app_id, status)
+
+    @session
+    def analytics(self):
+        source = analytics_report.analytics_source
+        start, end = self.sample.window
+        name, fn, args = self.rng.choice([
+            ("most_interesting_job", source.most_interesting_job, (start, end)),
+            ("jobs_without_applicants", source.jobs_without_applicants, (start, end)),
+            ("employer_max_announcements", source.employer_max_announcements, (start, end)),
+            ("employers_without_announcements", source.employers_without_announcements, (start, end)),
+            ("available_positions", source.available_positions, ()),
+            ("job_seeker_applications", source.job_seeker_applications_page, ()),
+        ])
+        self.op(name, fn, *args)
+
+    def run(self, deadline):
+        names = [name for name, _ in self.mix]
+        weights = [weight for _, weight in self.mix]
+        while time.time() < deadline:
+            name = self.rng.choices(names, weights)[0]
+            SESSIONS[name](self)
+            self.sessions[name] += 1
+
+    def finish(self):
+        """Write the buffered counters and rollups, retrying failed flushes"""
+        failed = 0
+        for module in (counters, rollups):
+            for attempt in range(FLUSH_ATTEMPTS):
+                try:
+                    module.flush()
+                    break
+                except Exception:
+                    failed += 1
+                    time.sleep(0.2 * (attempt + 1))
+        stats = [module.get_aggregator().stats() for module in (counters, rollups)]
+        # failures counts the background flushes too; pending is what stays unwritten
+        return {'flush_failures': sum(stat['failures'] for stat in stats),
+                'unflushed': sum(stat['pending'] for stat in stats)}
+
+
+def _run_worker(index, url, sample, hot_jobs, options):
+    """One load process: returns its sessions, operation stats and flush outcome"""
+    benchmark.use_database(url)
+    worker = LoadWorker(index, sample, hot_jobs, options)
+    time.sleep(max(options['start_at'] - time.time(), 0))
+    worker.run(options['start_at'] + options['duration'])
+    elapsed = time.time() - options['start_at']
+    result = worker.finish()
+    result['transactions'] = db_pool.transaction_stats()
+    benchmark.use_database("sqlite:///:memory:")    # closes the pool
+    return dict(result, elapsed=elapsed, sessions=dict(worker.sessions),
+                stats={name: stats.as_dict() for name, stats in worker.stats.items()})
+
+
+# ─── Consistency ───────────────────────────────────────────
+def hot_jobs(count):
+    """The count open jobs with the most applications"""
+    if not count:
+        return []
+    with db_pool.connection() as conn:
+        return [row.JobID for row in conn.execute("""
+            SELECT JobID FROM VacancyJob WHERE Status = 'Open'
+            ORDER BY AppCount DESC, JobID OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+        """, 0, count).fetchall()]
+
+
+def consistency(job_ids, seeker_ids):
+    """Application rows, duplicate applications and counter drift on the given keys"""
+    counters.flush()
+    with db_pool.connection() as conn:
+        applications = conn.execute("SELECT COUNT(*) FROM Application").fetchone()[0]
+        duplicates = conn.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT JobID, SeekerID FROM Application GROUP BY JobID, SeekerID HAVING COUNT(*) > 1
+            ) d
+        """).fetchone()[0]
+    drift = {'app_count': reconcile_counters.check_keys("app_count", job_ids),
+             'applied_job_count': reconcile_counters.check_keys("applied_job_count", seeker_ids)}
+    return {'applications': applications, 'duplicates': duplicates,
+            'drift': {counter: {'keys': len(found), 'total': sum(abs(delta) for _, _, delta in found.values())}
+                      for counter, found in drift.items()}}
+
+
+# ─── Report ───────────────────────────────────────────
+def _percentile(ordered, fraction):
+    # nearest rank
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(results):
+    """Merge the processes' results into {sessions, elapsed, operations, flush_failures, unflushed}"""
+    stats = defaultdict(OperationStats)
+    sessions = defaultdict(int)
+    for result in results:
+        for name, data in result['stats'].items():
+            stats[name].merge(data)
+        for name, count in result['sessions'].items():
+            sessions[name] += count
+    elapsed = max(result['elapsed'] for result in results)
+    operations = {}
+    for name, op in sorted(stats.items()):
+        ordered = sorted(op.latencies)
+        operations[name] = {
+            'calls': len(ordered),
+            'ops_per_s': len(ordered) / elapsed,
+            'p50_ms': _percentile(ordered, 0.50) * 1000,
+            'p95_ms': _percentile(ordered, 0.95) * 1000,
+            'p99_ms': _percentile(ordered, 0.99) * 1000,
+            'max_ms': ordered[-1] * 1000,
+            'outcomes': op.outcomes,
+            'samples': dict(op.samples),
+        }
+    transactions = defaultdict(int)
+    for result in results:
+        for name, count in result['transactions'].items():
+            transactions[name] += count
+    return {'sessions': dict(sessions), 'elapsed': elapsed, 'operations': operations,
+            'transactions': dict(transactions),
+            'flush_failures': sum(result['flush_failures'] for result in results),
+            'unflushed': sum(result['unflushed'] for result in results)}
+
+
+def format_report(summary, before, after):
+    operations = summary['operations']
+    calls = sum(op['calls'] for op in operations.values())
+    sessions = sum(summary['sessions'].values())
+    lines = [f"Sessions: {sessions} ({sessions / summary['elapsed']:.1f}/s), "
+             f"operations: {calls} ({calls / summary['elapsed']:.1f}/s) in {summary['elapsed']:.1f}s", ""]
+    width = max([len("Operation")] + [len(name) for name in operations])
+    lines.append(f"{'Operation':<{width}} {'Calls':>6} {'Ops/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                 f"{'Max ms':>8} {'Rejected':>8} {'Deadlock':>8} {'Lock t/o':>8} {'Conflict':>8} {'Errors':>6}")
+    for name, op in operations.items():
+        outcomes = op['outcomes']
+        lines.append(f"{name:<{width}} {op['calls']:>6} {op['ops_per_s']:>7.1f} {op['p50_ms']:>8.1f} "
+                     f"{op['p95_ms']:>8.1f} {op['p99_ms']:>8.1f} {op['max_ms']:>8.1f} {outcomes['rejected']:>8} "
+                     f"{outcomes['deadlocks']:>8} {outcomes['lock_timeouts']:>8} {outcomes['conflicts']:>8} "
+                     f"{outcomes['errors']:>6}")
+    tx = summary['transactions']
+    lines += ["", f"Write transactions: {tx['transactions']}, {tx['retried']} retried after a lock conflict "
+                  f"({tx['retries']} retries; {tx['deadlocks']} deadlocks, {tx['lock_timeouts']} lock timeouts), "
+                  f"{tx['gave_up']} given up"]
+    samples = [f"  {name} {outcome}: {message}" for name, op in operations.items()
+               for outcome, messages in op['samples'].items() if outcome != "rejected" for message in messages]
+    if samples:
+        lines += ["", "Failures:"] + samples
+
+    applied = operations.get("apply_for_job", {}).get('outcomes', {}).get("ok", 0)
+    lines += ["", "Lost updates:",
+              f"  Applications accepted {applied}, rows added {after['applications'] - before['applications']}",
+              f"  Duplicate applications (same job and seeker): {after['duplicates']} "
+              f"(before: {before['duplicates']})"]
+    for counter, label in (("app_count", "AppCount"), ("applied_job_count", "AppliedJobCount")):
+        was, now = before['drift'][counter], after['drift'][counter]
+        lines.append(f"  {label} drift: {now['keys']} keys off by {now['total']} in total "
+                     f"(before: {was['keys']} keys off by {was['total']})")
+    lines.append(f"  Counter and rollup flushes failed: {summary['flush_failures']}, "
+                 f"deltas left unwritten: {summary['unflushed']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="load this database (an SQLite file or mssql) instead of a generated dataset")
+    parser.add_argument("--size", choices=sorted(benchmark.SIZES), default="small",
+                        help="benchmark.py dataset to copy and load (default %(default)s)")
+    parser.add_argument("--data-dir", default=benchmark.DATA_DIR,
+                        help="where generated datasets are kept (default %(default)s)")
+    parser.add_argument("--regenerate", action="store_true", help="generate the dataset again")
+    parser.add_argument("--processes", type=int, default=PROCESSES, help="concurrent users (default %(default)s)")
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds of load (default %(default)s)")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="mean seconds a user pauses before each operation (default %(default)s)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="session weights (default %(default)s)")
+    parser.add_argument("--hot-jobs", type=int, default=0,
+                        help="aim --hot-share of saves and applications at this many popular jobs")
+    parser.add_argument("--hot-share", type=float, default=HOT_SHARE, help="(default %(default)s)")
+    parser.add_argument("--seed", type=int, default=benchmark.SEED, help="seed of the dataset and sessions")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    url = args.db or "sqlite:///" + benchmark.prepare_dataset(args.size, args.data_dir, args.seed, args.regenerate)
+    if url.startswith("sqlite:///") and url[len("sqlite:///"):] in ("", ":memory:"):
+        parser.error("an in-memory SQLite database cannot be shared between processes; give a file")
+    benchmark.use_database(url)
+    sample = benchmark.Sample(random.Random(args.seed), doomed=0)
+    hot = hot_jobs(args.hot_jobs)
+    job_ids = set(sample.jobs) | set(hot)
+    seeker_ids = {user_id for user_id, _ in sample.seekers}
+    before = consistency(job_ids, seeker_ids)
+    benchmark.use_database("sqlite:///:memory:")    # the workers have the database to themselves
+
+    print(f"Load test: {args.processes} processes for {args.duration:.0f}s on {url}")
+    print(f"Mix: {', '.join(f'{name} {weight:g}' for name, weight in mix.items())}"
+          + (f"; {args.hot_share:.0%} of saves and applications to jobs {', '.join(map(str, hot))}" if hot else ""))
+    started = datetime.now().isoformat(timespec="seconds")
+    options = {'seed': args.seed, 'mix': mix, 'think': args.think, 'hot_share': args.hot_share,
+               'duration': args.duration, 'start_at': time.time() + START_DELAY}
+    # spawn: a forked process would share the parent's connections and aggregator threads
+    with ProcessPoolExecutor(args.processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_run_worker, index, url, sample, hot, options) for index in range(args.processes)]
+        results = [future.result() for future in futures]
+
+    benchmark.use_database(url)
+    after = consistency(job_ids, seeker_ids)
+    summary = summarize(results)
+    print(format_report(summary, before, after))
+    benchmark.use_database("sqlite:///:memory:")
+
+    if args.save:
+        run = {
+            'started': started,
+            'python': platform.python_version(),
+            'database': url,
+            'processes': args.processes,
+            'duration': args.duration,
+            'think': args.think,
+            'mix': mix,
+            'hot_jobs': hot,
+            'hot_share': args.hot_share,
+            'seed': args.seed,
+            'before': before,
+            'after': after,
+            **summary,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,327 @@
+"""--profile mode: where the time of each menu action or button press goes.
+
+    python job_app_no_GUI.py --profile
+    python job_app.py --profile --cprofile actions.prof
+
+An action is timed from the menu choice or button press until its result
+has been shown, including the background tasks it starts in the GUI, and
+split into phases:
+
+    connect   checking a connection out of the pool (opening one if needed)
+    execute   running statements on the database
+    fetch     reading their rows
+    render    printing, or updating widgets on the Tk thread
+    other     the rest: Python work in job_service, handing tasks between threads
+
+Time spent waiting for the user (input prompts, message boxes, file
+dialogs) is left out. Phases of tasks that run in parallel are added up,
+so they can exceed the action's wall time. A summary table is printed on
+exit; --cprofile also saves a cProfile of the actions, all threads merged,
+for pstats or snakeviz.
+"""
+import argparse
+import atexit
+import builtins
+import cProfile
+import functools
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import db_pool
+import query_stats
+
+PHASES = ("connect", "execute", "fetch", "render", "other")
+CPROFILE_LINES = 25         # functions listed from the cProfile on exit
+
+_enabled = False
+_cprofile_path = None
+_local = threading.local()  # .run: action this thread works for; .accounted: seconds already given a phase
+_actions = {}               # action name -> ActionStats
+_actions_lock = threading.Lock()
+_profiles = []              # per-thread cProfile.Profile objects
+_profiles_lock = threading.Lock()
+
+
+class Run:
+    """One execution of an action, which may continue in background tasks"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.excluded = 0.0
+        self.statements = 0
+        self._pending = 1           # the action itself plus its unfinished tasks
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds, statements=0):
+        with self._lock:
+            self.statements += statements
+            if phase is None:
+                self.excluded += seconds
+            else:
+                self.phases[phase] += seconds
+
+    def task_started(self):
+        with self._lock:
+            self._pending += 1
+
+    def task_done(self):
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            _finish(self)
+
+
+class ActionStats:
+    """Totals of every finished run of one action"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.statements = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+
+def _finish(run):
+    total = max(time.perf_counter() - run.started - run.excluded, 0.0)
+    phases = dict(run.phases)
+    phases["other"] = max(total - sum(phases.values()), 0.0)
+    with _actions_lock:
+        stats = _actions.get(run.name)
+        if stats is None:
+            stats = _actions[run.name] = ActionStats(run.name)
+        stats.calls += 1
+        stats.total += total
+        stats.max = max(stats.max, total)
+        stats.statements += run.statements
+        for phase, seconds in phases.items():
+            stats.phases[phase] += seconds
+
+
+def current():
+    """The action this thread is working for, or None"""
+    return getattr(_local, "run", None)
+
+
+def _accounted():
+    return getattr(_local, "accounted", 0.0)
+
+
+def _account(run, phase, seconds):
+    run.add(phase, seconds)
+    _local.accounted = _accounted() + seconds
+
+
+def _on_statement(caller, sql, execute_time, fetch_time, rows, failed):
+    run = current()
+    if run is not None:
+        run.add("execute", execute_time, statements=1)
+        _account(run, "fetch", fetch_time)
+        _local.accounted = _accounted() + execute_time
+
+
+def _on_checkout(seconds):
+    run = current()
+    if run is not None:
+        _account(run, "connect", seconds)
+
+
+# ─── cProfile ───────────────────────────────────────────
+def _start_cprofile():
+    if _cprofile_path is None:
+        return
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    if depth:
+        return
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        profile = _local.profile = cProfile.Profile()
+        with _profiles_lock:
+            _profiles.append(profile)
+    try:
+        profile.enable()
+    except ValueError:
+        pass        # another profiler holds this interpreter (Python 3.12+ profiles one thread at a time)
+
+
+def _stop_cprofile():
+    if _cprofile_path is None:
+        return
+    _local.depth -= 1
+    if not _local.depth:
+        _local.profile.disable()
+
+
+# ─── Attaching Work to Actions ───────────────────────────────────────────
+@contextmanager
+def attached(run, phase=None):
+    """Count the work this thread does in the block toward run.
+
+    With a phase, the block's own time (less what nested database calls,
+    user waits and phases already took) is added to that phase.
+    """
+    if run is None:
+        yield
+        return
+    previous = current()
+    _local.run = run
+    _start_cprofile()
+    accounted = _accounted()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stop_cprofile()
+        if phase is not None:
+            _account(run, phase, max(time.perf_counter() - started - (_accounted() - accounted), 0.0))
+        _local.run = previous
+
+
+def bind(run, fn):
+    """fn wrapped to work for run on whichever thread calls it (for background tasks)"""
+    if run is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with attached(run):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def task_done(run):
+    if run is not None:
+        run.task_done()
+
+
+def action(fn, prefix=None, phase=None):
+    """fn wrapped to run as a profiled action; an action started inside another is part of it.
+
+    The action is called "<prefix> > <fn>", the prefix defaulting to the
+    calling function, so a CLI menu entry reads e.g. "employer_menu > list_jobs".
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if current() is not None:
+            return fn(*args, **kwargs)
+        run = Run(f"{prefix or sys._getframe(1).f_code.co_name} > {fn.__name__}")
+        try:
+            with attached(run, phase):
+                return fn(*args, **kwargs)
+        finally:
+            run.task_done()
+    return wrapper
+
+
+def _phase_call(fn, phase):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        run = current()
+        if run is None:
+            return fn(*args, **kwargs)
+        accounted = _accounted()
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _account(run, phase, max(time.perf_counter() - started - (_accounted() - accounted), 0.0))
+    return wrapper
+
+
+def instrument(namespace, actions=(), render=(), waits=(), prefix=None, action_phase=None):
+    """Wrap the named functions of a module namespace (a dict, e.g. globals()) or object when profiling is on.
+
+    actions become profiled actions (see action() for prefix and
+    action_phase), render calls count as rendering and
+    waits (prompts, dialogs) are left out of the timings. A name missing
+    from a namespace dict is looked up in builtins, so "print" and "input"
+    can be shadowed.
+    """
+    if not _enabled:
+        return
+    wrappers = [(name, lambda fn: action(fn, prefix, action_phase)) for name in actions]
+    wrappers += [(name, lambda fn: _phase_call(fn, "render")) for name in render]
+    wrappers += [(name, lambda fn: _phase_call(fn, None)) for name in waits]
+    for name, wrap in wrappers:
+        if isinstance(namespace, dict):
+            namespace[name] = wrap(namespace.get(name) or getattr(builtins, name))
+        else:
+            setattr(namespace, name, wrap(getattr(namespace, name)))
+
+
+# ─── Setup and Report ───────────────────────────────────────────
+def enable(cprofile_path=None):
+    """Turn profiling on and print the summary at exit"""
+    global _enabled, _cprofile_path
+    if _enabled:
+        return
+    _enabled = True
+    _cprofile_path = cprofile_path
+    query_stats.ENABLED = True      # execute and fetch times come from the statement timings
+    query_stats.add_listener(_on_statement)
+    db_pool.add_checkout_listener(_on_checkout)
+    atexit.register(_report_at_exit)
+
+
+def is_enabled():
+    return _enabled
+
+
+def setup(argv=None):
+    """Enable profiling if --profile or --cprofile PATH is among the arguments; returns whether it is on"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--cprofile", metavar="PATH")
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    if args.profile or args.cprofile:
+        enable(args.cprofile)
+    return _enabled
+
+
+def summary():
+    """Text table of the profiled actions, most total time first"""
+    with _actions_lock:
+        actions = sorted(_actions.values(), key=lambda stats: stats.total, reverse=True)
+    if not actions:
+        return "No actions profiled."
+    width = max(len("Action"), *(len(stats.name) for stats in actions))
+    lines = [f"{'Action':<{width}} {'Calls':>5} {'Total ms':>9} {'Mean ms':>8} {'Max ms':>8} "
+             + " ".join(f"{phase.capitalize() + ' %':>9}" for phase in PHASES) + f" {'Stmts':>6}"]
+    for stats in actions:
+        phases = " ".join(f"{stats.phases[phase] * 100 / (stats.total or 1):>9.0f}" for phase in PHASES)
+        lines.append(f"{stats.name:<{width}} {stats.calls:>5} {stats.total * 1000:>9.1f} "
+                     f"{stats.total * 1000 / stats.calls:>8.1f} {stats.max * 1000:>8.1f} {phases} "
+                     f"{stats.statements / stats.calls:>6.1f}")
+    return "\n".join(lines)
+
+
+def save_cprofile(path):
+    """Merge every thread's cProfile and write it to path; returns the pstats.Stats or None"""
+    with _profiles_lock:
+        profiles = list(_profiles)
+    profiles = [profile for profile in profiles if profile.getstats()]
+    if not profiles:
+        return None
+    stats = pstats.Stats(*profiles)
+    stats.dump_stats(path)
+    return stats
+
+
+def _report_at_exit():
+    print("\nProfile (user waits excluded; phases as % of each action's time):")
+    print(summary())
+    if _cprofile_path:
+        stats = save_cprofile(_cprofile_path)
+        if stats is None:
+            print("No cProfile data captured.")
+        else:
+            print(f"\ncProfile saved to {_cprofile_path}; top functions by cumulative time:")
+            stats.sort_stats("cumulative").print_stats(CPROFILE_LINES)
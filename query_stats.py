@@ -0,0 +1,258 @@
+"""Timing of every statement run through db_pool, with a slow-query log.
+
+PooledConnection.execute() and executemany() return a TimedCursor. It
+records how long the statement took to execute and to fetch, how many rows
+it returned (or changed) and which function ran it. Statistics are kept
+per (calling function, SQL text) with a latency histogram. Statements whose
+execute plus fetch time reaches SLOW_QUERY_MS are appended to SLOW_QUERY_LOG:
+
+    JOBAPP_SLOW_QUERY_MS=100 JOBAPP_SLOW_QUERY_LOG=slow.log python job_app_no_GUI.py
+
+report() lists the statements that took the most time. Parameters are
+never logged; they include passwords.
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+ENABLED = os.environ.get("JOBAPP_QUERY_STATS", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("JOBAPP_SLOW_QUERY_MS", "500"))
+SLOW_QUERY_LOG = os.environ.get("JOBAPP_SLOW_QUERY_LOG", "slow_queries.log")    # empty to disable
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)     # ms; the last bucket is open
+REPORT_LIMIT = 20
+SQL_WIDTH = 70              # characters of SQL shown per report line
+
+# Frames of these modules are plumbing; the caller is the first frame outside them
+_INTERNAL = {"db_pool", "db_backend", "contextlib", __name__}
+
+_stats = {}                 # (caller, sql) -> StatementStats
+_stats_lock = threading.Lock()
+_log_lock = threading.Lock()
+_listeners = []             # fn(caller, sql, execute_time, fetch_time, rows, failed) per recorded statement
+
+
+class StatementStats:
+    """Calls, rows and latency of one SQL text run from one function"""
+
+    def __init__(self, caller, sql):
+        self.caller = caller
+        self.sql = sql
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.execute_time = 0.0
+        self.fetch_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def add(self, execute_time, fetch_time, rows, failed):
+        elapsed = execute_time + fetch_time
+        self.calls += 1
+        self.errors += failed
+        self.rows += rows
+        self.execute_time += execute_time
+        self.fetch_time += fetch_time
+        self.max_time = max(self.max_time, elapsed)
+        self.histogram[_bucket(elapsed)] += 1
+
+    @property
+    def total_time(self):
+        return self.execute_time + self.fetch_time
+
+    def percentile(self, fraction):
+        """Upper bound in seconds of the histogram bucket holding the given fraction of calls"""
+        wanted = fraction * self.calls
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS, self.histogram):
+            seen += count
+            if seen >= wanted:
+                return min(bound / 1000, self.max_time)
+        return self.max_time
+
+
+def _bucket(seconds):
+    ms = seconds * 1000
+    for index, bound in enumerate(HISTOGRAM_BOUNDS):
+        if ms <= bound:
+            return index
+    return len(HISTOGRAM_BOUNDS)
+
+
+def caller():
+    """module.function that issued the statement, e.g. "job_service._stream (from job_service.iter_open_jobs)"
+
+    A private helper is followed by the nearest public function above it.
+    """
+    frame = sys._getframe(1)
+    first = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in _INTERNAL:
+            label = f"{module}.{frame.f_code.co_name}"
+            if frame.f_code.co_name[0] not in "_<":
+                return f"{first} (from {label})" if first else label
+            first = first or label
+        frame = frame.f_back
+    return first or "?"
+
+
+class TimedCursor:
+    """Cursor proxy that times fetches and records the statement once its results are read.
+
+    A statement is recorded when a fetch runs out of rows, or else when its
+    connection goes back to the pool or its cached cursor runs the SQL again.
+    """
+
+    def __init__(self, cursor, caller, sql, execute_time):
+        self._cursor = cursor
+        self._caller = caller
+        self._sql = sql
+        self._execute_time = execute_time
+        self._fetch_time = 0.0
+        self._rows = 0
+        self.done = False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetch_time += time.perf_counter() - started
+        if row is None:
+            self.finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self._cursor.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._fetch_time += time.perf_counter() - started
+        self._rows += len(rows)
+        if len(rows) < size:
+            self.finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetch_time += time.perf_counter() - started
+        self._rows += len(rows)
+        self.finish()
+        return rows
+
+    def finish(self, rows=None):
+        if not self.done:
+            self.done = True
+            record(self._caller, self._sql, self._execute_time, self._fetch_time,
+                   self._rows if rows is None else rows)
+
+
+def execute(cursor, sql, params, many=False):
+    """Run sql on cursor (executemany with many=True) and return a TimedCursor over it"""
+    who = caller()
+    started = time.perf_counter()
+    try:
+        if many:
+            cursor.executemany(sql, params)
+        else:
+            cursor.execute(sql, *params)
+    except Exception:
+        record(who, sql, time.perf_counter() - started, 0.0, 0, failed=True)
+        raise
+    timed = TimedCursor(cursor, who, sql, time.perf_counter() - started)
+    if many or cursor.description is None:
+        # nothing to fetch: count the rows the statement changed
+        timed.finish(max(cursor.rowcount, 0))
+    return timed
+
+
+def record(caller, sql, execute_time, fetch_time, rows, failed=False):
+    key = (caller, sql)
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = StatementStats(caller, sql)
+        entry.add(execute_time, fetch_time, rows, failed)
+    if SLOW_QUERY_LOG and (execute_time + fetch_time) * 1000 >= SLOW_QUERY_MS:
+        _log_slow(caller, sql, execute_time, fetch_time, rows, failed)
+    for listener in _listeners:
+        listener(caller, sql, execute_time, fetch_time, rows, failed)
+
+
+def add_listener(listener):
+    """Call listener(caller, sql, execute_time, fetch_time, rows, failed) for every statement recorded"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _log_slow(caller, sql, execute_time, fetch_time, rows, failed):
+    line = (f"{datetime.now().isoformat(timespec='milliseconds')} "
+            f"{(execute_time + fetch_time) * 1000:.1f}ms (execute {execute_time * 1000:.1f}ms, "
+            f"fetch {fetch_time * 1000:.1f}ms) rows={rows}{' FAILED' if failed else ''} "
+            f"caller={caller} sql={' '.join(sql.split())}\n")
+    with _log_lock:
+        try:
+            with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"Could not write the slow query log {SLOW_QUERY_LOG}: {e}")
+
+
+def snapshot():
+    """StatementStats of every statement seen, most total time first (copies, safe to keep)"""
+    with _stats_lock:
+        entries = [_copy(entry) for entry in _stats.values()]
+    return sorted(entries, key=lambda entry: entry.total_time, reverse=True)
+
+
+def _copy(entry):
+    copy = StatementStats(entry.caller, entry.sql)
+    copy.__dict__.update(entry.__dict__, histogram=list(entry.histogram))
+    return copy
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+def histogram(entries=None):
+    """Calls per latency bucket summed over the given (default all) statements"""
+    counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    for entry in snapshot() if entries is None else entries:
+        counts = [total + count for total, count in zip(counts, entry.histogram)]
+    return counts
+
+
+def report(limit=REPORT_LIMIT, sort="total"):
+    """Text table of the statements with the most total time (or calls, rows or max time)"""
+    keys = {"total": lambda e: e.total_time, "calls": lambda e: e.calls,
+            "rows": lambda e: e.rows, "max": lambda e: e.max_time}
+    entries = snapshot()
+    if not entries:
+        return "No statements recorded."
+    lines = [f"{'Calls':>7} {'Total ms':>10} {'Mean ms':>9} {'p95 ms':>8} {'Max ms':>8} {'Fetch %':>7} "
+             f"{'Rows':>9}  Caller / SQL"]
+    for entry in sorted(entries, key=keys[sort], reverse=True)[:limit]:
+        sql = " ".join(entry.sql.split())
+        lines.append(f"{entry.calls:>7} {entry.total_time * 1000:>10.1f} "
+                     f"{entry.total_time * 1000 / entry.calls:>9.2f} {entry.percentile(0.95) * 1000:>8.1f} "
+                     f"{entry.max_time * 1000:>8.1f} {entry.fetch_time * 100 / (entry.total_time or 1):>7.0f} "
+                     f"{entry.rows:>9}  {entry.caller}{f' ({entry.errors} failed)' if entry.errors else ''}")
+        lines.append(f"{'':>64}{sql[:SQL_WIDTH]}{'...' if len(sql) > SQL_WIDTH else ''}")
+    labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}ms"]
+    lines.append("Latency: " + ", ".join(f"{label} {count}" for label, count in zip(labels, histogram(entries))
+                                         if count))
+    return "\n".join(lines)
@@ -0,0 +1,231 @@
+"""Recompute the denormalized counters from their source rows, report and repair drift.
+
+AppCount, AppliedJobCount and AnnouncedJobCount are kept up to date by
+increments scattered over job_service and written behind by counters, so a
+crash, a failed flush or a manual edit leaves them wrong. This command
+recounts Application and VacancyJob with GROUP BY queries, one key range at
+a time so that no statement holds locks for long:
+
+    python reconcile_counters.py                  # check and repair everything
+    python reconcile_counters.py --dry-run        # only report
+    python reconcile_counters.py --incremental    # only keys touched since the last run
+
+Incremental runs follow the AppID and JobID high-water marks saved by the
+previous run, so they see new applications and vacancies but not deletions;
+schedule a full run now and then as well.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import counters
+import db_backend
+import db_pool
+
+CHUNK_SIZE = 5000           # keys recounted per statement
+REPAIR_BATCH = 500          # rows updated per transaction
+SETTLE_TIME = 2 * counters.FLUSH_INTERVAL   # seconds to let other processes flush before confirming drift
+STATE_PATH = "reconcile_state.json"
+SHOW_LIMIT = 20             # mismatches printed per counter
+
+# Rows each counter counts: name -> (source table, column referencing the counter's key)
+SOURCES = {
+    "app_count": ("Application", "JobID"),
+    "applied_job_count": ("Application", "SeekerID"),
+    "announced_job_count": ("VacancyJob", "EmployerID"),
+}
+
+
+def _mismatch_sql(counter, where):
+    table, column, key_column = counters.COUNTERS[counter]
+    source, reference = SOURCES[counter]
+    return f"""
+        SELECT t.{key_column} AS CounterKey, t.{column} AS Stored, COUNT(s.{reference}) AS Actual
+        FROM {table} t
+        LEFT JOIN {source} s ON s.{reference} = t.{key_column}
+        WHERE {where}
+        GROUP BY t.{key_column}, t.{column}
+        HAVING t.{column} IS NULL OR t.{column} <> COUNT(s.{reference})
+    """
+
+
+def _drift(rows):
+    # key -> (stored, actual, delta to add)
+    return {row.CounterKey: (row.Stored, row.Actual, row.Actual - (row.Stored or 0)) for row in rows}
+
+
+def scan_range(counter, low, high):
+    """Mismatches among keys low < key <= high as {key: (stored, actual, delta)}"""
+    key_column = counters.COUNTERS[counter][2]
+    with db_pool.connection() as conn:
+        rows = conn.execute(_mismatch_sql(counter, f"t.{key_column} > ? AND t.{key_column} <= ?"),
+                            low, high).fetchall()
+    return _drift(rows)
+
+
+def check_keys(counter, keys):
+    """Mismatches among the given keys as {key: (stored, actual, delta)}"""
+    key_column = counters.COUNTERS[counter][2]
+    keys = sorted(keys)
+    found = {}
+    for start in range(0, len(keys), REPAIR_BATCH):
+        chunk = keys[start:start + REPAIR_BATCH]
+        marks = ", ".join("?" * len(chunk))
+        with db_pool.connection() as conn:
+            rows = conn.execute(_mismatch_sql(counter, f"t.{key_column} IN ({marks})"), *chunk).fetchall()
+        found.update(_drift(rows))
+    return found
+
+
+def key_ranges(counter, chunk_size=CHUNK_SIZE):
+    """(low, high] bounds covering every key of the counter's table, chunk_size keys each"""
+    table, _, key_column = counters.COUNTERS[counter]
+    low = -1
+    while True:
+        # the chunk_size-th key after low closes the range; past the end take the last key
+        with db_pool.connection() as conn:
+            row = conn.execute(f"""
+                SELECT {key_column} FROM {table} WHERE {key_column} > ?
+                ORDER BY {key_column} OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+            """, low, chunk_size - 1, 1).fetchone()
+            if row is None:
+                row = conn.execute(f"SELECT MAX({key_column}) FROM {table} WHERE {key_column} > ?", low).fetchone()
+        if row is None or row[0] is None:
+            return
+        yield low, row[0]
+        low = row[0]
+
+
+def high_water_marks():
+    with db_pool.connection() as conn:
+        app_id = conn.execute("SELECT MAX(AppID) FROM Application").fetchone()[0]
+        job_id = conn.execute("SELECT MAX(JobID) FROM VacancyJob").fetchone()[0]
+    return {'app_id': app_id or 0, 'job_id': job_id or 0}
+
+
+def changed_keys(since, until, chunk_size=CHUNK_SIZE * 10):
+    """{counter: keys} touched by applications and vacancies added between two sets of high-water marks"""
+    touched = {counter: set() for counter in SOURCES}
+    for low in range(since['app_id'], until['app_id'], chunk_size):
+        with db_pool.connection() as conn:
+            for row in conn.execute("SELECT DISTINCT JobID, SeekerID FROM Application WHERE AppID > ? AND AppID <= ?",
+                                    low, min(low + chunk_size, until['app_id'])).fetchall():
+                touched["app_count"].add(row.JobID)
+                touched["applied_job_count"].add(row.SeekerID)
+    for low in range(since['job_id'], until['job_id'], chunk_size):
+        with db_pool.connection() as conn:
+            for row in conn.execute("SELECT JobID, EmployerID FROM VacancyJob WHERE JobID > ? AND JobID <= ?",
+                                    low, min(low + chunk_size, until['job_id'])).fetchall():
+                touched["app_count"].add(row.JobID)
+                touched["announced_job_count"].add(row.EmployerID)
+    for keys in touched.values():
+        keys.discard(None)
+    return touched
+
+
+def repair(counter, drift):
+    """Add each confirmed delta to its counter, REPAIR_BATCH rows per transaction.
+
+    Adding the difference rather than writing the recount keeps increments
+    that other processes flush meanwhile.
+    """
+    table, column, key_column = counters.COUNTERS[counter]
+    rows = sorted((key, delta) for key, (_, _, delta) in drift.items())
+    sql = f"UPDATE {table} SET {column} = COALESCE({column}, 0) + ? WHERE {key_column} = ?"
+    for start in range(0, len(rows), REPAIR_BATCH):
+        batch = [(delta, key) for key, delta in rows[start:start + REPAIR_BATCH]]
+        db_pool.transaction(lambda conn: conn.executemany(sql, batch))
+    return len(rows)
+
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_state(path, marks):
+    state = dict(marks, finished_at=datetime.now().isoformat(timespec="seconds"))
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def reconcile(names=None, incremental=False, dry_run=False, state_path=STATE_PATH,
+              chunk_size=CHUNK_SIZE, settle=SETTLE_TIME, pause=0.0, show=SHOW_LIMIT):
+    """Check (and unless dry_run, repair) the counters; returns {counter: (mismatched, repaired)}"""
+    names = names or sorted(SOURCES)
+    counters.flush()
+    marks = high_water_marks()      # taken first so rows added during the run are rechecked next time
+    state = load_state(state_path) if incremental else None
+    if incremental and state is None:
+        print(f"No state in {state_path}; running a full check.")
+    touched = changed_keys(state, marks) if state is not None else None
+
+    results = {}
+    for counter in names:
+        table, column, key_column = counters.COUNTERS[counter]
+        started = time.monotonic()
+        if touched is not None:
+            drift = check_keys(counter, touched[counter])
+            scope = f"{len(touched[counter])} changed keys"
+        else:
+            drift = {}
+            chunks = 0
+            for low, high in key_ranges(counter, chunk_size):
+                drift.update(scan_range(counter, low, high))
+                chunks += 1
+                if pause:
+                    time.sleep(pause)
+            scope = f"{chunks} chunks"
+        found = len(drift)
+        if drift and settle:
+            # a mismatch may only be a delta another process has not flushed yet
+            time.sleep(settle)
+            recheck = check_keys(counter, drift)
+            drift = {key: value for key, value in recheck.items()
+                     if key in drift and drift[key][2] == value[2]}
+        print(f"{table}.{column}: {found} mismatched, {len(drift)} confirmed "
+              f"({scope}, {time.monotonic() - started:.1f}s)")
+        for key, (stored, actual, delta) in sorted(drift.items())[:show]:
+            print(f"  {key_column} {key}: stored {stored}, actual {actual} ({delta:+d})")
+        if len(drift) > show:
+            print(f"  ... and {len(drift) - show} more")
+        repaired = 0 if dry_run else repair(counter, drift)
+        if repaired:
+            print(f"  repaired {repaired} rows")
+        results[counter] = (len(drift), repaired)
+
+    if not dry_run:
+        save_state(state_path, marks)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="database URL, defaults to $JOBAPP_DB")
+    parser.add_argument("--counter", action="append", choices=sorted(SOURCES),
+                        help="counter to check (repeatable); default all")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only check keys touched since the last run")
+    parser.add_argument("--dry-run", action="store_true", help="report without repairing")
+    parser.add_argument("--state", default=STATE_PATH, help="high-water mark file (default %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="keys per query (default %(default)s)")
+    parser.add_argument("--settle", type=float, default=SETTLE_TIME,
+                        help="seconds to wait before confirming a mismatch (default %(default)s)")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between chunks")
+    parser.add_argument("--show", type=int, default=SHOW_LIMIT, help="mismatches listed per counter")
+    args = parser.parse_args(argv)
+    if args.db:
+        db_backend.set_backend(args.db)
+    results = reconcile(args.counter, args.incremental, args.dry_run, args.state,
+                        args.chunk_size, args.settle, args.pause, args.show)
+    return 1 if args.dry_run and any(mismatched for mismatched, _ in results.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,340 @@
+"""Daily and monthly application rollups that the analytics menu reads instead of Application.
+
+JobDailyApplications and JobMonthlyApplications count applications per job
+per day and per month; EmployerMonthlyStats holds, per employer and month,
+the applications to its jobs and how many distinct jobs got one. Months are
+stored as their first day.
+
+job_service reports every application it inserts or deletes through add();
+the deltas are written behind in batches like the counters (see counters.py).
+DailyBuckets keeps running totals of the daily rows in memory so that
+analytics over any window, not just a calendar month, cost the same.
+To build the tables for existing data, or repair them, run
+
+    python rollups.py [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+import argparse
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import counters
+import db_backend
+import db_pool
+
+BUCKETS_MAX_AGE = 300      # seconds before the daily buckets are reloaded to pick up other processes' writes
+FETCH_SIZE = 5000
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+_buckets = None
+_buckets_lock = threading.Lock()
+_dirty = set()              # jobs whose daily rows changed in this process since the buckets read them
+_dirty_lock = threading.Lock()
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _add_row(conn, table, keys, deltas):
+    """Add deltas to one rollup row, creating it or deleting it once its first column drops to 0.
+
+    Returns 1 if the row was created, -1 if it was deleted, otherwise 0.
+    """
+    where = " AND ".join(f"{column} = ?" for column in keys)
+    first = next(iter(deltas))
+    updated = conn.execute(
+        f"UPDATE {table} SET {', '.join(f'{column} = {column} + ?' for column in deltas)} WHERE {where}",
+        *deltas.values(), *keys.values()).rowcount
+    if not updated:
+        if deltas[first] <= 0:
+            return 0
+        # a concurrent flush inserting the same row fails this batch; it is retried on the next flush
+        columns = list(keys) + list(deltas)
+        conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                     *keys.values(), *deltas.values())
+        return 1
+    if deltas[first] < 0 and conn.execute(f"DELETE FROM {table} WHERE {where} AND {first} <= 0",
+                                          *keys.values()).rowcount:
+        return -1
+    return 0
+
+
+def _employers(conn, job_ids):
+    """{JobID: EmployerID} of the given jobs that still exist"""
+    job_ids = sorted(job_ids)
+    found = {}
+    for start in range(0, len(job_ids), 500):
+        chunk = job_ids[start:start + 500]
+        rows = conn.execute(f"SELECT JobID, EmployerID FROM VacancyJob WHERE JobID IN ({', '.join('?' * len(chunk))})",
+                            *chunk).fetchall()
+        found.update((row.JobID, row.EmployerID) for row in rows)
+    return found
+
+
+class RollupAggregator(counters.CounterAggregator):
+    """Write-behind buffer of application deltas keyed (job_id, employer_id, day).
+
+    A flush folds them into the daily and monthly rows in key order;
+    EmployerMonthlyStats.JobsApplied follows the JobMonthlyApplications rows
+    the same flush creates and deletes.
+    """
+
+    thread_name = "rollup-flush"
+
+    def _check(self, counter):
+        if counter != "applications":
+            raise ValueError(f"Unknown rollup: {counter}")
+
+    def _write(self, conn, batch):
+        daily = defaultdict(int)
+        monthly = defaultdict(int)
+        employers = {}
+        for (_, (job_id, employer_id, day)), delta in batch.items():
+            daily[(job_id, day)] += delta
+            monthly[(job_id, month_start(day))] += delta
+            if employer_id is not None:
+                employers[job_id] = employer_id
+        employers.update(_employers(conn, {job_id for job_id, _ in daily} - employers.keys()))
+        per_employer = defaultdict(lambda: [0, 0])     # (employer, month) -> [applications, jobs applied]
+        for (job_id, day), delta in sorted(daily.items()):
+            if delta:
+                _add_row(conn, "JobDailyApplications", {"JobID": job_id, "Day": day}, {"AppCount": delta})
+        for (job_id, month), delta in sorted(monthly.items()):
+            if delta:
+                stats = per_employer[(employers.get(job_id), month)]
+                stats[0] += delta
+                stats[1] += _add_row(conn, "JobMonthlyApplications", {"JobID": job_id, "Month": month},
+                                     {"AppCount": delta})
+        for (employer_id, month), (applications, jobs) in sorted(per_employer.items()):
+            # a job deleted before its employer was looked up has no employer row to fix
+            if employer_id is not None and (applications or jobs):
+                _add_row(conn, "EmployerMonthlyStats", {"EmployerID": employer_id, "Month": month},
+                         {"AppCount": applications, "JobsApplied": jobs})
+
+
+class DailyBuckets:
+    """Per-job running totals of JobDailyApplications.
+
+    count() bisects the job's active days for both ends of the window, so
+    a 90-day or a 3-year window costs the same as a single day.
+    """
+
+    def __init__(self):
+        self._jobs = {}             # job_id -> (employer_id, day ordinals, running totals starting at 0)
+        self.built_at = time.monotonic()
+
+    def set_job(self, job_id, employer_id, days):
+        """Replace a job's buckets with (day, applications) pairs in day order"""
+        ordinals, totals = [], [0]
+        for day, apps in days:
+            ordinals.append(_as_date(day).toordinal())
+            totals.append(totals[-1] + apps)
+        if ordinals:
+            self._jobs[job_id] = (employer_id, ordinals, totals)
+        else:
+            self._jobs.pop(job_id, None)
+
+    def count(self, job_id, start, end):
+        """Applications to the job from start to end inclusive"""
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return 0
+        _, ordinals, totals = entry
+        return totals[bisect_right(ordinals, end.toordinal())] - totals[bisect_left(ordinals, start.toordinal())]
+
+    def counts(self, start, end):
+        """Yield (job_id, employer_id, applications) for every job with applications in the window"""
+        first, last = start.toordinal(), end.toordinal()
+        for job_id, (employer_id, ordinals, totals) in list(self._jobs.items()):
+            apps = totals[bisect_right(ordinals, last)] - totals[bisect_left(ordinals, first)]
+            if apps:
+                yield job_id, employer_id, apps
+
+
+def _daily_rows(job_ids=None):
+    # (JobID, EmployerID, Day, AppCount) in JobID, Day order
+    query = """
+        SELECT d.JobID, v.EmployerID, d.Day, d.AppCount
+        FROM JobDailyApplications d
+        JOIN VacancyJob v ON v.JobID = d.JobID
+    """
+    if job_ids is None:
+        chunks = [((), "")]
+    else:
+        job_ids = sorted(job_ids)
+        chunks = [(job_ids[i:i + 500], f" WHERE d.JobID IN ({', '.join('?' * len(job_ids[i:i + 500]))})")
+                  for i in range(0, len(job_ids), 500)]
+    for chunk, where in chunks:
+        with db_pool.connection() as conn:
+            cursor = conn.execute(query + where + " ORDER BY d.JobID, d.Day", *chunk)
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+
+
+def _fill(buckets, rows, job_ids=()):
+    # load rows grouped by job; job_ids without rows have lost all their applications
+    seen = set()
+    current, employer_id, days = None, None, []
+    for row in rows:
+        if row.JobID != current:
+            if current is not None:
+                buckets.set_job(current, employer_id, days)
+            current, employer_id, days = row.JobID, row.EmployerID, []
+            seen.add(current)
+        days.append((row.Day, row.AppCount))
+    if current is not None:
+        buckets.set_job(current, employer_id, days)
+    for job_id in job_ids:
+        if job_id not in seen:
+            buckets.set_job(job_id, None, ())
+
+
+def get_buckets():
+    """The daily buckets, loaded on first use and after BUCKETS_MAX_AGE seconds.
+
+    Jobs this process applied to since the last call are reread first, so
+    the buckets always include this process's own writes.
+    """
+    global _buckets, _dirty
+    with _buckets_lock:
+        with _dirty_lock:
+            dirty, _dirty = _dirty, set()
+        flush()         # after taking the dirty set, so every job in it has its rows written
+        if _buckets is None or time.monotonic() - _buckets.built_at > BUCKETS_MAX_AGE:
+            buckets = DailyBuckets()
+            _fill(buckets, _daily_rows())
+            _buckets = buckets
+        elif dirty:
+            _fill(_buckets, _daily_rows(dirty), dirty)
+        return _buckets
+
+
+def reset_buckets():
+    """Drop the buckets; the next call reloads them"""
+    global _buckets
+    with _buckets_lock:
+        _buckets = None
+        with _dirty_lock:
+            _dirty.clear()
+
+
+def get_aggregator():
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = RollupAggregator()
+        return _aggregator
+
+
+def reset_aggregator():
+    """Flush and drop the process-wide aggregator (e.g. before switching databases)"""
+    global _aggregator
+    with _aggregator_lock:
+        aggregator, _aggregator = _aggregator, None
+    if aggregator is not None:
+        aggregator.close()
+
+
+def add(job_id, employer_id, day, delta=1):
+    """Record delta applications to a job on a day; an employer_id of None is looked up when the delta is written"""
+    get_aggregator().add("applications", (job_id, employer_id, _as_date(day)), delta)
+    with _dirty_lock:
+        _dirty.add(job_id)
+
+
+def flush():
+    """Write pending deltas now, before reading the rollup tables"""
+    with _aggregator_lock:
+        aggregator = _aggregator
+    return aggregator.flush() if aggregator is not None else 0
+
+
+def rebuild(start=None, end=None):
+    """Recompute the rollups of every month between start and end from Application.
+
+    Each month is replaced in its own transaction. Applications whose deltas
+    are still waiting in another process's buffer get counted twice, so run
+    it while the app is idle. Returns the number of months rebuilt.
+    """
+    flush()
+    if start is None or end is None:
+        with db_pool.connection() as conn:
+            row = conn.execute("SELECT MIN(ApplyDate) AS First, MAX(ApplyDate) AS Last FROM Application").fetchone()
+        if row.First is None:
+            return 0
+        start = start or _as_date(row.First)
+        end = end or _as_date(row.Last)
+    month = month_start(start)
+    months = 0
+    while month <= end:
+        last = month_end(month)
+
+        def rebuild_month(conn):
+            conn.execute("DELETE FROM JobDailyApplications WHERE Day BETWEEN ? AND ?", month, last)
+            conn.execute("""
+                INSERT INTO JobDailyApplications (JobID, Day, AppCount)
+                SELECT JobID, ApplyDate, COUNT(*)
+                FROM Application
+                WHERE ApplyDate BETWEEN ? AND ?
+                GROUP BY JobID, ApplyDate
+            """, month, last)
+            jobs = conn.execute("""
+                SELECT d.JobID, v.EmployerID, SUM(d.AppCount) AS Apps
+                FROM JobDailyApplications d
+                JOIN VacancyJob v ON v.JobID = d.JobID
+                WHERE d.Day BETWEEN ? AND ?
+                GROUP BY d.JobID, v.EmployerID
+            """, month, last).fetchall()
+            per_employer = defaultdict(lambda: [0, 0])
+            for row in jobs:
+                per_employer[row.EmployerID][0] += row.Apps
+                per_employer[row.EmployerID][1] += 1
+            conn.execute("DELETE FROM JobMonthlyApplications WHERE Month = ?", month)
+            conn.execute("DELETE FROM EmployerMonthlyStats WHERE Month = ?", month)
+            if jobs:
+                conn.executemany("INSERT INTO JobMonthlyApplications (JobID, Month, AppCount) VALUES (?, ?, ?)",
+                                 [(row.JobID, month, row.Apps) for row in jobs])
+                conn.executemany(
+                    "INSERT INTO EmployerMonthlyStats (EmployerID, Month, AppCount, JobsApplied) VALUES (?, ?, ?, ?)",
+                    [(employer_id, month, apps, applied) for employer_id, (apps, applied) in sorted(per_employer.items())])
+            return jobs
+        jobs = db_pool.transaction(rebuild_month)
+        print(f"{month:%Y-%m}: {len(jobs)} jobs, {sum(row.Apps for row in jobs)} applications")
+        months += 1
+        month = last + timedelta(days=1)
+    return months
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the application rollups from the Application table")
+    parser.add_argument("--db", help="database URL, defaults to $JOBAPP_DB")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first day to rebuild (whole month)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last day to rebuild (whole month)")
+    args = parser.parse_args(argv)
+    if args.db:
+        db_backend.set_backend(args.db)
+    print(f"Rebuilt {rebuild(args.start, args.end)} months.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
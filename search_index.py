@@ -0,0 +1,254 @@
+import heapq
+import math
+import re
+import threading
+import time
+
+import job_service
+
+K1 = 1.2                # BM25 term-frequency saturation
+B = 0.75                # BM25 document-length normalization
+TITLE_WEIGHT = 3        # a title word counts as three occurrences
+SKILL_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+STEMMING = True         # fold plurals so "developers" matches "developer"
+SEARCH_LIMIT = 20
+INDEX_MAX_AGE = 300     # seconds before the index is rebuilt to pick up other processes' writes
+
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or our the to we with you".split())
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_index = None
+_index_lock = threading.Lock()
+_index_changes = None       # JobIDs changed while the index is rebuilt; None when no rebuild runs
+_build_lock = threading.Lock()          # one rebuild at a time
+_listening = False
+
+
+def stem(token):
+    """Strip English plural endings from a token"""
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text, stemming=STEMMING):
+    """Lowercased search terms of text without stopwords; keeps c++, c# and node.js whole"""
+    terms = []
+    for token in _TOKEN.findall((text or "").lower()):
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            terms.append(stem(token) if stemming else token)
+    return terms
+
+
+class InvertedIndex:
+    """In-memory BM25 index over the Title, ReqSkill and Description of open vacancies.
+
+    Each term's postings are grouped into buckets of documents that share
+    the same weighted term frequency and length, so every document in a
+    bucket gets the same score from that term. search() visits buckets from
+    the highest score down and stops as soon as no unvisited document can
+    beat the current top k (a threshold algorithm). The result is the exact
+    BM25 top k, but common terms rarely need more than a few buckets.
+    """
+
+    def __init__(self, stemming=STEMMING):
+        self.stemming = stemming
+        self._lock = threading.Lock()
+        self._buckets = {}          # term -> {(tf, doc length): set of job_ids}
+        self._df = {}               # term -> number of documents containing it
+        self._doc_terms = {}        # job_id -> {term: weighted term frequency}
+        self._doc_len = {}          # job_id -> weighted length
+        self._total_len = 0
+        self.built_at = time.monotonic()
+
+    def add(self, job_id, title, description, skills):
+        """Index a vacancy, replacing any earlier version of it"""
+        freqs = {}
+        for text, weight in ((title, TITLE_WEIGHT), (skills, SKILL_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+            for term in tokenize(text, self.stemming):
+                freqs[term] = freqs.get(term, 0) + weight
+        length = sum(freqs.values())
+        with self._lock:
+            self._remove(job_id)
+            for term, tf in freqs.items():
+                self._buckets.setdefault(term, {}).setdefault((tf, length), set()).add(job_id)
+                self._df[term] = self._df.get(term, 0) + 1
+            self._doc_terms[job_id] = freqs
+            self._doc_len[job_id] = length
+            self._total_len += length
+
+    def remove(self, job_id):
+        with self._lock:
+            self._remove(job_id)
+
+    def _remove(self, job_id):
+        freqs = self._doc_terms.pop(job_id, None)
+        if freqs is None:
+            return
+        length = self._doc_len.pop(job_id)
+        self._total_len -= length
+        for term, tf in freqs.items():
+            buckets = self._buckets[term]
+            bucket = buckets[(tf, length)]
+            bucket.discard(job_id)
+            if not bucket:
+                del buckets[(tf, length)]
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._df[term]
+                del self._buckets[term]
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Top `limit` (job_id, score) pairs for the query, best first"""
+        terms = set(tokenize(query, self.stemming))
+        with self._lock:
+            count = len(self._doc_len)
+            terms = [term for term in terms if term in self._buckets]
+            if not count or not terms or limit <= 0:
+                return []
+            base = K1 * (1 - B)
+            per_len = K1 * B / (self._total_len / count or 1)
+            idf = {}
+            queues = []         # per term: [(score of its bucket, bucket key)] best first
+            for term in terms:
+                df = self._df[term]
+                idf[term] = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                queues.append(sorted(
+                    ((idf[term] * tf * (K1 + 1) / (tf + base + per_len * length), (tf, length))
+                     for tf, length in self._buckets[term]), reverse=True))
+
+            def score(job_id):
+                freqs = self._doc_terms[job_id]
+                length = self._doc_len[job_id]
+                total = 0.0
+                for term in terms:
+                    tf = freqs.get(term)
+                    if tf:
+                        total += idf[term] * tf * (K1 + 1) / (tf + base + per_len * length)
+                return total
+
+            top = []            # min-heap of the best (score, job_id) found so far
+            seen = set()
+            positions = [0] * len(terms)
+            while True:
+                # an unseen document can score at most the sum of each term's next bucket score
+                heads = [queue[pos][0] if pos < len(queue) else 0.0 for queue, pos in zip(queues, positions)]
+                threshold = sum(heads)
+                if not threshold or (len(top) == limit and top[0][0] >= threshold):
+                    break
+                i = max(range(len(terms)), key=heads.__getitem__)
+                for job_id in self._buckets[terms[i]][queues[i][positions[i]][1]]:
+                    if job_id in seen:
+                        continue
+                    seen.add(job_id)
+                    entry = (score(job_id), job_id)
+                    if len(top) < limit:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+                        if top[0][0] >= threshold:
+                            break
+                positions[i] += 1
+        return [(job_id, value) for value, job_id in sorted(top, reverse=True)]
+
+
+def _fresh(index):
+    return index is not None and time.monotonic() - index.built_at <= INDEX_MAX_AGE
+
+
+def _update(index, job_ids, rows):
+    for job_id in job_ids:
+        index.remove(job_id)
+    for row in rows:
+        index.add(row.JobID, row.Title, row.Description, row.ReqSkill)
+
+
+def _build_index():
+    # load every open job without holding _index_lock, then catch up on the jobs changed meanwhile
+    global _index, _index_changes, _listening
+    changes = set()
+    with _index_lock:
+        _index_changes = changes
+        if not _listening:
+            job_service.add_job_listener(_on_jobs_changed)
+            _listening = True
+    try:
+        index = InvertedIndex()
+        for row in job_service.iter_job_texts():
+            index.add(row.JobID, row.Title, row.Description, row.ReqSkill)
+        while True:
+            with _index_lock:
+                if _index_changes is not changes:   # reset_index() while building
+                    return index
+                if not changes:
+                    _index, _index_changes = index, None
+                    return index
+                job_ids = list(changes)
+                changes.clear()
+            _update(index, job_ids, list(job_service.iter_job_texts(job_ids)))
+    except Exception:
+        with _index_lock:
+            if _index_changes is changes:
+                _index_changes = None
+        raise
+
+
+def get_index():
+    """The process-wide index, built on first use and rebuilt after INDEX_MAX_AGE seconds.
+
+    Between builds it follows job_service writes made in this process;
+    jobs other processes create, close or delete show up with the next
+    build, or at once after reset_index(). A rebuild runs in one thread
+    without holding _index_lock, and searches use the old index until the
+    new one is swapped in.
+    """
+    with _index_lock:
+        index = _index
+    if _fresh(index):
+        return index
+    if not _build_lock.acquire(blocking=index is None):
+        return index
+    try:
+        with _index_lock:
+            index = _index
+        return index if _fresh(index) else _build_index()
+    finally:
+        _build_lock.release()
+
+
+def reset_index():
+    """Forget the index; the next search rebuilds it"""
+    global _index, _index_changes, _listening
+    with _index_lock:
+        if _listening:
+            job_service.remove_job_listener(_on_jobs_changed)
+            _listening = False
+        _index = None
+        _index_changes = None
+
+
+def _on_jobs_changed(event, job_ids):
+    # read before taking the lock so searches never wait on the database
+    rows = list(job_service.iter_job_texts(job_ids)) if event in ("created", "updated") else []
+    with _index_lock:
+        if _index_changes is not None:
+            _index_changes.update(job_ids)      # the rebuild rereads them before it is swapped in
+        if _index is not None:
+            _update(_index, job_ids, rows)
+
+
+def search_jobs(query, limit=SEARCH_LIMIT):
+    """filter_vacancies()-style rows of the open jobs best matching query, best first"""
+    hits = get_index().search(query, limit)
+    return job_service.jobs_by_ids([job_id for job_id, _ in hits])
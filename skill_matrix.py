@@ -0,0 +1,443 @@
+import re
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:         # recommendations are optional; everything else runs without NumPy
+    np = None
+
+import job_service
+
+RECOMMEND_LIMIT = 10
+CANDIDATE_LIMIT = 10
+MATRIX_MAX_AGE = 300        # seconds before the matrix is rebuilt to pick up other processes' writes
+SKILL_WEIGHT = 0.7          # share of the score from holding the required skills
+EXPERIENCE_WEIGHT = 0.3     # share from years in those skills versus EXPRequired
+# Candidate ranking also rewards a seeker's industry and preferred location matching the job
+CANDIDATE_SKILL_WEIGHT = 0.5
+CANDIDATE_EXPERIENCE_WEIGHT = 0.3
+INDUSTRY_WEIGHT = 0.1
+LOCATION_WEIGHT = 0.1
+
+_SKILL_SEPARATORS = re.compile(r"[,;/|]")
+
+_lock = threading.Lock()
+_vocabulary = {}            # normalized skill name -> column id (0 is padding)
+_vocabulary_lock = threading.Lock()     # matrices are built outside _lock
+_job_matrix = None
+_seeker_matrix = None
+_job_changes = None         # JobIDs changed while the job matrix is rebuilt; None when no rebuild runs
+_seeker_changes = None      # likewise UserIDs of job seekers
+_job_build_lock = threading.Lock()      # one rebuild of each matrix at a time
+_seeker_build_lock = threading.Lock()
+_listening = False
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for skill matching (pip install numpy)")
+
+
+def skill_key(name):
+    """Normalized form used to match ReqSkill entries with Skills.SkillName"""
+    return " ".join((name or "").lower().split())
+
+
+def parse_skills(req_skill):
+    """Distinct normalized skill names of a comma separated ReqSkill value"""
+    names = []
+    for part in _SKILL_SEPARATORS.split(req_skill or ""):
+        key = skill_key(part)
+        if key and key not in names:
+            names.append(key)
+    return names
+
+
+def _skill_id(key):
+    skill_id = _vocabulary.get(key)
+    if skill_id is None:
+        with _vocabulary_lock:
+            skill_id = _vocabulary.get(key)
+            if skill_id is None:
+                skill_id = _vocabulary[key] = len(_vocabulary) + 1
+    return skill_id
+
+
+class JobSkillMatrix:
+    """Open vacancies as rows of required-skill ids, padded with 0, for batch scoring.
+
+    Rows are appended as jobs open and tombstoned (active=False) as they
+    close; the arrays are compacted once half the rows are dead.
+    """
+
+    def __init__(self):
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.skills = np.zeros((0, 1), dtype=np.int32)
+        self.exp = np.zeros(0, dtype=np.float64)
+        self.active = np.zeros(0, dtype=bool)
+        self.size = 0
+        self.built_at = time.monotonic()
+        self._rows = {}             # job_id -> row
+        self._dead = 0
+
+    def add(self, job_id, req_skill, exp_required):
+        self.remove(job_id)
+        ids = [_skill_id(key) for key in parse_skills(req_skill)]
+        rows = len(self.job_ids)
+        if self.size == rows:
+            rows = max(16, 2 * rows)
+        width = max(self.skills.shape[1], len(ids))
+        if rows != len(self.job_ids) or width != self.skills.shape[1]:
+            self._resize(rows, width)
+        row = self.size
+        self.size += 1
+        self.job_ids[row] = job_id
+        self.skills[row] = 0
+        self.skills[row, :len(ids)] = ids
+        self.exp[row] = exp_required or 0
+        self.active[row] = True
+        self._rows[job_id] = row
+
+    def remove(self, job_id):
+        row = self._rows.pop(job_id, None)
+        if row is None:
+            return
+        self.active[row] = False
+        self._dead += 1
+        if self._dead > 1024 and self._dead * 2 > self.size:
+            self._compact()
+
+    def _resize(self, rows, width):
+        def grow(array, shape):
+            out = np.zeros(shape, dtype=array.dtype)
+            out[tuple(slice(0, n) for n in array.shape)] = array
+            return out
+        self.job_ids = grow(self.job_ids, (rows,))
+        self.skills = grow(self.skills, (rows, width))
+        self.exp = grow(self.exp, (rows,))
+        self.active = grow(self.active, (rows,))
+
+    def _compact(self):
+        keep = np.flatnonzero(self.active[:self.size])
+        self.job_ids = self.job_ids[keep]
+        self.skills = self.skills[keep]
+        self.exp = self.exp[keep]
+        self.active = self.active[keep]
+        self.size = len(keep)
+        self._dead = 0
+        self._rows = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+
+    def score(self, years, has):
+        """Match scores in [0, 1] of every row for a seeker given as per-skill-id vectors"""
+        skills = self.skills[:self.size]
+        required = skills > 0
+        counts = required.sum(axis=1)
+        held = has[skills] & required
+        exp = self.exp[:self.size, None]
+        # years in each required skill against EXPRequired, capped at 1; holding it is enough when 0
+        fit = np.where(exp > 0, np.minimum(years[skills] / np.maximum(exp, 1), 1.0), held)
+        fit = np.where(held, fit, 0.0)
+        denominator = np.maximum(counts, 1)
+        scores = SKILL_WEIGHT * held.sum(axis=1) / denominator + EXPERIENCE_WEIGHT * fit.sum(axis=1) / denominator
+        return np.where(self.active[:self.size], scores, 0.0)
+
+
+class SeekerSkillMatrix:
+    """Every job seeker's skills as sparse columns, plus coded industry and location.
+
+    _columns maps a skill id to (seeker rows, years) arrays, so scoring a
+    job only touches the columns of its own required skills. Seekers added
+    after the build get a new row; removed ones are tombstoned
+    (active=False) until the next rebuild.
+    """
+
+    def __init__(self, profiles, skills):
+        self._codes = {}
+        rows = {}
+        seeker_ids, industries, locations = [], [], []
+        for row in profiles:
+            rows[row.UserID] = len(seeker_ids)
+            seeker_ids.append(row.UserID)
+            industries.append(self._code(row.Industry))
+            locations.append(self._code(row.PreferredLocation))
+        self.seeker_ids = np.array(seeker_ids, dtype=np.int64)
+        self.industries = np.array(industries, dtype=np.int32)
+        self.locations = np.array(locations, dtype=np.int32)
+        columns = {}
+        for row in skills:
+            seeker_row = rows.get(row.UserID)
+            if seeker_row is not None:
+                column = columns.setdefault(_skill_id(skill_key(row.SkillName)), ([], []))
+                column[0].append(seeker_row)
+                column[1].append(row.EXPYears or 0)
+        self._columns = {skill_id: (np.array(seeker_rows, dtype=np.int64), np.array(years, dtype=np.float64))
+                         for skill_id, (seeker_rows, years) in columns.items()}
+        self._rows = rows           # user_id -> row
+        self.size = len(seeker_ids)
+        self.active = np.ones(self.size, dtype=bool)
+        self.built_at = time.monotonic()
+
+    def add(self, user_id, industry, location, skills):
+        """Add a seeker with its (SkillName, EXPYears) rows, replacing any earlier version of it"""
+        self.remove(user_id)
+        if self.size == len(self.seeker_ids):
+            extra = max(16, self.size)
+            self.seeker_ids, self.industries, self.locations, self.active = (
+                np.concatenate([array, np.zeros(extra, dtype=array.dtype)])
+                for array in (self.seeker_ids, self.industries, self.locations, self.active))
+        row = self.size
+        self.size += 1
+        self.seeker_ids[row] = user_id
+        self.industries[row] = self._code(industry)
+        self.locations[row] = self._code(location)
+        self.active[row] = True
+        self._rows[user_id] = row
+        for skill in skills:
+            skill_id = _skill_id(skill_key(skill.SkillName))
+            seeker_rows, years = self._columns.get(skill_id, ((), ()))
+            self._columns[skill_id] = (np.append(np.asarray(seeker_rows, dtype=np.int64), row),
+                                       np.append(np.asarray(years, dtype=np.float64), skill.EXPYears or 0))
+
+    def remove(self, user_id):
+        row = self._rows.pop(user_id, None)
+        if row is not None:
+            self.active[row] = False
+
+    def _code(self, value):
+        key = skill_key(value)
+        return self._codes.setdefault(key, len(self._codes)) if key else -1
+
+    def score(self, req_skill, exp_required, industry, location):
+        """Match scores in [0, 1] of every seeker for a job"""
+        names = parse_skills(req_skill)
+        required = max(len(names), 1)
+        skill_ids = [_vocabulary[key] for key in names if key in _vocabulary]
+        held = np.zeros((len(skill_ids), self.size), dtype=bool)
+        years = np.zeros(held.shape)
+        for i, skill_id in enumerate(skill_ids):
+            column = self._columns.get(skill_id)
+            if column is not None:
+                held[i, column[0]] = True
+                years[i, column[0]] = column[1]
+        exp = exp_required or 0
+        fit = np.minimum(years / exp, 1.0) if exp > 0 else held.astype(np.float64)
+        fit[~held] = 0.0
+        scores = (CANDIDATE_SKILL_WEIGHT * held.sum(axis=0) / required
+                  + CANDIDATE_EXPERIENCE_WEIGHT * fit.sum(axis=0) / required)
+        industry_code = self._codes.get(skill_key(industry), -2)
+        location_code = self._codes.get(skill_key(location), -2)
+        scores += INDUSTRY_WEIGHT * (self.industries[:self.size] == industry_code)
+        scores += LOCATION_WEIGHT * (self.locations[:self.size] == location_code)
+        return np.where(self.active[:self.size], scores, 0.0)
+
+
+def _top(scores, limit):
+    # indexes of the `limit` best positive scores, best first
+    limit = min(limit, int(np.count_nonzero(scores > 0)))
+    if limit <= 0:
+        return np.zeros(0, dtype=np.int64)
+    best = np.argpartition(-scores, limit - 1)[:limit]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+def _listen():
+    global _listening
+    if not _listening:
+        job_service.add_job_listener(_on_jobs_changed)
+        job_service.add_seeker_listener(_on_seekers_changed)
+        _listening = True
+
+
+def _update_jobs(matrix, job_ids, rows):
+    for job_id in job_ids:
+        matrix.remove(job_id)
+    for row in rows:
+        matrix.add(row.JobID, row.ReqSkill, row.EXPRequired)
+
+
+def _on_jobs_changed(event, job_ids):
+    # read before taking the lock so scoring never waits on the database
+    rows = list(job_service.iter_job_requirements(job_ids)) if event in ("created", "updated") else []
+    with _lock:
+        if _job_changes is not None:
+            _job_changes.update(job_ids)        # the rebuild rereads them before it is swapped in
+        if _job_matrix is not None:
+            _update_jobs(_job_matrix, job_ids, rows)
+
+
+def _fresh(matrix):
+    return matrix is not None and time.monotonic() - matrix.built_at <= MATRIX_MAX_AGE
+
+
+def _build_job_matrix():
+    # load every open job without holding _lock, then catch up on the jobs changed meanwhile
+    global _job_matrix, _job_changes
+    changes = set()
+    with _lock:
+        _job_changes = changes
+    try:
+        matrix = JobSkillMatrix()
+        for row in job_service.iter_job_requirements():
+            matrix.add(row.JobID, row.ReqSkill, row.EXPRequired)
+        while True:
+            with _lock:
+                if _job_changes is not changes:     # reset() while building
+                    return matrix
+                if not changes:
+                    _job_matrix, _job_changes = matrix, None
+                    return matrix
+                job_ids = list(changes)
+                changes.clear()
+            _update_jobs(matrix, job_ids, list(job_service.iter_job_requirements(job_ids)))
+    except Exception:
+        with _lock:
+            if _job_changes is changes:
+                _job_changes = None
+        raise
+
+
+def get_job_matrix():
+    """The open-job matrix, built on first use and rebuilt after MATRIX_MAX_AGE seconds.
+
+    A rebuild runs outside _lock in one thread; the others keep scoring
+    against the old matrix until it is swapped in.
+    """
+    _require_numpy()
+    with _lock:
+        _listen()
+        matrix = _job_matrix
+    if _fresh(matrix):
+        return matrix
+    if not _job_build_lock.acquire(blocking=matrix is None):
+        return matrix
+    try:
+        with _lock:
+            matrix = _job_matrix
+        return matrix if _fresh(matrix) else _build_job_matrix()
+    finally:
+        _job_build_lock.release()
+
+
+def _read_seekers(user_ids):
+    # (profiles, {user_id: skill rows}) of the seekers that still exist
+    skills = {}
+    for row in job_service.iter_seeker_skills(user_ids):
+        skills.setdefault(row.UserID, []).append(row)
+    return list(job_service.iter_seeker_profiles(user_ids)), skills
+
+
+def _update_seekers(matrix, user_ids, profiles, skills):
+    for user_id in user_ids:
+        matrix.remove(user_id)
+    for row in profiles:
+        matrix.add(row.UserID, row.Industry, row.PreferredLocation, skills.get(row.UserID, ()))
+
+
+def _on_seekers_changed(event, user_ids):
+    profiles, skills = _read_seekers(user_ids) if event != "deleted" else ([], {})
+    with _lock:
+        if _seeker_changes is not None:
+            _seeker_changes.update(user_ids)
+        if _seeker_matrix is not None:
+            _update_seekers(_seeker_matrix, user_ids, profiles, skills)
+
+
+def _build_seeker_matrix():
+    # as _build_job_matrix()
+    global _seeker_matrix, _seeker_changes
+    changes = set()
+    with _lock:
+        _seeker_changes = changes
+    try:
+        matrix = SeekerSkillMatrix(job_service.iter_seeker_profiles(), job_service.iter_seeker_skills())
+        while True:
+            with _lock:
+                if _seeker_changes is not changes:
+                    return matrix
+                if not changes:
+                    _seeker_matrix, _seeker_changes = matrix, None
+                    return matrix
+                user_ids = list(changes)
+                changes.clear()
+            _update_seekers(matrix, user_ids, *_read_seekers(user_ids))
+    except Exception:
+        with _lock:
+            if _seeker_changes is changes:
+                _seeker_changes = None
+        raise
+
+
+def get_seeker_matrix():
+    """The job seeker matrix, built on first use and rebuilt after MATRIX_MAX_AGE seconds (see get_job_matrix())"""
+    _require_numpy()
+    with _lock:
+        _listen()
+        matrix = _seeker_matrix
+    if _fresh(matrix):
+        return matrix
+    if not _seeker_build_lock.acquire(blocking=matrix is None):
+        return matrix
+    try:
+        with _lock:
+            matrix = _seeker_matrix
+        return matrix if _fresh(matrix) else _build_seeker_matrix()
+    finally:
+        _seeker_build_lock.release()
+
+
+def reset():
+    """Drop the matrices; the next call rebuilds them"""
+    global _job_matrix, _seeker_matrix, _job_changes, _seeker_changes
+    with _lock:
+        _job_matrix = None
+        _seeker_matrix = None
+        _job_changes = None
+        _seeker_changes = None
+
+
+def recommend_jobs(seeker_id, limit=RECOMMEND_LIMIT):
+    """[(row, score)] of the open jobs best matching the seeker's skills, best first.
+
+    Rows are shaped like filter_vacancies() rows; score is between 0 and 1.
+    """
+    matrix = get_job_matrix()
+    skills = job_service.seeker_skills(seeker_id)
+    with _lock:
+        years = np.zeros(len(_vocabulary) + 1)
+        has = np.zeros(len(_vocabulary) + 1, dtype=bool)
+        for row in skills:
+            skill_id = _vocabulary.get(skill_key(row.SkillName))
+            if skill_id is not None and skill_id < len(years):     # else no job in the matrix asks for it
+                years[skill_id] = max(years[skill_id], row.EXPYears or 0)
+                has[skill_id] = True
+        scores = matrix.score(years, has)
+        best = _top(scores, limit)
+        ranked = [(int(job_id), float(score)) for job_id, score in zip(matrix.job_ids[best], scores[best])]
+    rows = {row.JobID: row for row in job_service.jobs_by_ids([job_id for job_id, _ in ranked])}
+    return [(rows[job_id], score) for job_id, score in ranked if job_id in rows]
+
+
+def rank_candidates(employer_id, job_id, limit=CANDIDATE_LIMIT, applicants_only=False):
+    """[(row, score)] of the job seekers best matching one of the employer's vacancies, best first.
+
+    Rows are (UserID, Name, Email, Industry, PreferredLocation); score is
+    between 0 and 1. applicants_only restricts the ranking to seekers who
+    applied to the job.
+    """
+    job = job_service.get_job_requirements(job_id)
+    if not job:
+        raise job_service.ServiceError(f"No job found with JobID: {job_id}")
+    if job.EmployerID != employer_id:
+        raise job_service.ServiceError("You can only rank candidates for jobs that you created!")
+    matrix = get_seeker_matrix()
+    applicants = job_service.applicant_ids(job_id) if applicants_only else None
+    with _lock:
+        scores = matrix.score(job.ReqSkill, job.EXPRequired, job.Industry, job.Location)
+        seeker_ids = matrix.seeker_ids[:matrix.size]
+        if applicants is not None:
+            scores = np.where(np.isin(seeker_ids, applicants), scores, 0.0)
+        best = _top(scores, limit)
+        ranked = [(int(user_id), float(score)) for user_id, score in zip(seeker_ids[best], scores[best])]
+    rows = {row.UserID: row for row in job_service.seekers_by_ids([user_id for user_id, _ in ranked])}
+    return [(rows[user_id], score) for user_id, score in ranked if user_id in rows]
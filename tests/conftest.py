@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["JOBAPP_DB"] = "sqlite:///:memory:"
+os.environ["JOBAPP_SLOW_QUERY_LOG"] = ""
+
+import pytest  # noqa: E402
+
+import analytics_engine  # noqa: E402
+import job_service  # noqa: E402
+import search_index  # noqa: E402
+import skill_matrix  # noqa: E402
+import trending  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database with every cache dropped"""
+    job_service.switch_database("sqlite:///:memory:")
+    trending.reset()
+    skill_matrix.reset()
+    search_index.reset_index()
+    analytics_engine.reset()
+    yield
+    job_service.switch_database("sqlite:///:memory:")
+
+
+@pytest.fixture
+def employer(db):
+    return job_service.register_user("Acme HR", "hr@acme.test", "1", job_service.EMPLOYER, "secret",
+                                     "Technology", "Cairo", company_name="Acme")
+
+
+@pytest.fixture
+def seeker(db):
+    return job_service.register_user("Sara", "sara@test", "1", job_service.JOB_SEEKER, "secret",
+                                     "Technology", "Cairo", resume_link="cv")
+
+
+@pytest.fixture
+def job(employer):
+    return job_service.create_job(employer, "Python Developer", "Build services", "Technology", "Cairo",
+                                  "Python", 2)
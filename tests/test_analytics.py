@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+
+import analytics_engine
+import analytics_report
+import db_pool
+import job_service
+import rollups
+
+
+def _windows():
+    today = datetime.date.today()
+    month = rollups.month_start(today)
+    return [(today, today), (month, rollups.month_end(month))]      # daily buckets, then the monthly rollup
+
+
+@pytest.fixture
+def employers(employer, seeker):
+    idle = job_service.register_user("Idle HR", "hr@idle.test", "2", job_service.EMPLOYER, "secret",
+                                     "Technology", "Giza", company_name="Idle")
+    busy = job_service.register_user("Busy HR", "hr@busy.test", "3", job_service.EMPLOYER, "secret",
+                                     "Finance", "Cairo", company_name="Busy")
+    applied = job_service.create_job(employer, "Python Developer", "Services", "Technology", "Cairo", "Python", 2)
+    job_service.create_job(employer, "Tester", "Manual tests", "Technology", "Cairo", "QA", 1)
+    job_service.apply(seeker, applied)
+    job_service.apply(seeker, job_service.create_job(busy, "Accountant", "Ledgers", "Finance", "Cairo", "Excel", 1))
+    return employer, idle, busy
+
+
+@pytest.mark.parametrize("window", _windows())
+def test_employers_without_announcements_counts_jobs(employers, window):
+    with db_pool.connection() as conn:      # a stale counter must not change the answer
+        conn.execute("UPDATE Employer SET AnnouncedJobCount = 0")
+    assert job_service.employers_without_announcements(*window) == ["Acme", "Idle"]
+
+
+
+def test_report_most_interesting_job_covers_the_window(employers):
+    today = datetime.date.today()
+    sections = {s['name']: s for s in analytics_report.run_report(today, today)['sections']}
+    assert sections['most_interesting_job']['data']['applicants'] == 1
+    earlier = today - datetime.timedelta(days=40)
+    sections = {s['name']: s for s in analytics_report.run_report(earlier, earlier)['sections']}
+    assert sections['most_interesting_job']['title'].endswith(f"({earlier} to {earlier})")
+    assert sections['most_interesting_job']['data'] is None
+
+
+@pytest.fixture
+def market(employers):
+    acme, idle, busy = employers
+    seekers = [job_service.register_user(f"Seeker {i}", f"seeker{i}@test", "1", job_service.JOB_SEEKER, "secret",
+                                         "Technology", "Cairo", resume_link="cv") for i in range(4)]
+    popular = job_service.create_job(busy, "Data Engineer", "Pipelines", "Technology", "Cairo", "SQL", 2)
+    closed = job_service.create_job(acme, "Designer", "UI", "Technology", "Giza", "Figma", 1)
+    for seeker in seekers:
+        job_service.apply(seeker, popular)
+    job_service.apply(seekers[0], closed)
+    job_service.apply(seekers[1], job_service.create_job(busy, "Auditor", "Books", "Finance", "Giza", "Excel", 3))
+    job_service.hide_job(acme, closed)
+    return employers
+
+
+@pytest.mark.parametrize("window", _windows())
+def test_engine_matches_sql(market, window):
+    for name in ("most_interesting_job", "jobs_without_applicants", "employer_max_announcements",
+                 "employers_without_announcements"):
+        assert getattr(analytics_engine, name)(*window) == getattr(job_service, name)(*window), name
+    assert analytics_engine.available_positions() == job_service.available_positions()
+    assert analytics_engine.job_seeker_applications() == job_service.job_seeker_applications()
+
+
+def test_engine_seeker_counts_follow_applications_and_deletions(employer, seeker, job):
+    def applied():
+        rows, _ = analytics_engine.job_seeker_applications_page()
+        return {row.UserID: row.AppliedJobCount for row in rows}
+    assert applied() == {seeker: 0}
+    other = job_service.create_job(employer, "Tester", "QA", "Technology", "Cairo", "QA", 1)
+    job_service.apply(seeker, job)
+    job_service.apply(seeker, other)
+    late = job_service.register_user("Omar", "omar@test", "1", job_service.JOB_SEEKER, "secret",
+                                     "Technology", "Cairo", resume_link="cv")
+    job_service.apply(late, job)
+    assert applied() == {seeker: 2, late: 1}
+    job_service.delete_job(employer, job)
+    assert applied() == {seeker: 1, late: 0}
@@ -0,0 +1,49 @@
+import pytest
+
+import counters
+import db_pool
+
+
+def _app_count(job_id):
+    with db_pool.connection() as conn:
+        return conn.execute("SELECT AppCount FROM VacancyJob WHERE JobID = ?", job_id).fetchone()[0]
+
+
+@pytest.fixture
+def aggregator(db):
+    aggregator = counters.CounterAggregator(interval=3600)
+    yield aggregator
+    aggregator.close()
+
+
+def test_flush_folds_deltas_into_the_table(aggregator, job):
+    for _ in range(3):
+        aggregator.add("app_count", job)
+    aggregator.add("app_count", job, -1)
+    assert aggregator.pending("app_count", job) == 2
+    assert _app_count(job) == 0
+    assert aggregator.flush() == 1
+    assert _app_count(job) == 2
+    assert aggregator.pending("app_count", job) == 0
+    assert aggregator.flush() == 0
+
+
+def test_failed_flush_requeues_its_deltas(aggregator, job, monkeypatch):
+    aggregator.add("app_count", job, 2)
+
+    def fail(fn):
+        raise RuntimeError("database down")
+    monkeypatch.setattr(db_pool, "transaction", fail)
+    with pytest.raises(RuntimeError):
+        aggregator.flush()
+    aggregator.add("app_count", job)
+    assert aggregator.pending("app_count", job) == 3
+    assert aggregator.stats()["failures"] == 1
+    monkeypatch.undo()
+    aggregator.flush()
+    assert _app_count(job) == 3
+
+
+def test_unknown_counter(aggregator):
+    with pytest.raises(ValueError):
+        aggregator.add("likes", 1)
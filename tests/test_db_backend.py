@@ -0,0 +1,42 @@
+import db_backend
+
+
+def test_to_sqlite_translates_paging_and_output():
+    assert db_backend.to_sqlite("SELECT JobID FROM VacancyJob ORDER BY JobID OFFSET ? ROWS FETCH NEXT ? ROWS ONLY") \
+        == "SELECT JobID FROM VacancyJob ORDER BY JobID LIMIT ?, ?"
+    assert db_backend.to_sqlite("INSERT INTO Skills (SkillName) OUTPUT INSERTED.SkillID VALUES (?)") \
+        == "INSERT INTO Skills (SkillName) VALUES (?) RETURNING SkillID"
+    assert "INTEGER PRIMARY KEY AUTOINCREMENT" in db_backend.to_sqlite("CREATE TABLE T (ID INT IDENTITY(1,1) PRIMARY KEY)")
+
+
+def _objects(backend):
+    return {row[0] for row in backend._keeper.execute("SELECT name FROM sqlite_master")}
+
+
+def test_bootstrap_adds_objects_missing_from_an_older_schema(tmp_path):
+    path = str(tmp_path / "old.db")
+    backend = db_backend.SqliteBackend(path)
+    backend._keeper.execute("DROP TABLE EmployerMonthlyStats")
+    backend._keeper.execute("DROP INDEX UQ_Application_JobID_SeekerID")
+    backend._keeper.commit()
+    backend.close()
+
+    backend = db_backend.SqliteBackend(path)
+    assert {"EmployerMonthlyStats", "UQ_Application_JobID_SeekerID"} <= _objects(backend)
+    backend.close()
+
+
+def test_bootstrap_skips_a_unique_index_over_duplicates(tmp_path, capsys):
+    path = str(tmp_path / "dup.db")
+    backend = db_backend.SqliteBackend(path)
+    backend._keeper.execute("DROP INDEX UQ_Application_JobID_SeekerID")
+    backend._keeper.execute("PRAGMA foreign_keys = OFF")
+    backend._keeper.executemany("INSERT INTO Application (JobID, SeekerID, Status) VALUES (1, 2, 'Pending')", [(), ()])
+    backend._keeper.commit()
+    backend.close()
+
+    backend = db_backend.SqliteBackend(path)
+    assert "UQ_Application_JobID_SeekerID" not in _objects(backend)
+    assert "IX_Application_SeekerID" in _objects(backend)
+    assert "Could not apply" in capsys.readouterr().out
+    backend.close()
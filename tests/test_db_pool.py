@@ -0,0 +1,157 @@
+import sqlite3
+
+import pytest
+
+import db_pool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+    def cursor(self):
+        if not self.healthy:
+            raise RuntimeError("connection lost")
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    def execute(self, sql, *params):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+def make_pool(**options):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+    return db_pool.ConnectionPool(connect, **options), opened
+
+
+def test_reuses_released_connections():
+    pool, opened = make_pool(min_size=0, max_size=2)
+    with pool.connection():
+        pass
+    with pool.connection():
+        pass
+    assert len(opened) == 1
+    assert pool.stats()["hits"] == 1
+
+
+def test_failed_health_checks_do_not_leak_slots():
+    pool, opened = make_pool(min_size=2, max_size=3, check_after=0)
+    pool.warm()
+    for _ in range(10):
+        for raw, _ in pool._idle:
+            raw.healthy = False
+        with pool.connection():
+            pass
+        assert pool.stats()["open"] == 2
+    assert pool.stats()["health_check_failures"] == 10
+    # every slot is still usable at once
+    held = [pool.acquire(timeout=0) for _ in range(3)]
+    assert pool.stats()["open"] == 3
+    for conn in held:
+        conn.close()
+
+
+def test_failed_reconnect_frees_the_slot():
+    pool, opened = make_pool(min_size=1, max_size=1, check_after=0)
+    pool.warm()
+    opened[0].healthy = False
+    pool._connect = lambda: (_ for _ in ()).throw(RuntimeError("database down"))
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0)
+    assert pool.stats()["open"] == 0
+
+
+def test_times_out_when_exhausted():
+    pool, _ = make_pool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    with pytest.raises(db_pool.PoolTimeout):
+        pool.acquire(timeout=0.01)
+    conn.close()
+
+
+def test_rolls_back_on_error():
+    pool, opened = make_pool(min_size=0, max_size=1)
+    rolled_back = []
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            opened[0].rollback = lambda: rolled_back.append(True)
+            raise ValueError
+    assert rolled_back
+
+
+def test_transaction_retries_lock_conflicts(db, monkeypatch):
+    monkeypatch.setattr(db_pool, "TX_BACKOFF", 0)
+    before = db_pool.transaction_stats()
+    calls = []
+
+    def write(conn):
+        calls.append(conn.execute("SELECT COUNT(*) FROM VacancyJob").fetchone()[0])
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "done"
+    assert db_pool.transaction(write) == "done"
+    assert len(calls) == 3
+    after = db_pool.transaction_stats()
+    assert after["retries"] - before["retries"] == 2
+    assert after["retried"] - before["retried"] == 1
+    assert after["lock_timeouts"] - before["lock_timeouts"] == 2
+
+
+def test_transaction_gives_up_after_its_retries(db, monkeypatch):
+    monkeypatch.setattr(db_pool, "TX_BACKOFF", 0)
+    before = db_pool.transaction_stats()
+    calls = []
+
+    def write(conn):
+        calls.append(True)
+        raise sqlite3.OperationalError("deadlock victim (1205)")
+    with pytest.raises(sqlite3.OperationalError):
+        db_pool.transaction(write, retries=2)
+    assert len(calls) == 3
+    assert db_pool.transaction_stats()["gave_up"] - before["gave_up"] == 1
+
+
+def test_transaction_rolls_back_before_retrying(db, employer, monkeypatch):
+    monkeypatch.setattr(db_pool, "TX_BACKOFF", 0)
+    calls = []
+
+    def write(conn):
+        conn.execute("UPDATE Employer SET ComName = ComName || '!' WHERE UserID = ?", employer)
+        calls.append(True)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+    db_pool.transaction(write)
+    with db_pool.connection() as conn:
+        assert conn.execute("SELECT ComName FROM Employer WHERE UserID = ?", employer).fetchone()[0] == "Acme!"
+
+
+def test_other_errors_are_not_retried(db):
+    calls = []
+
+    def write(conn):
+        calls.append(True)
+        raise sqlite3.IntegrityError("UNIQUE constraint failed")
+    with pytest.raises(sqlite3.IntegrityError):
+        db_pool.transaction(write)
+    assert len(calls) == 1
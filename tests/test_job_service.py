@@ -0,0 +1,172 @@
+import threading
+
+import pytest
+
+import counters
+import db_backend
+import db_pool
+import job_cache
+import job_service
+
+
+def _count(sql, *values):
+    with db_pool.connection() as conn:
+        return conn.execute(sql, *values).fetchone()[0]
+
+
+def test_try_apply_outcomes(employer, seeker, job):
+    assert job_service.try_apply(seeker, job) == job_service.APPLIED
+    assert job_service.try_apply(seeker, job) == job_service.DUPLICATE
+    assert job_service.try_apply(seeker, job + 100) == job_service.NOT_FOUND
+    closed = job_service.create_job(employer, "Tester", "QA", "Technology", "Cairo", "QA", 1)
+    job_service.hide_job(employer, closed)
+    assert job_service.try_apply(seeker, closed) == job_service.CLOSED
+    assert _count("SELECT COUNT(*) FROM Application WHERE SeekerID = ?", seeker) == 1
+    counters.flush()
+    assert _count("SELECT AppCount FROM VacancyJob WHERE JobID = ?", job) == 1
+    assert _count("SELECT AppliedJobCount FROM JobSeeker WHERE UserID = ?", seeker) == 1
+
+
+def test_apply_raises_the_refusal(seeker, job):
+    job_service.apply(seeker, job)
+    with pytest.raises(job_service.ServiceError, match="already applied"):
+        job_service.apply(seeker, job)
+
+
+def test_try_apply_unknown_seeker_is_an_error(job):
+    with pytest.raises(db_backend.INTEGRITY_ERRORS):
+        job_service.try_apply(12345, job)
+
+
+def test_try_save_outcomes(employer, seeker, job):
+    assert job_service.try_save(seeker, job) == job_service.SAVED
+    assert job_service.try_save(seeker, job) == job_service.DUPLICATE
+    assert job_service.try_save(seeker, job + 100) == job_service.NOT_FOUND
+    job_service.hide_job(employer, job)
+    with pytest.raises(job_service.ServiceError, match="not open"):
+        job_service.save(seeker, job)
+
+
+def test_apply_bulk(employer, seeker, job):
+    closed = job_service.create_job(employer, "Tester", "QA", "Technology", "Cairo", "QA", 1)
+    fresh = job_service.create_job(employer, "Analyst", "Data", "Technology", "Cairo", "SQL", 1)
+    job_service.hide_job(employer, closed)
+    job_service.apply(seeker, job)
+    applied, failures = job_service.apply_bulk(seeker, [fresh, job, closed, fresh, job + 100])
+    assert applied == [fresh]
+    assert set(failures) == {job, closed, job + 100}
+    counters.flush()
+    assert _count("SELECT AppliedJobCount FROM JobSeeker WHERE UserID = ?", seeker) == 2
+
+
+def test_apply_bulk_falls_back_when_an_application_races_in(db, monkeypatch, tmp_path):
+    job_service.switch_database(f"sqlite:///{tmp_path / 'race.db'}")
+    employer = job_service.register_user("Acme HR", "hr@acme.test", "1", job_service.EMPLOYER, "secret",
+                                         "Technology", "Cairo", company_name="Acme")
+    seeker = job_service.register_user("Sara", "sara@test", "1", job_service.JOB_SEEKER, "secret",
+                                       "Technology", "Cairo", resume_link="cv")
+    jobs = [job_service.create_job(employer, f"Job {i}", "Work", "Technology", "Cairo", "Python", 1)
+            for i in range(3)]
+    in_chunks = job_service._in_chunks
+
+    def checked_then_raced(ids):
+        # another session applies to one of the jobs after apply_bulk has checked them
+        yield from in_chunks(ids)
+        monkeypatch.setattr(job_service, "_in_chunks", in_chunks)
+        racer = threading.Thread(target=job_service.try_apply, args=(seeker, jobs[1]))
+        racer.start()
+        racer.join()
+    monkeypatch.setattr(job_service, "_in_chunks", checked_then_raced)
+
+    applied, failures = job_service.apply_bulk(seeker, jobs)
+    assert applied == [jobs[0], jobs[2]]
+    assert list(failures) == [jobs[1]]
+    counters.flush()
+    assert _count("SELECT COUNT(*) FROM Application WHERE SeekerID = ?", seeker) == 3
+    assert _count("SELECT AppliedJobCount FROM JobSeeker WHERE UserID = ?", seeker) == 3
+
+
+def test_job_writes_evict_cached_reads(employer, job):
+    assert job_service.get_job_details(job).Title == "Python Developer"
+    assert [row.JobID for row in job_service.list_open_jobs()] == [job]
+    generation = job_service._cache._generation
+    invalidations = job_service.cache_stats()['invalidations']
+    job_service.update_job(job, title="Go Developer")
+    assert job_service._cache._generation > generation
+    assert job_service.get_job_details(job).Title == "Go Developer"
+    job_service.hide_job(employer, job)
+    assert job_service.list_open_jobs() == []
+    assert job_service.cache_stats()['invalidations'] - invalidations == 3
+
+
+def test_cache_entries_expire_after_the_ttl():
+    now = [0.0]
+    cache = job_cache.TtlCache(ttl=10, clock=lambda: now[0])
+    loads = []
+    load = lambda: loads.append(now[0]) or len(loads)     # noqa: E731
+    assert cache.get_or_load("key", load) == 1
+    now[0] = 9.9
+    assert cache.get_or_load("key", load) == 1
+    now[0] = 10.0
+    assert cache.get_or_load("key", load) == 2
+    assert loads == [0.0, 10.0]
+    assert cache.stats()['expirations'] == 1
+
+
+def test_fill_racing_an_invalidation_is_not_stored(employer, job):
+    def load_then_raced():
+        # another thread updates the job after this load has read it
+        title = _count("SELECT Title FROM VacancyJob WHERE JobID = ?", job)
+        job_service.update_job(job, title="Go Developer")
+        return title
+    assert job_service._cache.get_or_load(("job", job), load_then_raced) == "Python Developer"
+    assert job_service.get_job_details(job).Title == "Go Developer"
+    assert job_service.cache_stats()['entries'] == 1
+
+
+def _pages(page_size, **filters):
+    # JobIDs of every filter_vacancies_page() page, following the continuation keys
+    pages = []
+    rows, more = job_service.filter_vacancies_page(page_size=page_size, **filters)
+    pages.append([row.JobID for row in rows])
+    while more:
+        rows, more = job_service.filter_vacancies_page(after=rows[-1].JobID, page_size=page_size, **filters)
+        pages.append([row.JobID for row in rows])
+    return pages
+
+
+def test_seek_page_visits_rows_with_equal_columns_once(employer, job):
+    # identical vacancies differ only in the key
+    jobs = [job] + [job_service.create_job(employer, "Python Developer", "Build services", "Technology", "Cairo",
+                                           "Python", 2) for _ in range(6)]
+    pages = _pages(3, industry="Technology")
+    assert pages == [jobs[0:3], jobs[3:6], jobs[6:]]
+    rows, more = job_service.filter_vacancies_page(before=jobs[3], page_size=2)
+    assert [row.JobID for row in rows] == jobs[1:3] and more
+    rows, more = job_service.filter_vacancies_page(before=jobs[1], page_size=2)
+    assert [row.JobID for row in rows] == jobs[:1] and not more
+
+
+def test_seek_page_ignores_writes_before_the_key(employer, job):
+    jobs = [job] + [job_service.create_job(employer, f"Job {i}", "Work", "Technology", "Cairo", "Python", 1)
+                    for i in range(5)]
+    first, more = job_service.filter_vacancies_page(page_size=2)
+    assert more
+    job_service.delete_job(employer, jobs[0])
+    job_service.hide_job(employer, jobs[1])
+    added = job_service.create_job(employer, "Late", "Work", "Technology", "Cairo", "Python", 1)
+    rows, more = job_service.filter_vacancies_page(after=first[-1].JobID, page_size=2)
+    assert [row.JobID for row in rows] == jobs[2:4] and more
+    rows, more = job_service.filter_vacancies_page(after=rows[-1].JobID, page_size=2)
+    assert [row.JobID for row in rows] == jobs[4:6] and more
+    rows, more = job_service.filter_vacancies_page(after=rows[-1].JobID, page_size=2)
+    assert [row.JobID for row in rows] == [added] and not more
+
+
+def test_seek_page_last_page_has_no_continuation(employer, job):
+    jobs = [job] + [job_service.create_job(employer, f"Job {i}", "Work", "Technology", "Cairo", "Python", 1)
+                    for i in range(3)]
+    assert _pages(2) == [jobs[:2], jobs[2:]]
+    assert _pages(4) == [jobs]
+    assert job_service.filter_vacancies_page(after=jobs[-1], page_size=2) == ([], False)
+    assert job_service.filter_vacancies_page(industry="Finance") == ([], False)
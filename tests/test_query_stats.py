@@ -0,0 +1,73 @@
+import pytest
+
+import db_pool
+import query_stats
+
+
+@pytest.fixture
+def slow_log(tmp_path, monkeypatch):
+    path = tmp_path / "slow.log"
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_LOG", str(path))
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 500)
+    query_stats.reset()
+    yield path
+    query_stats.reset()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """perf_counter advancing by step seconds per reading"""
+    state = {'now': 0.0, 'step': 0.0}
+
+    def perf_counter():
+        state['now'] += state['step']
+        return state['now']
+    monkeypatch.setattr(query_stats.time, "perf_counter", perf_counter)
+    return state
+
+
+def _stats(sql):
+    return [entry for entry in query_stats.snapshot() if entry.sql == sql]
+
+
+def test_slow_query_is_logged_with_its_sql_and_duration(db, employer, slow_log, clock):
+    clock['step'] = 0.3         # execute and fetch each take 300ms
+    sql = "SELECT ComName\n  FROM Employer WHERE UserID = ?"
+    with db_pool.connection() as conn:
+        assert conn.execute(sql, employer).fetchall()[0].ComName == "Acme"
+    line, = slow_log.read_text(encoding="utf-8").splitlines()
+    assert " 600.0ms (execute 300.0ms, fetch 300.0ms) rows=1 " in line
+    assert line.endswith("sql=SELECT ComName FROM Employer WHERE UserID = ?")
+    assert "test_query_stats" in line.split("caller=")[1]
+
+
+def test_fast_queries_are_not_logged(db, employer, slow_log, clock):
+    clock['step'] = 0.001
+    with db_pool.connection() as conn:
+        conn.execute("SELECT ComName FROM Employer WHERE UserID = ?", employer).fetchall()
+        conn.execute("UPDATE Employer SET ComName = ? WHERE UserID = ?", "Acme Ltd", employer)
+    assert not slow_log.exists()
+    assert sum(entry.calls for entry in query_stats.snapshot()) >= 2
+
+
+def test_fetchmany_and_executemany_pass_through(db, employer, slow_log):
+    insert = "INSERT INTO Skills (SkillName) VALUES (?)"
+    names = [f"Skill {i}" for i in range(5)]
+    with db_pool.connection() as conn:
+        cursor = conn.executemany(insert, [(name,) for name in names])
+        assert isinstance(cursor, query_stats.TimedCursor) and cursor.done
+        select = "SELECT SkillName FROM Skills ORDER BY SkillID"
+        cursor = conn.execute(select)
+        batches = []
+        while True:
+            rows = cursor.fetchmany(2)
+            if not rows:
+                break
+            batches.append([row.SkillName for row in rows])
+        assert batches == [names[0:2], names[2:4], names[4:]]
+        assert cursor.done
+    entry, = _stats(insert)
+    assert (entry.calls, entry.rows) == (1, 5)
+    entry, = _stats(select)
+    assert (entry.calls, entry.rows) == (1, 5)
+    assert not slow_log.exists()
@@ -0,0 +1,77 @@
+import pytest
+
+import counters
+import db_pool
+import job_service
+import reconcile_counters
+
+
+def _app_count(job_id):
+    with db_pool.connection() as conn:
+        return conn.execute("SELECT AppCount FROM VacancyJob WHERE JobID = ?", job_id).fetchone()[0]
+
+
+def _set_app_count(job_id, value):
+    with db_pool.connection() as conn:
+        conn.execute("UPDATE VacancyJob SET AppCount = ? WHERE JobID = ?", value, job_id)
+
+
+@pytest.fixture
+def jobs(employer, seeker, job):
+    jobs = [job] + [job_service.create_job(employer, f"Job {i}", "Work", "Technology", "Cairo", "Python", 1)
+                    for i in range(4)]
+    for job_id in jobs[:3]:
+        job_service.apply(seeker, job_id)
+    counters.flush()
+    return jobs
+
+
+@pytest.fixture
+def state(tmp_path):
+    return str(tmp_path / "state.json")
+
+
+def test_dry_run_reports_and_repair_fixes(jobs, state):
+    _set_app_count(jobs[1], 7)
+    _set_app_count(jobs[4], 2)
+    assert reconcile_counters.main(["--dry-run", "--settle", "0", "--chunk-size", "2", "--state", state]) == 1
+    assert _app_count(jobs[1]) == 7
+    assert reconcile_counters.load_state(state) is None
+    results = reconcile_counters.reconcile(settle=0, chunk_size=2, state_path=state)
+    assert results["app_count"] == (2, 2)
+    assert results["applied_job_count"] == (0, 0)
+    assert [_app_count(job_id) for job_id in jobs] == [1, 1, 1, 0, 0]
+    assert reconcile_counters.main(["--dry-run", "--settle", "0", "--state", state]) == 0
+
+
+def test_incremental_run_only_checks_keys_past_the_marks(employer, seeker, jobs, state, monkeypatch):
+    reconcile_counters.reconcile(settle=0, state_path=state)
+    assert reconcile_counters.load_state(state)["app_id"] == 3
+    _set_app_count(jobs[0], 9)      # untouched since the last run: left for the next full run
+    job_service.apply(seeker, jobs[3])
+    counters.flush()
+    _set_app_count(jobs[3], 5)
+    monkeypatch.setattr(reconcile_counters, "scan_range", lambda *args: pytest.fail("full scan"))
+    checked = []
+    check_keys = reconcile_counters.check_keys
+    monkeypatch.setattr(reconcile_counters, "check_keys",
+                        lambda counter, keys: checked.append((counter, sorted(keys))) or check_keys(counter, keys))
+    results = reconcile_counters.reconcile(incremental=True, settle=0, state_path=state)
+    assert ("app_count", [jobs[3]]) in checked
+    assert results["app_count"] == (1, 1)
+    assert _app_count(jobs[3]) == 1
+    assert _app_count(jobs[0]) == 9
+    assert reconcile_counters.load_state(state)["app_id"] == 4
+
+
+def test_rows_changed_before_the_recheck_are_not_repaired(jobs, state, monkeypatch):
+    _set_app_count(jobs[0], 0)      # looks like drift, but another process is about to flush +1
+    _set_app_count(jobs[1], 4)      # drift that moves again before the recheck
+
+    def settle(seconds):
+        _set_app_count(jobs[0], 1)
+        _set_app_count(jobs[1], 6)
+    monkeypatch.setattr(reconcile_counters.time, "sleep", settle)
+    results = reconcile_counters.reconcile(["app_count"], settle=1, state_path=state)
+    assert results["app_count"] == (0, 0)
+    assert [_app_count(job_id) for job_id in jobs[:2]] == [1, 6]
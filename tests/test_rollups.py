@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+
+import db_pool
+import rollups
+
+DAY = date(2024, 3, 14)
+
+
+def _rows(sql, *values):
+    with db_pool.connection() as conn:
+        return [tuple(row) for row in conn.execute(sql, *values).fetchall()]
+
+
+def test_flush_writes_daily_monthly_and_employer_rows(employer, job):
+    rollups.add(job, None, DAY)
+    rollups.add(job, None, DAY, 2)
+    rollups.add(job, employer, date(2024, 3, 20))
+    rollups.flush()
+    assert _rows("SELECT Day, AppCount FROM JobDailyApplications WHERE JobID = ? ORDER BY Day", job) == \
+        [(DAY, 3), (date(2024, 3, 20), 1)]
+    assert _rows("SELECT Month, AppCount FROM JobMonthlyApplications WHERE JobID = ?", job) == [(date(2024, 3, 1), 4)]
+    assert _rows("SELECT AppCount, JobsApplied FROM EmployerMonthlyStats WHERE EmployerID = ?", employer) == [(4, 1)]
+    assert rollups.get_buckets().count(job, DAY, DAY) == 3
+
+
+def test_rows_are_removed_when_they_drop_to_zero(employer, job):
+    rollups.add(job, None, DAY)
+    rollups.flush()
+    rollups.add(job, None, DAY, -1)
+    rollups.flush()
+    assert _rows("SELECT * FROM JobDailyApplications") == []
+    assert _rows("SELECT * FROM JobMonthlyApplications") == []
+    assert _rows("SELECT AppCount, JobsApplied FROM EmployerMonthlyStats WHERE EmployerID = ?", employer) == []
+
+
+def test_failed_flush_requeues_its_deltas(job, monkeypatch):
+    rollups.add(job, None, DAY)
+
+    def fail(fn):
+        raise RuntimeError("database down")
+    monkeypatch.setattr(db_pool, "transaction", fail)
+    with pytest.raises(RuntimeError):
+        rollups.flush()
+    monkeypatch.undo()
+    rollups.add(job, None, DAY)
+    rollups.flush()
+    assert _rows("SELECT AppCount FROM JobDailyApplications WHERE JobID = ?", job) == [(2,)]
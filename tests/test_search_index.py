@@ -0,0 +1,65 @@
+import random
+
+import db_pool
+import job_service
+import search_index
+
+
+def test_title_matches_rank_first(employer):
+    in_title = job_service.create_job(employer, "Java Developer", "Backend work", "Technology", "Cairo", "Spring", 1)
+    in_text = job_service.create_job(employer, "Engineer", "Some Java and more", "Technology", "Cairo", "SQL", 1)
+    job_service.create_job(employer, "Accountant", "Ledgers", "Finance", "Giza", "Excel", 1)
+    assert [row.JobID for row in search_index.search_jobs("java")] == [in_title, in_text]
+    assert [row.JobID for row in search_index.search_jobs("developers")] == [in_title]     # stemmed
+
+
+def test_threshold_search_matches_exhaustive_scoring():
+    rng = random.Random(7)
+    words = "python java sql cloud data web mobile security design sales".split()
+    index = search_index.InvertedIndex()
+    for job_id in range(1, 301):
+        index.add(job_id, " ".join(rng.choices(words, k=2)), " ".join(rng.choices(words, k=8)),
+                  " ".join(rng.choices(words, k=3)))
+    for query in ("python", "java sql", "cloud data web", "sales security python mobile"):
+        everything = index.search(query, limit=len(index))
+        top = index.search(query, limit=10)
+        assert [score for _, score in top] == [score for _, score in everything[:10]]
+
+
+def test_follows_this_process_writes(employer, job):
+    assert search_index.search_jobs("python")
+    job_service.hide_job(employer, job)
+    assert search_index.search_jobs("python") == []
+
+
+def test_rebuild_picks_up_other_processes_writes(employer, monkeypatch):
+    assert search_index.search_jobs("kotlin") == []
+    with db_pool.connection() as conn:      # as another process would, without job_service listeners
+        conn.execute("""
+            INSERT INTO VacancyJob (EmployerID, Title, Description, Industry, Location, ReqSkill, EXPRequired,
+                                    AppCount, Status)
+            VALUES (?, 'Kotlin Developer', 'Android apps', 'Technology', 'Cairo', 'Kotlin', 1, 0, 'Open')
+        """, employer)
+    assert search_index.search_jobs("kotlin") == []
+    monkeypatch.setattr(search_index, "INDEX_MAX_AGE", 0)
+    assert [row.Title for row in search_index.search_jobs("kotlin")] == ["Kotlin Developer"]
+
+
+def test_rebuild_runs_outside_the_lock_and_keeps_changes(employer, job, monkeypatch):
+    old = search_index.get_index()
+    iter_job_texts = job_service.iter_job_texts
+    created = []
+
+    def loading(job_ids=None, **options):
+        yield from iter_job_texts(job_ids, **options)
+        if job_ids is None:
+            # searches go on against the old index while the new one loads
+            assert search_index.get_index() is old
+            assert search_index._index_lock.acquire(blocking=False)
+            search_index._index_lock.release()
+            created.append(job_service.create_job(employer, "Python Lead", "Teams", "Technology", "Cairo", "Python", 4))
+    monkeypatch.setattr(job_service, "iter_job_texts", loading)
+    monkeypatch.setattr(search_index, "INDEX_MAX_AGE", -1)
+    assert search_index.get_index() is not old
+    monkeypatch.setattr(search_index, "INDEX_MAX_AGE", 300)
+    assert {row.JobID for row in search_index.search_jobs("python")} == {job, created[0]}
@@ -0,0 +1,86 @@
+import pytest
+
+import db_pool
+import job_service
+import skill_matrix
+
+pytest.importorskip("numpy")
+
+
+def _seeker(name, industry, location, skills):
+    seeker_id = job_service.register_user(name, f"{name.lower()}@test", "1", job_service.JOB_SEEKER, "secret",
+                                          industry, location, resume_link="cv")
+    with db_pool.connection() as conn:
+        for skill, years in skills.items():
+            row = conn.execute("SELECT SkillID FROM Skills WHERE SkillName = ?", skill).fetchone()
+            skill_id = row.SkillID if row else conn.execute("""
+                INSERT INTO Skills (SkillName, SkillCategory, Description) OUTPUT INSERTED.SkillID
+                VALUES (?, 'General', '')
+            """, skill).fetchone().SkillID
+            conn.execute("INSERT INTO HasSkills (UserID, SkillID, EXPYears) VALUES (?, ?, ?)", seeker_id, skill_id, years)
+    return seeker_id
+
+
+def test_rank_candidates_best_first(employer):
+    job_id = job_service.create_job(employer, "Backend Developer", "APIs", "Technology", "Cairo", "Python, SQL", 2)
+    expert = _seeker("Mona", "Technology", "Cairo", {"Python": 5, "SQL": 3})
+    junior = _seeker("Omar", "Technology", "Giza", {"python": 1})
+    _seeker("Hana", "Finance", "Alex", {"Excel": 4})
+    ranked = skill_matrix.rank_candidates(employer, job_id)
+    assert [row.UserID for row, _ in ranked] == [expert, junior]
+    assert ranked[0][1] == pytest.approx(1.0)
+    job_service.apply(junior, job_id)
+    assert [row.UserID for row, _ in skill_matrix.rank_candidates(employer, job_id, applicants_only=True)] == [junior]
+
+
+def test_rank_candidates_only_for_own_jobs(employer, job):
+    other = job_service.register_user("Other HR", "hr@other.test", "2", job_service.EMPLOYER, "secret",
+                                      "Technology", "Cairo", company_name="Other")
+    with pytest.raises(job_service.ServiceError):
+        skill_matrix.rank_candidates(other, job)
+    with pytest.raises(job_service.ServiceError):
+        skill_matrix.rank_candidates(employer, job + 100)
+
+
+def test_recommendations_follow_job_changes(employer):
+    seeker = _seeker("Mona", "Technology", "Cairo", {"Go": 3})
+    assert skill_matrix.recommend_jobs(seeker) == []
+    job_id = job_service.create_job(employer, "Go Developer", "Services", "Technology", "Cairo", "Go", 2)
+    assert [row.JobID for row, _ in skill_matrix.recommend_jobs(seeker)] == [job_id]
+    job_service.update_job(job_id, skills="Rust")
+    assert skill_matrix.recommend_jobs(seeker) == []
+
+
+def test_rebuild_runs_outside_the_lock_and_keeps_changes(employer, monkeypatch):
+    seeker = _seeker("Mona", "Technology", "Cairo", {"Go": 3})
+    first = job_service.create_job(employer, "Go Developer", "Services", "Technology", "Cairo", "Go", 2)
+    old = skill_matrix.get_job_matrix()
+    iter_job_requirements = job_service.iter_job_requirements
+    created = []
+
+    def loading(job_ids=None, **options):
+        yield from iter_job_requirements(job_ids, **options)
+        if job_ids is None:
+            # scoring goes on against the old matrix while the new one loads
+            assert skill_matrix.get_job_matrix() is old
+            assert skill_matrix._lock.acquire(blocking=False)
+            skill_matrix._lock.release()
+            created.append(job_service.create_job(employer, "Go Lead", "Teams", "Technology", "Cairo", "Go", 4))
+    monkeypatch.setattr(job_service, "iter_job_requirements", loading)
+    monkeypatch.setattr(skill_matrix, "MATRIX_MAX_AGE", -1)
+    assert skill_matrix.get_job_matrix() is not old
+    monkeypatch.setattr(skill_matrix, "MATRIX_MAX_AGE", 300)
+    assert {row.JobID for row, _ in skill_matrix.recommend_jobs(seeker)} == {first, created[0]}
+
+
+def test_candidates_follow_seeker_registrations_and_deletions(employer, job):
+    expert = _seeker("Mona", "Technology", "Cairo", {"Python": 5})
+    _seeker("Omar", "Technology", "Giza", {"Python": 1})
+    assert [row.UserID for row, _ in skill_matrix.rank_candidates(employer, job)][0] == expert
+    newcomer = job_service.register_user("Hana", "hana@test", "1", job_service.JOB_SEEKER, "secret",
+                                         "Technology", "Cairo", resume_link="cv")
+    job_service.delete_user("mona@test")
+    ranked = skill_matrix.rank_candidates(employer, job, limit=2)
+    assert len(ranked) == 2
+    assert expert not in [row.UserID for row, _ in ranked]
+    assert newcomer in [row.UserID for row, _ in ranked]
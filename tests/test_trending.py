@@ -0,0 +1,95 @@
+import datetime
+import time
+
+import pytest
+
+import job_service
+import trending
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def tracker(clock):
+    tracker = trending.TrendingTracker(half_life=100, clock=clock)
+    for job_id, industry, location in ((1, "Technology", "Cairo"), (2, "Technology", "Giza"), (3, "Finance", "Cairo")):
+        tracker.add_job(job_id, industry, location)
+    return tracker
+
+
+def test_scores_halve_every_half_life(tracker, clock):
+    tracker.record(1, 4.0)
+    clock.now += 100
+    assert tracker.score(1) == pytest.approx(2.0)
+    clock.now += 200
+    assert tracker.score(1) == pytest.approx(0.5)
+
+
+def test_recent_activity_outranks_older_activity(tracker, clock):
+    tracker.record(1, 3.0)
+    clock.now += 200
+    tracker.record(2, 1.0)
+    assert [job_id for job_id, _ in tracker.top()] == [2, 1]
+    assert [score for _, score in tracker.top()] == pytest.approx([1.0, 0.75])
+
+
+def test_top_filters_and_skips_idle_jobs(tracker):
+    for job_id in (1, 2, 3):
+        tracker.record(job_id, job_id)
+    assert [job_id for job_id, _ in tracker.top(industry="technology")] == [2, 1]
+    assert [job_id for job_id, _ in tracker.top(industry="Technology", location="Cairo")] == [1]
+    tracker.add_job(4, "Technology", "Cairo")
+    assert 4 not in [job_id for job_id, _ in tracker.top()]
+
+
+def test_rescaling_keeps_scores(tracker, clock):
+    tracker.record(1, 1.0)
+    tracker.record(2, 2.0)
+    clock.now += 100 * (trending.RESCALE_AFTER + 1)
+    tracker.record(3, 1.0)
+    assert tracker.score(3) == pytest.approx(1.0)
+    assert [job_id for job_id, _ in tracker.top()] == [3, 2, 1]
+
+
+def test_trending_jobs_follow_applications_and_saves(employer, seeker, job):
+    other = job_service.create_job(employer, "Tester", "QA", "Technology", "Giza", "QA", 1)
+    job_service.save(seeker, other)
+    job_service.apply(seeker, job)
+    ranked = trending.trending_jobs()
+    assert [row.JobID for row, _ in ranked] == [job, other]
+    assert [score for _, score in ranked] == pytest.approx([trending.APPLY_WEIGHT, trending.SAVE_WEIGHT], rel=1e-3)
+    job_service.hide_job(employer, job)
+    assert [row.JobID for row, _ in trending.trending_jobs()] == [other]
+
+
+def test_reload_counts_activity_during_the_load_once(employer, seeker, job, monkeypatch):
+    other = job_service.create_job(employer, "Tester", "QA", "Technology", "Giza", "QA", 1)
+    second = job_service.register_user("Omar", "omar@test", "1", job_service.JOB_SEEKER, "secret",
+                                       "Technology", "Cairo", resume_link="cv")
+    old = trending.get_tracker()
+    iter_activity = job_service.iter_activity
+
+    def loading(since, **options):
+        job_service.apply(seeker, job)          # committed before the load reads it, notified during the load
+        yield from iter_activity(since, **options)
+        assert trending.get_tracker() is old
+        job_service.apply(second, other)        # committed after the load read today's activity
+    monkeypatch.setattr(job_service, "iter_activity", loading)
+    monkeypatch.setattr(trending, "TRENDING_MAX_AGE", -1)
+    tracker = trending.get_tracker()
+    assert tracker is not old
+    loaded_at = trending._timestamp(datetime.date.today())     # where the load places today's activity
+    expected = trending.APPLY_WEIGHT * 2 ** ((loaded_at - time.time()) / trending.HALF_LIFE)
+    assert tracker.score(job) == pytest.approx(expected, rel=1e-3)
+    assert tracker.score(other) == pytest.approx(trending.APPLY_WEIGHT, rel=1e-3)
@@ -0,0 +1,306 @@
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+
+import job_service
+
+HALF_LIFE = 3 * 24 * 3600   # seconds for a job's trending score to halve
+APPLY_WEIGHT = 1.0          # score added by an application
+SAVE_WEIGHT = 0.5           # score added by a save
+HISTORY_HALF_LIVES = 10     # older activity adds under 0.1% and is not loaded
+TRENDING_MAX_AGE = 300      # seconds before the tracker is reloaded to pick up other processes' activity
+TRENDING_LIMIT = 10
+RESCALE_AFTER = 512         # half-lives past the epoch before stored scores are rescaled
+JOB_SORT = os.environ.get("JOBAPP_JOB_SORT", "id")     # "trending" lists open jobs hottest first
+
+_tracker = None
+_tracker_lock = threading.Lock()
+_pending = None             # job changes and activity seen while the tracker reloads; None when no reload runs
+_load_lock = threading.Lock()           # one reload at a time
+_listening = False
+
+
+def group_key(value):
+    """Normalized industry or location used to group jobs"""
+    return " ".join((value or "").lower().split())
+
+
+class TrendingTracker:
+    """Exponentially decayed activity score of every open vacancy, kept in rank order.
+
+    A score is stored as weight * 2 ** ((t - epoch) / half_life) summed over
+    the job's activity. Every stored score decays by the same factor as time
+    passes, so ranks only change when activity is recorded and the sorted
+    lists never need re-sorting; the current score is the stored one scaled
+    down to now. Each open job sits in three sorted lists of (-stored, job_id):
+    all jobs, its industry and its location, so a top K is a slice.
+    """
+
+    def __init__(self, half_life=HALF_LIFE, clock=time.time):
+        self.half_life = half_life
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._epoch = clock()
+        self._jobs = {}             # job_id -> (stored score, industry key, location key)
+        self._groups = {None: []}   # None, ("industry", key) or ("location", key) -> sorted [(-stored, job_id)]
+        self.built_at = time.monotonic()
+
+    def _group_names(self, entry):
+        return None, ("industry", entry[1]), ("location", entry[2])
+
+    def _insert(self, job_id, entry):
+        self._jobs[job_id] = entry
+        for name in self._group_names(entry):
+            insort(self._groups.setdefault(name, []), (-entry[0], job_id))
+
+    def _delete(self, job_id):
+        entry = self._jobs.pop(job_id, None)
+        if entry is None:
+            return None
+        for name in self._group_names(entry):
+            ranked = self._groups[name]
+            del ranked[bisect_left(ranked, (-entry[0], job_id))]
+            if not ranked and name is not None:
+                del self._groups[name]
+        return entry
+
+    def add_job(self, job_id, industry, location):
+        """Track an open job, keeping its score if it is already tracked"""
+        with self._lock:
+            entry = self._delete(job_id)
+            self._insert(job_id, (entry[0] if entry else 0.0, group_key(industry), group_key(location)))
+
+    def remove_job(self, job_id):
+        with self._lock:
+            self._delete(job_id)
+
+    def record(self, job_id, weight, when=None):
+        """Add weight to the job's score as of `when` (a timestamp, default now)"""
+        when = self._clock() if when is None else when
+        with self._lock:
+            if (when - self._epoch) / self.half_life > RESCALE_AFTER:
+                self._rescale(when)
+            entry = self._delete(job_id)
+            if entry is None:
+                return
+            stored = entry[0] + weight * 2.0 ** ((when - self._epoch) / self.half_life)
+            self._insert(job_id, (stored,) + entry[1:])
+
+    def _rescale(self, epoch):
+        # move the epoch forward; scaling every score alike keeps the lists in order
+        factor = 2.0 ** ((self._epoch - epoch) / self.half_life)
+        self._epoch = epoch
+        self._jobs = {job_id: (entry[0] * factor,) + entry[1:] for job_id, entry in self._jobs.items()}
+        for ranked in self._groups.values():
+            ranked[:] = [(-self._jobs[job_id][0], job_id) for _, job_id in ranked]
+
+    def _now_factor(self):
+        return 2.0 ** ((self._epoch - self._clock()) / self.half_life)
+
+    def score(self, job_id):
+        """The job's current decayed score, 0 if it is not tracked"""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            return entry[0] * self._now_factor() if entry else 0.0
+
+    def top(self, limit=TRENDING_LIMIT, industry=None, location=None):
+        """[(job_id, current score)] of the hottest jobs with activity, optionally of one industry and/or location"""
+        with self._lock:
+            filters = [(self._groups.get((name, key), []), field, key)
+                       for name, field, key in (("industry", 1, group_key(industry)), ("location", 2, group_key(location)))
+                       if key]
+            if filters:
+                # walk the smaller group and check the other filter job by job
+                filters.sort(key=lambda item: len(item[0]))
+                ranked = filters[0][0]
+                checks = [(field, key) for _, field, key in filters[1:]]
+            else:
+                ranked, checks = self._groups[None], []
+            factor = self._now_factor()
+            result = []
+            for negative, job_id in ranked:
+                if negative >= 0 or len(result) == limit:     # the rest have no activity
+                    break
+                entry = self._jobs[job_id]
+                if all(entry[field] == key for field, key in checks):
+                    result.append((job_id, -negative * factor))
+            return result
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def window(self, offset, limit):
+        """Job ids ranked offset to offset + limit among all open jobs, hottest first"""
+        with self._lock:
+            return [job_id for _, job_id in self._groups[None][offset:offset + limit]]
+
+    def page(self, after=None, before=None, page_size=job_service.PAGE_SIZE):
+        """(job_ids, more) of the page after or before the given job, as the *_page functions do"""
+        with self._lock:
+            ranked = self._groups[None]
+            anchor = self._jobs.get(after if after is not None else before)
+            if before is not None:
+                end = bisect_left(ranked, (-anchor[0], before)) if anchor else 0
+                start = max(0, end - page_size)
+                return [job_id for _, job_id in ranked[start:end]], start > 0
+            if after is not None:
+                start = bisect_right(ranked, (-anchor[0], after)) if anchor else len(ranked)
+            else:
+                start = 0
+            return [job_id for _, job_id in ranked[start:start + page_size]], start + page_size < len(ranked)
+
+
+def _timestamp(day):
+    # activity loaded per day is placed at noon, or now for today's before noon
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    return min(datetime(day.year, day.month, day.day, 12).timestamp(), time.time())
+
+
+def _listen():
+    global _listening
+    if not _listening:
+        job_service.add_job_listener(_on_jobs_changed)
+        job_service.add_activity_listener(_on_activity)
+        _listening = True
+
+
+def _update_jobs(tracker, event, job_ids):
+    if event in ("closed", "deleted"):
+        for job_id in job_ids:
+            tracker.remove_job(job_id)
+        return
+    # created or updated: the industry or location may have changed
+    for row in job_service.iter_job_requirements(job_ids):
+        tracker.add_job(row.JobID, row.Industry, row.Location)
+
+
+def _weight(kind):
+    return APPLY_WEIGHT if kind == "applied" else SAVE_WEIGHT
+
+
+def _on_jobs_changed(event, job_ids):
+    with _tracker_lock:
+        if _pending is not None:
+            _pending.append(("jobs", event, job_ids))
+        tracker = _tracker
+    if tracker is not None:
+        _update_jobs(tracker, event, job_ids)
+
+
+def _on_activity(kind, job_ids, seeker_id):
+    when = time.time()
+    with _tracker_lock:
+        if _pending is not None:
+            _pending.append(("activity", kind, job_ids, seeker_id, when))
+        tracker = _tracker
+    if tracker is not None:
+        for job_id in job_ids:
+            tracker.record(job_id, _weight(kind), when)
+
+
+def _load():
+    """Load a tracker from the database and swap it in.
+
+    Earlier days come from the daily rollups; today's applications and saves
+    are read row by row, so the live activity recorded while loading can be
+    replayed onto the new tracker without counting any of it twice.
+    """
+    global _tracker, _pending
+    pending = []
+    with _tracker_lock:
+        _listen()
+        _pending = pending
+    try:
+        tracker = TrendingTracker()
+        for row in job_service.iter_job_requirements():
+            tracker.add_job(row.JobID, row.Industry, row.Location)
+        today = date.today()
+        since = datetime.now() - timedelta(seconds=HISTORY_HALF_LIVES * HALF_LIFE)
+        for row in job_service.iter_daily_activity(since.date(), today):
+            weight = APPLY_WEIGHT * row.Applications + SAVE_WEIGHT * row.Saves
+            tracker.record(row.JobID, weight, _timestamp(row.Day))
+        loaded = set()
+        for row in job_service.iter_activity(today):
+            loaded.add((row.Kind, row.JobID, row.SeekerID))
+            tracker.record(row.JobID, _weight(row.Kind), _timestamp(row.Day))
+        while True:
+            with _tracker_lock:
+                if _pending is not pending:     # reset() while loading
+                    return tracker
+                if not pending:
+                    _tracker, _pending = tracker, None
+                    return tracker
+                events = pending[:]
+                del pending[:]
+            for event in events:
+                if event[0] == "jobs":
+                    _update_jobs(tracker, *event[1:])
+                    continue
+                _, kind, job_ids, seeker_id, when = event
+                for job_id in job_ids:
+                    if (kind, job_id, seeker_id) not in loaded:
+                        tracker.record(job_id, _weight(kind), when)
+    except Exception:
+        with _tracker_lock:
+            if _pending is pending:
+                _pending = None
+        raise
+
+
+def get_tracker():
+    """The process-wide tracker, loaded on first use and reloaded after TRENDING_MAX_AGE seconds.
+
+    A reload runs in one thread without holding _tracker_lock; the others
+    keep using the old tracker until the new one is swapped in.
+    """
+    with _tracker_lock:
+        tracker = _tracker
+    if tracker is not None and time.monotonic() - tracker.built_at <= TRENDING_MAX_AGE:
+        return tracker
+    if not _load_lock.acquire(blocking=tracker is None):
+        return tracker
+    try:
+        with _tracker_lock:
+            tracker = _tracker
+        if tracker is not None and time.monotonic() - tracker.built_at <= TRENDING_MAX_AGE:
+            return tracker
+        return _load()
+    finally:
+        _load_lock.release()
+
+
+def reset():
+    """Drop the tracker; the next call reloads it"""
+    global _tracker, _pending
+    with _tracker_lock:
+        _tracker = None
+        _pending = None
+
+
+def trending_jobs(limit=TRENDING_LIMIT, industry=None, location=None):
+    """[(row, score)] of the hottest open jobs, optionally of one industry and/or location.
+
+    Rows are shaped like filter_vacancies() rows; scores are decayed
+    application and save counts.
+    """
+    ranked = get_tracker().top(limit, industry, location)
+    rows = {row.JobID: row for row in job_service.jobs_by_ids([job_id for job_id, _ in ranked])}
+    return [(rows[job_id], score) for job_id, score in ranked if job_id in rows]
+
+
+def open_jobs_page(after=None, before=None, page_size=job_service.PAGE_SIZE):
+    """job_service.open_jobs_page() in trending order; after and before are JobIDs"""
+    job_ids, more = get_tracker().page(after, before, page_size)
+    return job_service.open_jobs_by_ids(job_ids), more
+
+
+def list_open_jobs_window(offset, limit):
+    """job_service.list_open_jobs_window() in trending order"""
+    return job_service.open_jobs_by_ids(get_tracker().window(offset, limit))
+
+
+def count_open_jobs():
+    return len(get_tracker())